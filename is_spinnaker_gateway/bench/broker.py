@@ -0,0 +1,98 @@
+import copy
+import queue
+import socket
+import threading
+from collections import defaultdict
+
+import amqp
+from is_wire.core import Channel
+
+
+class LocalBroker:
+    # In-process stand-in for the RabbitMQ `is` topic exchange, routing messages between
+    # LocalChannels by exact routing key (wildcards are not supported).
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bindings = defaultdict(set)
+        self._queues = {}
+
+    def declare(self, queue_name: str, connection: "LocalConnection"):
+        with self._lock:
+            self._queues[queue_name] = connection
+
+    def bind(self, queue_name: str, routing_key: str):
+        with self._lock:
+            self._bindings[routing_key].add(queue_name)
+
+    def unbind(self, queue_name: str, routing_key: str):
+        with self._lock:
+            self._bindings[routing_key].discard(queue_name)
+
+    def route(self, message: amqp.Message, routing_key: str):
+        with self._lock:
+            targets = [(name, self._queues[name]) for name in self._bindings[routing_key]]
+        for name, connection in targets:
+            # receivers modify the headers (e.g. to remove the rpc status), so each one gets a copy
+            connection.deliver(name, message.body, copy.deepcopy(message.properties), routing_key)
+
+
+class LocalConnection:
+    # Implements the subset of `amqp.Connection` and `amqp.Channel` used by is_wire.
+
+    def __init__(self, broker: LocalBroker):
+        self._broker = broker
+        self._inbox = queue.Queue()
+        self._consumers = {}
+        self.auto_decode = False
+
+    def channel(self) -> "LocalConnection":
+        return self
+
+    def close(self):
+        pass
+
+    def exchange_declare(self, **kwargs):
+        pass
+
+    def queue_declare(self, queue: str, **kwargs):
+        self._broker.declare(queue, self)
+
+    def queue_bind(self, queue: str, exchange: str, routing_key: str):
+        self._broker.bind(queue, routing_key)
+
+    def queue_unbind(self, queue: str, exchange: str, routing_key: str):
+        self._broker.unbind(queue, routing_key)
+
+    def basic_consume(self, queue: str, callback, consumer_tag: str, **kwargs):
+        self._consumers[queue] = (callback, consumer_tag)
+
+    def basic_publish(self, message: amqp.Message, exchange: str, routing_key: str, **kwargs):
+        self._broker.route(message, routing_key)
+
+    def deliver(self, queue_name: str, body: bytes, properties: dict, routing_key: str):
+        self._inbox.put((queue_name, body, properties, routing_key))
+
+    def drain_events(self, timeout=None):
+        try:
+            if timeout == 0:
+                queue_name, body, properties, routing_key = self._inbox.get_nowait()
+            else:
+                queue_name, body, properties, routing_key = self._inbox.get(timeout=timeout)
+        except queue.Empty:
+            raise socket.timeout()
+        callback, consumer_tag = self._consumers[queue_name]
+        message = amqp.Message(body=body, **properties)
+        message.delivery_info = {"routing_key": routing_key, "consumer_tag": consumer_tag}
+        callback(message)
+
+
+class LocalChannel(Channel):
+
+    def __init__(self, broker: LocalBroker, exchange: str = "is"):
+        # does not call Channel.__init__, which connects to a broker
+        self.connection = LocalConnection(broker)
+        self._channel = self.connection.channel()
+        self._exchange = exchange
+        self.subscriptions = []
+        self.amqp_message = None
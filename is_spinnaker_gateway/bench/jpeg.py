@@ -0,0 +1,83 @@
+import os
+import time
+import argparse
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from is_msgs.image_pb2 import ColorSpaces, ImageFormats
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.driver.encoder import ImageEncoder
+
+
+def synthetic_frame(width: int, height: int) -> np.ndarray:
+    # smoothed noise, closer to the entropy of a real scene than raw noise
+    noise = np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (9, 9), 3)
+
+
+def measure(encoder: ImageEncoder, array: np.ndarray, quality: float,
+            frames: int) -> Tuple[float, float, np.ndarray]:
+    # Returns the median and 95th percentile encoding time, in milliseconds, and the last image.
+    encode = lambda: encoder.encode(  # noqa: E731
+        array=array,
+        encode_format=ImageFormats.Value("JPEG"),
+        compression_level=quality,
+        color_space=ColorSpaces.Value("RGB"),
+    )
+    encode()
+    took = []
+    for _ in range(frames):
+        started = time.perf_counter()
+        data = encode()
+        took.append(time.perf_counter() - started)
+    return float(np.median(took)) * 1000.0, float(np.percentile(took, 95)) * 1000.0, data
+
+
+def parse_threads(threads: str) -> List[int]:
+    return [int(count) for count in threads.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the JPEG encoding latency of whole frames against frames split "
+        "into bands encoded in parallel.")
+    parser.add_argument("--width", type=int, default=2448)
+    parser.add_argument("--height", type=int, default=2048)
+    parser.add_argument("--threads", type=parse_threads, default="2,4,8",
+                        help="threads to encode bands with, e.g. '2,4,8'")
+    parser.add_argument("--quality", type=float, default=0.8, help="in (0, 1)")
+    parser.add_argument("--frames", type=int, default=50, help="frames encoded per mode")
+    parser.add_argument("--opencv", action="store_true",
+                        help="use the OpenCV encoder instead of TurboJPEG")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARN")
+    logger = Logger(name="JpegBenchmark")
+    array = synthetic_frame(args.width, args.height)
+    use_turbojpeg = not args.opencv
+    median, p95, reference = measure(
+        ImageEncoder(use_turbojpeg=use_turbojpeg), array, args.quality, args.frames)
+    decoded = cv2.imdecode(np.frombuffer(reference, dtype=np.uint8), cv2.IMREAD_COLOR)
+    lines = ["  {:>8} {:>10} {:>10} {:>8} {:>10} {:>9}".format(
+        "threads", "median ms", "p95 ms", "speedup", "size KB", "identical")]
+    lines.append("  {:>8} {:>10.2f} {:>10.2f} {:>7.1f}x {:>10.1f} {:>9}".format(
+        1, median, p95, 1.0, len(reference) / 1024.0, "-"))
+    for threads in args.threads:
+        tiled_median, tiled_p95, data = measure(
+            ImageEncoder(use_turbojpeg=use_turbojpeg, jpeg_threads=threads), array, args.quality,
+            args.frames)
+        identical = np.array_equal(
+            decoded, cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR))
+        lines.append("  {:>8} {:>10.2f} {:>10.2f} {:>7.1f}x {:>10.1f} {:>9}".format(
+            threads, tiled_median, tiled_p95, median / tiled_median, len(data) / 1024.0,
+            str(identical)))
+    logger.warn("{}x{} frames, {} encoder, {} cpus\n{}".format(
+        args.width, args.height, "OpenCV" if args.opencv else "TurboJPEG", os.cpu_count(),
+        "\n".join(lines)))
+
+
+if __name__ == "__main__":
+    main()
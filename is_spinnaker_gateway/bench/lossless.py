@@ -0,0 +1,100 @@
+import os
+import time
+import argparse
+from typing import Callable, List, Tuple
+
+import cv2
+import numpy as np
+
+from is_msgs.image_pb2 import ColorSpaces, ImageFormats
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.bench.jpeg import synthetic_frame
+from is_spinnaker_gateway.driver import lossless
+from is_spinnaker_gateway.driver.encoder import ImageEncoder
+
+# format, compression levels as set on `ImageFormat.compression`
+FORMATS = [
+    ("PNG", ImageFormats.Value("PNG"), [0.05, 0.12, 0.34]),
+    ("RAW_ZSTD", lossless.RAW_ZSTD, [0.05, 0.25, 0.5]),
+]
+
+
+def recorded_frames(path: str, count: int) -> List[np.ndarray]:
+    from is_spinnaker_gateway.driver.replay.replay import ReplayDriver
+    driver = ReplayDriver(path=path, use_turbojpeg=False, compression_level=0.5, max_speed=True,
+                          loop=False)
+    driver.start_capture()
+    frames = []
+    while len(frames) < count:
+        frame = driver.grab_image(wait=False)
+        if frame is None:
+            break
+        frames.append(driver.to_array(frame))
+    driver.close()
+    return frames
+
+
+def measure(function: Callable[[np.ndarray], object], arrays: List[np.ndarray],
+            repeat: int) -> Tuple[float, list]:
+    # Returns the median time per frame, in milliseconds, and the outputs of the last round.
+    took, outputs = [], []
+    for iteration in range(repeat + 1):
+        outputs = []
+        for array in arrays:
+            started = time.perf_counter()
+            outputs.append(function(array))
+            if iteration > 0:
+                took.append(time.perf_counter() - started)
+    return float(np.median(took)) * 1000.0, outputs
+
+
+def decode(data) -> np.ndarray:
+    if bytes(data[:4]) == lossless.MAGIC:
+        return lossless.decode(data)
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare encoding speed and compression ratio of lossless image formats.")
+    parser.add_argument("--recording", default="",
+                        help="recording directory to take frames from, a synthetic frame is used "
+                        "if not set")
+    parser.add_argument("--frames", type=int, default=10, help="frames taken from the recording")
+    parser.add_argument("--width", type=int, default=2448)
+    parser.add_argument("--height", type=int, default=2048)
+    parser.add_argument("--repeat", type=int, default=3, help="times each frame is encoded")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LOG_LEVEL", "WARN")
+    logger = Logger(name="LosslessBenchmark")
+    if args.recording:
+        arrays = recorded_frames(args.recording, args.frames)
+    else:
+        arrays = [synthetic_frame(args.width, args.height)]
+    if len(arrays) == 0:
+        logger.critical("No frames in '{}'", args.recording)
+    encoder = ImageEncoder(use_turbojpeg=False)
+    raw_bytes = sum(array.nbytes for array in arrays)
+    lines = ["  {:<9} {:>11} {:>10} {:>10} {:>7} {:>9} {:>8}".format(
+        "format", "compression", "encode ms", "decode ms", "ratio", "max fps", "lossless")]
+    for name, encode_format, levels in FORMATS:
+        for level in levels:
+            encode_ms, outputs = measure(
+                lambda array: encoder.encode(array=array, encode_format=encode_format,
+                                             compression_level=level,
+                                             color_space=ColorSpaces.Value("RGB")),
+                arrays, args.repeat)
+            decode_ms, decoded = measure(decode, outputs, args.repeat)
+            encoded_bytes = sum(len(output) for output in outputs)
+            exact = all(np.array_equal(a, b) for a, b in zip(arrays, decoded))
+            lines.append("  {:<9} {:>11.2f} {:>10.2f} {:>10.2f} {:>7.2f} {:>9.1f} {:>8}".format(
+                name, level, encode_ms, decode_ms, raw_bytes / encoded_bytes, 1000.0 / encode_ms,
+                str(exact)))
+    logger.warn("{} frames of {}x{}\n{}".format(
+        len(arrays), arrays[0].shape[1], arrays[0].shape[0], "\n".join(lines)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import os
+import logging
+import time
+import random
+import socket
+import argparse
+import tempfile
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+from is_wire.core import Channel, Logger as WireLogger, Message, Subscription
+
+from is_msgs.common_pb2 import FieldSelector
+from is_msgs.image_pb2 import ColorSpaces, ImageFormats
+from is_msgs.camera_pb2 import CameraConfig, CameraConfigFields
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.gateway import CameraGateway
+from is_spinnaker_gateway.conf.options_pb2 import Camera
+from is_spinnaker_gateway.driver.recording import Frame, RecordingWriter
+from is_spinnaker_gateway.bench.broker import LocalBroker, LocalChannel
+
+SERVICE = "CameraGateway.0"
+
+
+def get_config(field: str) -> Tuple[str, FieldSelector]:
+    return "GetConfig", FieldSelector(fields=[CameraConfigFields.Value(field)])
+
+
+def set_gain() -> Tuple[str, CameraConfig]:
+    config = CameraConfig()
+    config.camera.gain.ratio = random.random()
+    return "SetConfig", config
+
+
+def set_format() -> Tuple[str, CameraConfig]:
+    config = CameraConfig()
+    config.image.format.format = ImageFormats.Value("JPEG")
+    config.image.format.compression.value = random.uniform(0.5, 0.9)
+    return "SetConfig", config
+
+
+def set_color_space() -> Tuple[str, CameraConfig]:
+    # pauses the acquisition on a camera
+    config = CameraConfig()
+    config.image.color_space.value = random.choice([ColorSpaces.Value("RGB"),
+                                                    ColorSpaces.Value("GRAY")])
+    return "SetConfig", config
+
+
+OPERATIONS = {
+    "get_all": lambda: get_config("ALL"),
+    "get_image": lambda: get_config("IMAGE_SETTINGS"),
+    "get_camera": lambda: get_config("CAMERA_SETTINGS"),
+    "get_sampling": lambda: get_config("SAMPLING_SETTINGS"),
+    "set_gain": set_gain,
+    "set_format": set_format,
+    "set_color_space": set_color_space,
+}
+
+
+class LocalGateway(CameraGateway):
+
+    def __init__(self, broker: LocalBroker, **kwargs):
+        self.broker = broker
+        super().__init__(**kwargs)
+
+    def make_channel(self) -> Channel:
+        return LocalChannel(self.broker)
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for entry in mix.split(","):
+        name, _, weight = entry.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError("unknown operation '{}', expected one of {}".format(
+                name, ", ".join(OPERATIONS)))
+        weights[name] = float(weight or 1.0)
+    return weights
+
+
+def record(path: str, width: int, height: int, rate: float, n_frames: int = 60):
+    writer = RecordingWriter(path=path)
+    for i in range(n_frames):
+        data = np.random.randint(0, 255, (height, width), dtype=np.uint8)
+        writer.write(Frame(data=data, pixel_format="BayerRG8", frame_id=i, timestamp=i,
+                           host_timestamp=int((i + 1) * 1e9 / rate)))
+    writer.close()
+
+
+class FrameCounter(threading.Thread):
+
+    def __init__(self, broker: LocalBroker):
+        super().__init__(daemon=True)
+        self._channel = LocalChannel(broker)
+        subscription = Subscription(self._channel)
+        subscription.subscribe(topic="{}.Frame".format(SERVICE))
+        self.received: List[float] = []
+
+    def run(self):
+        while True:
+            self._channel.consume()
+            self.received.append(time.perf_counter())
+
+    def rate(self, start: float, end: float) -> float:
+        frames = len([t for t in self.received if start <= t < end])
+        return frames / (end - start)
+
+
+class Client(threading.Thread):
+
+    def __init__(self, broker: LocalBroker, weights: Dict[str, float], rate: float,
+                 timeout: float, deadline: float):
+        super().__init__(daemon=True)
+        self._channel = LocalChannel(broker)
+        self._subscription = Subscription(self._channel)
+        self._names = list(weights)
+        self._weights = [weights[name] for name in self._names]
+        self._period = 1.0 / rate if rate > 0 else 0.0
+        self._timeout = timeout
+        self._deadline = deadline
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self._names}
+        self.timeouts: Dict[str, int] = {name: 0 for name in self._names}
+        self.errors: Dict[str, int] = {name: 0 for name in self._names}
+
+    def call(self, name: str):
+        method, request = OPERATIONS[name]()
+        message = Message(content=request, reply_to=self._subscription)
+        message.timeout = self._timeout
+        started = time.perf_counter()
+        self._channel.publish(message, topic="{}.{}".format(SERVICE, method))
+        deadline = started + self._timeout
+        while True:
+            try:
+                reply = self._channel.consume(timeout=max(0.0, deadline - time.perf_counter()))
+            except socket.timeout:
+                self.timeouts[name] += 1
+                return
+            # replies to requests that already timed out are discarded
+            if reply.correlation_id == message.correlation_id:
+                break
+        self.latencies[name].append(time.perf_counter() - started)
+        if not reply.status.ok():
+            self.errors[name] += 1
+
+    def run(self):
+        # requests are sent at a fixed rate, or back to back when a reply takes longer
+        scheduled = time.perf_counter()
+        while scheduled < self._deadline:
+            self.call(random.choices(self._names, weights=self._weights)[0])
+            scheduled = max(scheduled + self._period, time.perf_counter())
+            time.sleep(max(0.0, scheduled - time.perf_counter()))
+
+
+def report(clients: List[Client], weights: Dict[str, float], duration: float) -> str:
+    lines = ["  {:<16} {:>8} {:>8} {:>10} {:>10} {:>10} {:>9} {:>7}".format(
+        "operation", "requests", "req/s", "p50 ms", "p99 ms", "max ms", "timeouts", "errors")]
+    for name in list(weights) + ["total"]:
+        names = list(weights) if name == "total" else [name]
+        latencies = np.array([
+            latency for client in clients for n in names for latency in client.latencies[n]
+        ]) * 1000.0
+        timeouts = sum(client.timeouts[n] for client in clients for n in names)
+        errors = sum(client.errors[n] for client in clients for n in names)
+        requests = len(latencies) + timeouts
+        if len(latencies) > 0:
+            p50, p99, worst = np.percentile(latencies, [50, 99]).tolist() + [latencies.max()]
+        else:
+            p50 = p99 = worst = float("nan")
+        lines.append("  {:<16} {:>8} {:>8.1f} {:>10.2f} {:>10.2f} {:>10.2f} {:>9} {:>7}".format(
+            name, requests, requests / duration, p50, p99, worst, timeouts, errors))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load test GetConfig/SetConfig of a gateway with a simulated camera, "
+        "connected to an in-process broker.")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent RPC clients")
+    parser.add_argument("--rate", type=float, default=20.0,
+                        help="requests per second of each client, 0 to send back to back")
+    parser.add_argument("--mix", type=parse_mix, default="get_all=4,set_gain=1",
+                        help="operations and their weights, e.g. 'get_all=4,set_gain=1'. "
+                        "Operations: {}".format(", ".join(OPERATIONS)))
+    parser.add_argument("--duration", type=float, default=10.0, help="load duration in seconds")
+    parser.add_argument("--baseline", type=float, default=5.0,
+                        help="seconds measuring the frame rate before the load")
+    parser.add_argument("--timeout", type=float, default=1.0, help="request timeout in seconds")
+    parser.add_argument("--fps", type=float, default=30.0, help="simulated camera frame rate")
+    parser.add_argument("--width", type=int, default=1288, help="simulated frame width")
+    parser.add_argument("--height", type=int, default=728, help="simulated frame height")
+    parser.add_argument("--recording", help="replay this recording instead of random frames")
+    args = parser.parse_args()
+
+    # keeps the per frame and per request logs out of the report, as well as failures to export
+    # traces, since there is no zipkin
+    os.environ.setdefault("LOG_LEVEL", "WARN")
+    logging.getLogger().setLevel(logging.CRITICAL)
+    for name in ["LogInterceptor", "ServiceProvider"]:
+        WireLogger(name=name, level=WireLogger.WARN)
+    logger = Logger(name="RpcBenchmark")
+
+    path = args.recording
+    if path is None:
+        path = tempfile.mkdtemp(prefix="is-spinnaker-gateway-bench-")
+        record(path=path, width=args.width, height=args.height, rate=args.fps)
+    broker = LocalBroker()
+    gateway = LocalGateway(
+        broker=broker,
+        logger=Logger(name="CameraGateway"),
+        broker_uri="amqp://localhost",
+        zipkin_uri="http://localhost:9411",
+        camera=Camera(id=0, replay_path=path),
+    )
+    counter = FrameCounter(broker)
+    counter.start()
+    threading.Thread(target=gateway.run, daemon=True).start()
+
+    # the gateway is ready once it publishes frames
+    while len(counter.received) == 0:
+        time.sleep(0.1)
+    started = time.perf_counter()
+    time.sleep(args.baseline)
+    loaded = time.perf_counter()
+    clients = [
+        Client(broker=broker, weights=args.mix, rate=args.rate, timeout=args.timeout,
+               deadline=loaded + args.duration) for _ in range(args.clients)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    finished = time.perf_counter()
+
+    baseline_rate = counter.rate(started, loaded)
+    loaded_rate = counter.rate(loaded, finished)
+    logger.warn("{} clients at {} req/s for {:.1f}s, timeout={}s\n{}\n  frame rate: {:.1f} fps "
+                "without load, {:.1f} fps under load ({:+.1f}%)".format(
+                    args.clients, args.rate, finished - loaded, args.timeout,
+                    report(clients, args.mix, finished - loaded), baseline_rate, loaded_rate,
+                    100.0 * (loaded_rate - baseline_rate) / baseline_rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import time
+from typing import Tuple
+
+import numpy as np
+
+
+class ChangeGate:
+
+    def __init__(self, threshold: float, keep_alive_rate: float = 1.0, step: int = 16):
+        self.threshold = threshold
+        self._keep_alive_period = 1.0 / keep_alive_rate if keep_alive_rate > 0 else None
+        # an even step keeps the same color filter position on Bayer frames
+        self._step = step
+        self._reference = None
+        self._published_at = 0.0
+
+    def downsample(self, array: np.ndarray) -> np.ndarray:
+        return array[::self._step, ::self._step].astype(np.int16)
+
+    def score(self, small: np.ndarray) -> float:
+        # Mean absolute difference, in [0, 1], between the downsampled frame and the last
+        # published one.
+        if self._reference is None or self._reference.shape != small.shape:
+            return 1.0
+        return float(np.mean(np.abs(small - self._reference))) / 255.0
+
+    def feed(self, array: np.ndarray) -> Tuple[bool, float]:
+        # Returns if the frame should be published and its change score. Frames are compared
+        # with the last published one, so slow changes still add up and get published.
+        small = self.downsample(array)
+        score = self.score(small)
+        now = time.perf_counter()
+        keep_alive = (self._keep_alive_period is not None
+                      and now - self._published_at >= self._keep_alive_period)
+        if score < self.threshold and not keep_alive:
+            return False, score
+        self._reference = small
+        self._published_at = now
+        return True, score
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: capabilities.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12\x63\x61pabilities.proto\"X\n\nCapability\x12\x10\n\x08readable\x18\x01 \x01(\x08\x12\x10\n\x08writable\x18\x02 \x01(\x08\x12\x0b\n\x03min\x18\x03 \x01(\x01\x12\x0b\n\x03max\x18\x04 \x01(\x01\x12\x0c\n\x04unit\x18\x05 \x01(\t\"{\n\x0c\x43\x61pabilities\x12-\n\x08settings\x18\x01 \x03(\x0b\x32\x1b.Capabilities.SettingsEntry\x1a<\n\rSettingsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1a\n\x05value\x18\x02 \x01(\x0b\x32\x0b.Capability:\x02\x38\x01\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'capabilities_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _CAPABILITIES_SETTINGSENTRY._options = None
+  _CAPABILITIES_SETTINGSENTRY._serialized_options = b'8\001'
+  _CAPABILITY._serialized_start=22
+  _CAPABILITY._serialized_end=110
+  _CAPABILITIES._serialized_start=112
+  _CAPABILITIES._serialized_end=235
+  _CAPABILITIES_SETTINGSENTRY._serialized_start=175
+  _CAPABILITIES_SETTINGSENTRY._serialized_end=235
+# @@protoc_insertion_point(module_scope)
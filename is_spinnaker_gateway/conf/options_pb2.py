@@ -12,19 +12,32 @@ _sym_db = _symbol_database.Default()
 
 
 from is_msgs import camera_pb2 as is__msgs_dot_camera__pb2
+from is_msgs import image_pb2 as is__msgs_dot_image__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\roptions.proto\x1a\x14is_msgs/camera.proto\"\xe8\x02\n\x06\x43\x61mera\x12\n\n\x02id\x18\x01 \x01(\r\x12\n\n\x02ip\x18\x02 \x01(\t\x12,\n\talgorithm\x18\x03 \x01(\x0e\x32\x19.ColorProcessingAlgorithm\x12 \n\x18onboard_color_processing\x18\x04 \x01(\x08\x12\x15\n\ruse_turbojpeg\x18\x05 \x01(\x08\x12\x13\n\x0bpacket_size\x18\x06 \x01(\x05\x12\x14\n\x0cpacket_delay\x18\x07 \x01(\x05\x12\x15\n\rpacket_resend\x18\x08 \x01(\x08\x12\x1d\n\x15packet_resend_timeout\x18\t \x01(\x05\x12\"\n\x1apacket_resend_max_requests\x18\n \x01(\x05\x12\x11\n\treverse_x\x18\x0b \x01(\x08\x12\x16\n\x0erestart_period\x18\x0c \x01(\x02\x12/\n\x0einitial_config\x18\r \x01(\x0b\x32\x17.is.vision.CameraConfig\"Y\n\x14\x43\x61meraGatewayOptions\x12\x14\n\x0crabbitmq_uri\x18\x01 \x01(\t\x12\x12\n\nzipkin_uri\x18\x02 \x01(\t\x12\x17\n\x06\x63\x61mera\x18\x03 \x01(\x0b\x32\x07.Camera*\xe0\x01\n\x18\x43olorProcessingAlgorithm\x12\x11\n\rNOT_SPECIFIED\x10\x00\x12\x14\n\x10NEAREST_NEIGHBOR\x10\x01\x12\x1c\n\x18NEAREST_NEIGHBOR_AVERAGE\x10\x02\x12\x10\n\x0c\x45\x44GE_SENSING\x10\x03\x12\r\n\tHQ_LINEAR\x10\x04\x12\x0c\n\x08\x42ILINEAR\x10\x05\x12\x16\n\x12\x44IRECTIONAL_FILTER\x10\x06\x12\x1f\n\x1bWEIGHTED_DIRECTIONAL_FILTER\x10\x07\x12\x0c\n\x08RIGOROUS\x10\x08\x12\x07\n\x03IPP\x10\tb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\roptions.proto\x1a\x14is_msgs/camera.proto\x1a\x13is_msgs/image.proto\"E\n\x05Video\x12\x0f\n\x07\x65nabled\x18\x01 \x01(\x08\x12\r\n\x05\x63odec\x18\x02 \x01(\t\x12\x0b\n\x03gop\x18\x03 \x01(\r\x12\x0f\n\x07\x62itrate\x18\x04 \x01(\r\"d\n\x06Stream\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\x12\n\ndecimation\x18\x02 \x01(\r\x12\x10\n\x08max_rate\x18\x03 \x01(\x02\x12&\n\x06\x66ormat\x18\x04 \x01(\x0b\x32\x16.is.vision.ImageFormat\"^\n\x05Spool\x12\x1c\n\x06policy\x18\x01 \x01(\x0e\x32\x0c.SpoolPolicy\x12\x12\n\nmax_frames\x18\x02 \x01(\r\x12\x15\n\rmax_megabytes\x18\x03 \x01(\r\x12\x0c\n\x04path\x18\x04 \x01(\t\"\xee\x08\n\x06\x43\x61mera\x12\n\n\x02id\x18\x01 \x01(\r\x12\n\n\x02ip\x18\x02 \x01(\t\x12,\n\talgorithm\x18\x03 \x01(\x0e\x32\x19.ColorProcessingAlgorithm\x12 \n\x18onboard_color_processing\x18\x04 \x01(\x08\x12\x15\n\ruse_turbojpeg\x18\x05 \x01(\x08\x12\x13\n\x0bpacket_size\x18\x06 \x01(\x05\x12\x14\n\x0cpacket_delay\x18\x07 \x01(\x05\x12\x15\n\rpacket_resend\x18\x08 \x01(\x08\x12\x1d\n\x15packet_resend_timeout\x18\t \x01(\x05\x12\"\n\x1apacket_resend_max_requests\x18\n \x01(\x05\x12\x11\n\treverse_x\x18\x0b \x01(\x08\x12\x16\n\x0erestart_period\x18\x0c \x01(\x02\x12/\n\x0einitial_config\x18\r \x01(\x0b\x32\x17.is.vision.CameraConfig\x12\x18\n\x10packet_auto_tune\x18\x0e \x01(\x08\x12\x1d\n\x15packet_auto_tune_path\x18\x0f \x01(\t\x12\x14\n\x0cmetrics_port\x18\x10 \x01(\r\x12\x1d\n\x15watchdog_max_failures\x18\x11 \x01(\r\x12\"\n\x1awatchdog_max_failure_ratio\x18\x12 \x01(\x02\x12\x13\n\x0brecord_path\x18\x13 \x01(\t\x12\x13\n\x0breplay_path\x18\x14 \x01(\t\x12\x18\n\x10replay_max_speed\x18\x15 \x01(\x08\x12\x11\n\ton_demand\x18\x16 \x01(\x08\x12\x17\n\x0fon_demand_lease\x18\x17 \x01(\x02\x12\x1b\n\x13on_demand_idle_rate\x18\x18 \x01(\x02\x12\x12\n\nchunk_data\x18\x19 \x01(\x08\x12#\n\rextra_outputs\x18\x1a \x03(\x0e\x32\x0c.ExtraOutput\x12\x18\n\x10\x63hange_threshold\x18\x1b \x01(\x02\x12\x1e\n\x16\x63hange_keep_alive_rate\x18\x1c \x01(\x02\x12\x15\n\x05video\x18\x1d \x01(\x0b\x32\x06.Video\x12\x18\n\x07streams\x18\x1e \x03(\x0b\x32\x07.Stream\x12\x14\n\x0cprofile_path\x18\x1f \x01(\t\x12,\n\x0f\x62uffer_handling\x18  \x01(\x0e\x32\x13.BufferHandlingMode\x12\x14\n\x0c\x62uffer_count\x18! \x01(\r\x12\x15\n\rsnapshot_mode\x18\" \x01(\x08\x12\x1b\n\x13user_set_warm_start\x18# \x01(\x08\x12\x15\n\ruser_set_path\x18$ \x01(\t\x12\x14\n\x0cjpeg_threads\x18% \x01(\r\x12\x18\n\x10\x61\x63quisition_cpus\x18& \x03(\r\x12\x14\n\x0c\x65ncoder_cpus\x18\' \x03(\r\x12%\n\x1d\x61\x63quisition_realtime_priority\x18( \x01(\r\x12\x18\n\x10\x61\x63quisition_nice\x18) \x01(\x05\x12\x15\n\x05spool\x18* \x01(\x0b\x32\x06.Spool\"Y\n\x14\x43\x61meraGatewayOptions\x12\x14\n\x0crabbitmq_uri\x18\x01 \x01(\t\x12\x12\n\nzipkin_uri\x18\x02 \x01(\t\x12\x17\n\x06\x63\x61mera\x18\x03 \x01(\x0b\x32\x07.Camera*\xe0\x01\n\x18\x43olorProcessingAlgorithm\x12\x11\n\rNOT_SPECIFIED\x10\x00\x12\x14\n\x10NEAREST_NEIGHBOR\x10\x01\x12\x1c\n\x18NEAREST_NEIGHBOR_AVERAGE\x10\x02\x12\x10\n\x0c\x45\x44GE_SENSING\x10\x03\x12\r\n\tHQ_LINEAR\x10\x04\x12\x0c\n\x08\x42ILINEAR\x10\x05\x12\x16\n\x12\x44IRECTIONAL_FILTER\x10\x06\x12\x1f\n\x1bWEIGHTED_DIRECTIONAL_FILTER\x10\x07\x12\x0c\n\x08RIGOROUS\x10\x08\x12\x07\n\x03IPP\x10\t*S\n\x12\x42ufferHandlingMode\x12\x0f\n\x0bNEWEST_ONLY\x10\x00\x12\x10\n\x0cOLDEST_FIRST\x10\x01\x12\x1a\n\x16OLDEST_FIRST_OVERWRITE\x10\x02**\n\x0bSpoolPolicy\x12\t\n\x05\x46LUSH\x10\x00\x12\x10\n\x0cSKIP_TO_LIVE\x10\x01*S\n\x0b\x45xtraOutput\x12\r\n\tNO_OUTPUT\x10\x00\x12\x08\n\x04GRAY\x10\x01\x12\r\n\tHALF_GRAY\x10\x02\x12\x07\n\x03RED\x10\x03\x12\t\n\x05GREEN\x10\x04\x12\x08\n\x04\x42LUE\x10\x05\x62\x06proto3')
 
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'options_pb2', globals())
 if _descriptor._USE_C_DESCRIPTORS == False:
 
   DESCRIPTOR._options = None
-  _COLORPROCESSINGALGORITHM._serialized_start=494
-  _COLORPROCESSINGALGORITHM._serialized_end=718
-  _CAMERA._serialized_start=40
-  _CAMERA._serialized_end=400
-  _CAMERAGATEWAYOPTIONS._serialized_start=402
-  _CAMERAGATEWAYOPTIONS._serialized_end=491
+  _COLORPROCESSINGALGORITHM._serialized_start=1558
+  _COLORPROCESSINGALGORITHM._serialized_end=1782
+  _BUFFERHANDLINGMODE._serialized_start=1784
+  _BUFFERHANDLINGMODE._serialized_end=1867
+  _SPOOLPOLICY._serialized_start=1869
+  _SPOOLPOLICY._serialized_end=1911
+  _EXTRAOUTPUT._serialized_start=1913
+  _EXTRAOUTPUT._serialized_end=1996
+  _VIDEO._serialized_start=60
+  _VIDEO._serialized_end=129
+  _STREAM._serialized_start=131
+  _STREAM._serialized_end=231
+  _SPOOL._serialized_start=233
+  _SPOOL._serialized_end=327
+  _CAMERA._serialized_start=330
+  _CAMERA._serialized_end=1464
+  _CAMERAGATEWAYOPTIONS._serialized_start=1466
+  _CAMERAGATEWAYOPTIONS._serialized_end=1555
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,14 @@
+import time
+
+
+class Demand:
+
+    def __init__(self, lease: float = 5.0):
+        self._lease = lease
+        self._expires = 0.0
+
+    def renew(self):
+        self._expires = time.perf_counter() + self._lease
+
+    def active(self) -> bool:
+        return time.perf_counter() < self._expires
@@ -1,16 +1,23 @@
-from typing import Any
+from typing import Any, Dict, Optional
 
 from is_wire.core import StatusCode
 from google.protobuf.wrappers_pb2 import FloatValue, Int64Value
 
 from is_msgs.camera_pb2 import CameraSetting
-from is_msgs.image_pb2 import Image, Resolution, ColorSpace, ImageFormat, BoundingPoly
+from is_msgs.image_pb2 import Resolution, ColorSpace, ImageFormat, BoundingPoly
 
+from is_spinnaker_gateway.profiler import StageTimers
 from is_spinnaker_gateway.exceptions import StatusException
+from is_spinnaker_gateway.driver.serialization import EncodedImage
+from is_spinnaker_gateway.conf.capabilities_pb2 import Capability
 
 
 class CameraDriver:
 
+    def __init__(self):
+        # shared with the gateway while profiling
+        self.timers = StageTimers()
+
     def get_resolution(self) -> Resolution:
         raise StatusException(
             code=StatusCode.UNIMPLEMENTED,
@@ -251,14 +258,50 @@ class CameraDriver:
             message="StreamChannelID property not implemented for this camera.",
         )
 
+    def get_capabilities(self) -> Dict[str, Capability]:
+        raise NotImplementedError("Driver subclass must implement 'get_capabilities' method.")
+
     def start_capture(self):
         raise NotImplementedError("Driver subclass must implement 'start_capture' method.")
 
     def stop_capture(self):
         raise NotImplementedError("Driver subclass must implement 'stop_capture' method.")
 
+    def is_streaming(self) -> bool:
+        raise NotImplementedError("Driver subclass must implement 'is_streaming' method.")
+
+    def flush_buffers(self) -> int:
+        raise NotImplementedError("Driver subclass must implement 'flush_buffers' method.")
+
+    def set_triggered(self, triggered: bool):
+        raise NotImplementedError("Driver subclass must implement 'set_triggered' method.")
+
+    def trigger(self):
+        raise NotImplementedError("Driver subclass must implement 'trigger' method.")
+
     def grab_image(self) -> Any:
         raise NotImplementedError("Driver subclass must implement 'grab_image' method.")
 
-    def to_image(self, image: Any) -> Image:
+    def to_image(self, image: Any) -> EncodedImage:
         raise NotImplementedError("Driver subclass must implement 'to_image' method.")
+
+    def to_array(self, image: Any) -> Any:
+        raise NotImplementedError("Driver subclass must implement 'to_array' method.")
+
+    def encode(self,
+               array: Any,
+               color_space: Optional[int] = None,
+               image_format: Optional[ImageFormat] = None) -> EncodedImage:
+        raise NotImplementedError("Driver subclass must implement 'encode' method.")
+
+    def release_image(self, image: Any):
+        raise NotImplementedError("Driver subclass must implement 'release_image' method.")
+
+    def get_metadata(self, image: Any) -> Dict[str, Any]:
+        raise NotImplementedError("Driver subclass must implement 'get_metadata' method.")
+
+    def to_frame(self, image: Any) -> Any:
+        raise NotImplementedError("Driver subclass must implement 'to_frame' method.")
+
+    def get_stream_statistics(self) -> Dict[str, int]:
+        raise NotImplementedError("Driver subclass must implement 'get_stream_statistics' method.")
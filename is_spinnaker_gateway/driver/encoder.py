@@ -0,0 +1,58 @@
+from typing import Optional, Sequence, Union
+
+import cv2
+import numpy as np
+
+from is_msgs.image_pb2 import ColorSpaces, ImageFormats
+
+from is_spinnaker_gateway.driver import lossless
+from is_spinnaker_gateway.driver.tiled import TiledJpegEncoder
+
+
+class ImageEncoder:
+
+    def __init__(self,
+                 use_turbojpeg: bool,
+                 jpeg_threads: int = 1,
+                 encoder_cpus: Sequence[int] = ()):
+        self._turbojpeg = None
+        if use_turbojpeg:
+            # loads libturbojpeg, only done when it is going to be used
+            from turbojpeg import TurboJPEG
+            self._turbojpeg = TurboJPEG()
+        self._tiled = None
+        if jpeg_threads > 1:
+            self._tiled = TiledJpegEncoder(threads=jpeg_threads, cpus=encoder_cpus)
+
+    def encode(self, array: np.ndarray, encode_format: int, compression_level: float,
+               color_space: int) -> Optional[Union[bytes, np.ndarray]]:
+        # OpenCV buffers are returned as they are, they are only copied when serialized
+        if encode_format == ImageFormats.Value("JPEG"):
+            quality = int(compression_level * (100 - 0) + 0)
+            if self._tiled is not None:
+                return self._tiled.encode(
+                    array, lambda band: self.encode_jpeg(band, quality, color_space))
+            return self.encode_jpeg(array, quality, color_space)
+        elif encode_format == ImageFormats.Value("PNG"):
+            ext = ".png"
+            params = [cv2.IMWRITE_PNG_COMPRESSION, int(compression_level * (9 - 0) + 0)]
+        elif encode_format == lossless.RAW_ZSTD:
+            return lossless.encode(array, lossless.compression_to_level(compression_level))
+        elif encode_format == ImageFormats.Value("WebP"):
+            ext = ".webp"
+            params = [cv2.IMWRITE_WEBP_QUALITY, int(compression_level * (100 - 1) + 1)]
+        else:
+            return None
+        cimage = cv2.imencode(ext=ext, img=array, params=params)
+        return cimage[1]
+
+    def close(self):
+        # workers of a driver being replaced must not outlive it
+        if self._tiled is not None:
+            self._tiled.close()
+
+    def encode_jpeg(self, array: np.ndarray, quality: int,
+                    color_space: int) -> Union[bytes, np.ndarray]:
+        if self._turbojpeg is not None and color_space == ColorSpaces.Value("RGB"):
+            return self._turbojpeg.encode(array, quality=quality)
+        return cv2.imencode(ext=".jpeg", img=array, params=[cv2.IMWRITE_JPEG_QUALITY, quality])[1]
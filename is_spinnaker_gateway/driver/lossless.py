@@ -0,0 +1,39 @@
+import struct
+
+import numpy as np
+
+# Image format of raw frames compressed with Zstandard. The `ImageFormats` enum of is_msgs has no
+# value for it, but proto3 enums keep unknown values, so it is set as is on `ImageFormat.format`.
+RAW_ZSTD = 3
+MAGIC = b"ISZ1"
+# magic, height, width and channels, followed by the compressed pixels
+HEADER = struct.Struct("<4sIIB")
+
+
+def compression_to_level(compression_level: float) -> int:
+    # Zstandard levels above 9 are much slower for a marginal gain on camera frames
+    return int(compression_level * (9 - 1) + 1)
+
+
+def encode(array: np.ndarray, level: int) -> bytes:
+    # Each pixel is stored as the difference to its left neighbour (modulo 256), which turns
+    # smooth image regions into runs of small values that compress much better.
+    import zstandard
+    height, width = array.shape[:2]
+    channels = 1 if array.ndim == 2 else array.shape[2]
+    delta = np.empty_like(array)
+    delta[:, 0] = array[:, 0]
+    np.subtract(array[:, 1:], array[:, :-1], out=delta[:, 1:])
+    compressed = zstandard.ZstdCompressor(level=level).compress(delta)
+    return b"".join((HEADER.pack(MAGIC, height, width, channels), compressed))
+
+
+def decode(data: bytes) -> np.ndarray:
+    import zstandard
+    magic, height, width, channels = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a raw Zstandard frame")
+    pixels = zstandard.ZstdDecompressor().decompress(memoryview(data)[HEADER.size:])
+    shape = (height, width) if channels == 1 else (height, width, channels)
+    delta = np.frombuffer(pixels, dtype=np.uint8).reshape(shape)
+    return np.cumsum(delta, axis=1, dtype=np.uint8)
@@ -0,0 +1,47 @@
+from typing import List, Tuple
+
+import cv2
+import numpy as np
+
+from is_spinnaker_gateway.conf.options_pb2 import ExtraOutput
+
+TOPIC_SUFFIXES = {
+    ExtraOutput.Value("GRAY"): "Gray",
+    ExtraOutput.Value("HALF_GRAY"): "HalfGray",
+    ExtraOutput.Value("RED"): "Red",
+    ExtraOutput.Value("GREEN"): "Green",
+    ExtraOutput.Value("BLUE"): "Blue",
+}
+# channel index on BGR arrays
+CHANNELS = {
+    ExtraOutput.Value("BLUE"): 0,
+    ExtraOutput.Value("GREEN"): 1,
+    ExtraOutput.Value("RED"): 2,
+}
+
+
+class ExtraOutputs:
+
+    def __init__(self, outputs: List[ExtraOutput]):
+        self.outputs = [output for output in outputs if output in TOPIC_SUFFIXES]
+
+    def derive(self, array: np.ndarray) -> List[Tuple[str, np.ndarray]]:
+        # Derived from the converted BGR (or GRAY) array, so all outputs share a single
+        # debayer. Returns the topic suffix and the single channel array of each output.
+        derived = []
+        gray = None
+        for output in self.outputs:
+            if output in CHANNELS:
+                if array.ndim == 3:
+                    derived.append((TOPIC_SUFFIXES[output], cv2.extractChannel(array,
+                                                                               CHANNELS[output])))
+                continue
+            if gray is None:
+                gray = cv2.cvtColor(array, cv2.COLOR_BGR2GRAY) if array.ndim == 3 else array
+            if output == ExtraOutput.Value("GRAY"):
+                derived.append((TOPIC_SUFFIXES[output], gray))
+            else:
+                height, width = gray.shape[:2]
+                half = cv2.resize(gray, (width // 2, height // 2), interpolation=cv2.INTER_AREA)
+                derived.append((TOPIC_SUFFIXES[output], half))
+        return derived
@@ -0,0 +1,163 @@
+import os
+import json
+import mmap
+import time
+import queue
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from is_spinnaker_gateway.logger import Logger
+
+# A recording is a directory with three files:
+#   frames.bin      raw frames, appended back to back.
+#   index.bin       one INDEX_DTYPE record per frame, appended after its data is written, so a
+#                   crash never leaves an index entry pointing to missing data.
+#   recording.json  format version.
+# Both binary files can be memory mapped, frames are read without copies.
+FRAMES_FILE = "frames.bin"
+INDEX_FILE = "index.bin"
+INFO_FILE = "recording.json"
+VERSION = 1
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "<u8"),
+    ("size", "<u8"),
+    ("host_timestamp", "<u8"),
+    ("timestamp", "<u8"),
+    ("frame_id", "<u8"),
+    ("height", "<u4"),
+    ("width", "<u4"),
+    ("channels", "<u2"),
+    ("pixel_format", "<u2"),
+    ("reserved", "<u4"),
+])
+
+PIXEL_FORMATS = {
+    "Unknown": 0,
+    "BayerRG8": 1,
+    "Mono8": 2,
+    "RGB8Packed": 3,
+    "BGR8": 4,
+}
+PIXEL_FORMAT_NAMES = {value: name for name, value in PIXEL_FORMATS.items()}
+
+
+class Frame(NamedTuple):
+    data: np.ndarray
+    pixel_format: str
+    frame_id: int
+    # device timestamp, in nanoseconds
+    timestamp: int
+    # host timestamp, in nanoseconds, when the frame was recorded
+    host_timestamp: int = 0
+
+
+class RecordingWriter:
+
+    def __init__(self, path: str, max_queued: int = 64):
+        self._logger = Logger("RecordingWriter")
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, INFO_FILE), 'w') as f:
+            json.dump({"version": VERSION}, f)
+        self._frames = open(os.path.join(path, FRAMES_FILE), 'ab')
+        self._index = open(os.path.join(path, INDEX_FILE), 'ab')
+        self._offset = self._frames.tell()
+        self._queue = queue.Queue(maxsize=max_queued)
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="RecordingWriter", daemon=True)
+        self._thread.start()
+
+    def write(self, frame: Frame):
+        # Never blocks the caller: frames that do not fit in the queue are dropped and counted.
+        # The data is copied, since it usually points to a buffer owned by the camera stream.
+        if frame.host_timestamp == 0:
+            frame = frame._replace(host_timestamp=time.time_ns())
+        try:
+            self._queue.put_nowait(frame._replace(data=np.array(frame.data, copy=True)))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        entry = np.zeros(1, dtype=INDEX_DTYPE)
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            data = np.ascontiguousarray(frame.data)
+            self._frames.write(memoryview(data).cast("B"))
+            entry["offset"] = self._offset
+            entry["size"] = data.nbytes
+            entry["host_timestamp"] = frame.host_timestamp
+            entry["timestamp"] = frame.timestamp
+            entry["frame_id"] = frame.frame_id
+            entry["height"] = data.shape[0]
+            entry["width"] = data.shape[1]
+            entry["channels"] = data.shape[2] if data.ndim > 2 else 1
+            entry["pixel_format"] = PIXEL_FORMATS.get(frame.pixel_format, 0)
+            self._frames.flush()
+            self._index.write(entry.tobytes())
+            self._index.flush()
+            self._offset += data.nbytes
+            self.written += 1
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+        self._frames.close()
+        self._index.close()
+        self._logger.info("Recording closed, written={}, dropped={}", self.written, self.dropped)
+
+
+class RecordingReader:
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, INFO_FILE), 'r') as f:
+            version = json.load(f)["version"]
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version '{version}'")
+        index_path = os.path.join(path, INDEX_FILE)
+        # ignores a partially written entry at the end of the index
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize
+        if count > 0:
+            self.index = np.memmap(index_path, dtype=INDEX_DTYPE, mode='r', shape=(count, ))
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._file = open(os.path.join(path, FRAMES_FILE), 'rb')
+        self._frames = None
+        if os.path.getsize(self._file.name) > 0:
+            self._frames = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> Frame:
+        entry = self.index[i]
+        shape = (int(entry["height"]), int(entry["width"]))
+        if entry["channels"] > 1:
+            shape = shape + (int(entry["channels"]), )
+        data = np.frombuffer(self._frames, dtype=np.uint8, count=int(entry["size"]),
+                             offset=int(entry["offset"])).reshape(shape)
+        return Frame(
+            data=data,
+            pixel_format=PIXEL_FORMAT_NAMES.get(int(entry["pixel_format"]), "Unknown"),
+            frame_id=int(entry["frame_id"]),
+            timestamp=int(entry["timestamp"]),
+            host_timestamp=int(entry["host_timestamp"]),
+        )
+
+    def sampling_rate(self) -> Optional[float]:
+        if len(self.index) < 2:
+            return None
+        elapsed = int(self.index[-1]["host_timestamp"]) - int(self.index[0]["host_timestamp"])
+        if elapsed <= 0:
+            return None
+        return (len(self.index) - 1) * 1e9 / elapsed
+
+    def close(self):
+        # views returned by __getitem__ keep the mapping alive until they are released
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self._frames = None
+        self._file.close()
@@ -0,0 +1,336 @@
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from is_wire.core import StatusCode
+from google.protobuf.wrappers_pb2 import FloatValue
+
+from is_msgs.camera_pb2 import CameraSetting
+from is_msgs.image_pb2 import (
+    ColorSpace,
+    ColorSpaces,
+    ImageFormat,
+    ImageFormats,
+    BoundingPoly,
+)
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.driver import lossless
+from is_spinnaker_gateway.driver.base import CameraDriver
+from is_spinnaker_gateway.driver.encoder import ImageEncoder
+from is_spinnaker_gateway.driver.serialization import EncodedImage
+from is_spinnaker_gateway.exceptions import StatusException
+from is_spinnaker_gateway.conf.capabilities_pb2 import Capability
+from is_spinnaker_gateway.driver.recording import Frame, RecordingReader
+
+# OpenCV names Bayer patterns after the second row, so an RGGB sensor (BayerRG8) is BayerBG.
+BAYER_TO_BGR = cv2.COLOR_BayerBG2BGR
+BAYER_TO_GRAY = cv2.COLOR_BayerBG2GRAY
+# CameraConfig field names of the camera settings kept for a recording
+SETTINGS = {
+    "brightness": "Brightness",
+    "gain": "Gain",
+    "shutter": "Shutter",
+    "white_balance_bu": "WhiteBalanceBU",
+    "white_balance_rv": "WhiteBalanceRV",
+}
+
+
+class ReplayDriver(CameraDriver):
+
+    def __init__(self,
+                 path: str,
+                 use_turbojpeg: bool,
+                 compression_level: float,
+                 max_speed: bool = False,
+                 loop: bool = True,
+                 jpeg_threads: int = 1,
+                 encoder_cpus: Sequence[int] = ()):
+        super().__init__()
+        self._logger = Logger("ReplayDriver")
+        self._path = path
+        self._reader = RecordingReader(path)
+        self._encoder = ImageEncoder(use_turbojpeg=use_turbojpeg,
+                                     jpeg_threads=jpeg_threads,
+                                     encoder_cpus=encoder_cpus)
+        self._compression_level = compression_level
+        self._color_space = ColorSpaces.Value("RGB")
+        self._encode_format = ImageFormats.Value("JPEG")
+        self._max_speed = max_speed
+        self._sampling_rate = None if max_speed else self._reader.sampling_rate()
+        self._loop = loop
+        self._region = None
+        self._settings: Dict[str, CameraSetting] = {}
+        self._position = 0
+        self._clock = None
+        self._streaming = False
+        self._triggered = False
+        self._triggers = 0
+
+    def connect(self, ip: str = ""):
+        self._logger.info("Replaying {} frames from '{}'", len(self._reader), self._path)
+
+    def close(self):
+        self._streaming = False
+        self._reader.close()
+        self._encoder.close()
+
+    def get_capabilities(self) -> Dict[str, Capability]:
+        capabilities = {
+            "color_space": Capability(readable=True, writable=True),
+            "format": Capability(readable=True, writable=True, min=0.0, max=1.0),
+            "region": Capability(readable=True, writable=True),
+            "frequency": Capability(readable=self._sampling_rate is not None, writable=True),
+        }
+        for field, name in SETTINGS.items():
+            capabilities[field] = Capability(readable=name in self._settings, writable=True)
+        return capabilities
+
+    def start_capture(self):
+        self._streaming = True
+        self._clock = None
+
+    def stop_capture(self):
+        self._streaming = False
+
+    def is_streaming(self) -> bool:
+        return self._streaming
+
+    def flush_buffers(self) -> int:
+        return 0
+
+    def get_stream_statistics(self) -> Dict[str, int]:
+        return {}
+
+    def wait(self, wait: bool, timeout: Optional[int]):
+        if wait and timeout is not None:
+            time.sleep(timeout / 1000.0)
+
+    def set_triggered(self, triggered: bool):
+        self._triggered = triggered
+        self._triggers = 0
+
+    def trigger(self):
+        # as with a camera, triggers are ignored while not streaming
+        if self._streaming:
+            self._triggers += 1
+
+    def grab_image(self, wait: bool = True, timeout: Optional[int] = None) -> Optional[Frame]:
+        if not self._streaming or len(self._reader) == 0:
+            self.wait(wait, timeout)
+            return None
+        if self._triggered:
+            # the next recorded frame is captured on each trigger, without the recorded timing
+            if self._triggers == 0:
+                self.wait(wait, timeout)
+                return None
+            self._triggers -= 1
+            self._position %= len(self._reader)
+            frame = self._reader[self._position]
+            self._position += 1
+            return frame
+        if self._position >= len(self._reader):
+            if not self._loop:
+                self.wait(wait, timeout)
+                return None
+            self._position = 0
+            self._clock = None
+        frame = self._reader[self._position]
+        if not self._max_speed:
+            # keeps the original interval between frames, measured on the recording host
+            now = time.perf_counter_ns()
+            if self._clock is None:
+                self._clock = (now, frame.host_timestamp)
+            due = self._clock[0] + (frame.host_timestamp - self._clock[1])
+            if due > now:
+                if not wait:
+                    return None
+                if timeout is not None and (due - now) > timeout * 1000000:
+                    self.wait(wait, timeout)
+                    return None
+                time.sleep((due - now) / 1e9)
+        self._position += 1
+        return frame
+
+    def crop(self, frame: Frame) -> np.ndarray:
+        if self._region is None:
+            return frame.data
+        x, y, width, height = self._region
+        if frame.pixel_format == "BayerRG8":
+            # keeps the color filter pattern
+            x, y = x - x % 2, y - y % 2
+        return frame.data[y:y + height, x:x + width]
+
+    def to_array(self, image: Frame) -> np.ndarray:
+        array = self.convert(image)
+        self.timers.mark("convert")
+        return array
+
+    def convert(self, image: Frame) -> np.ndarray:
+        array = self.crop(image)
+        rgb = self._color_space == ColorSpaces.Value("RGB")
+        if image.pixel_format == "BayerRG8":
+            return cv2.cvtColor(array, BAYER_TO_BGR if rgb else BAYER_TO_GRAY)
+        if image.pixel_format == "Mono8":
+            return cv2.cvtColor(array, cv2.COLOR_GRAY2BGR) if rgb else array
+        if image.pixel_format == "RGB8Packed":
+            return cv2.cvtColor(array, cv2.COLOR_RGB2BGR if rgb else cv2.COLOR_RGB2GRAY)
+        if image.pixel_format == "BGR8":
+            return array if rgb else cv2.cvtColor(array, cv2.COLOR_BGR2GRAY)
+        raise StatusException(
+            code=StatusCode.INTERNAL_ERROR,
+            message=f"Pixel format '{image.pixel_format}' can not be replayed.",
+        )
+
+    def to_image(self, image: Frame) -> EncodedImage:
+        return self.encode(array=self.to_array(image))
+
+    def encode(self,
+               array: np.ndarray,
+               color_space: Optional[int] = None,
+               image_format: Optional[ImageFormat] = None) -> EncodedImage:
+        # defaults to the configured color space and format
+        encode_format, compression_level = self._encode_format, self._compression_level
+        if image_format is not None:
+            encode_format = image_format.format
+            if image_format.HasField("compression"):
+                compression_level = image_format.compression.value
+        data = self._encoder.encode(
+            array=array,
+            encode_format=encode_format,
+            compression_level=compression_level,
+            color_space=self._color_space if color_space is None else color_space,
+        )
+        self.timers.mark("encode")
+        if data is None:
+            return EncodedImage()
+        return EncodedImage(data)
+
+    def release_image(self, image: Frame):
+        pass
+
+    def get_metadata(self, image: Frame) -> Dict[str, Any]:
+        return {"frame_id": image.frame_id, "timestamp": image.timestamp}
+
+    def to_frame(self, image: Frame) -> Frame:
+        return image
+
+    def get_sampling_rate(self) -> FloatValue:
+        if self._sampling_rate is None:
+            raise StatusException(
+                code=StatusCode.UNIMPLEMENTED,
+                message="SamplingRate property not available for this recording.",
+            )
+        return FloatValue(value=self._sampling_rate)
+
+    def set_sampling_rate(self, sampling_rate: FloatValue):
+        # the recorded timing is kept
+        pass
+
+    def get_color_space(self) -> ColorSpace:
+        return ColorSpace(value=self._color_space)
+
+    def set_color_space(self, color_space: ColorSpace):
+        if color_space.value not in (ColorSpaces.Value("RGB"), ColorSpaces.Value("GRAY")):
+            raise StatusException(
+                code=StatusCode.FAILED_PRECONDITION,
+                message="'ColorSpace' property only accept RGB or GRAY values.",
+            )
+        self._color_space = color_space.value
+
+    def get_format(self) -> ImageFormat:
+        image_format = ImageFormat()
+        image_format.format = self._encode_format
+        image_format.compression.value = self._compression_level
+        return image_format
+
+    def set_format(self, image_format: ImageFormat):
+        if image_format.format not in (ImageFormats.Value("JPEG"), ImageFormats.Value("PNG"),
+                                       ImageFormats.Value("WebP"), lossless.RAW_ZSTD):
+            raise StatusException(
+                code=StatusCode.FAILED_PRECONDITION,
+                message="'ImageFormat' property only accept JPEG, PNG, WebP or RAW_ZSTD values.",
+            )
+        if not 0 < image_format.compression.value < 1:
+            raise StatusException(
+                code=StatusCode.FAILED_PRECONDITION,
+                message="Compression value must be greater than zero and less than one.",
+            )
+        self._encode_format = image_format.format
+        self._compression_level = image_format.compression.value
+
+    def get_region_of_interest(self) -> BoundingPoly:
+        if self._region is None:
+            if len(self._reader) == 0:
+                return BoundingPoly()
+            height, width = self._reader[0].data.shape[:2]
+            region = (0, 0, width, height)
+        else:
+            region = self._region
+        roi = BoundingPoly()
+        roi.vertices.add(x=region[0], y=region[1])
+        roi.vertices.add(x=region[0] + region[2], y=region[1] + region[3])
+        return roi
+
+    def set_region_of_interest(self, roi: BoundingPoly):
+        if len(roi.vertices) != 2:
+            raise StatusException(
+                code=StatusCode.INVALID_ARGUMENT,
+                message="'RegionOfInterest' property must have 2 vertices.",
+            )
+        top_left, bottom_right = roi.vertices
+        if (top_left.x >= bottom_right.x) or (top_left.y >= bottom_right.y):
+            raise StatusException(
+                code=StatusCode.INVALID_ARGUMENT,
+                message="'RegionOfInterest' property must have acceptable vertices.",
+            )
+        self._region = (
+            int(top_left.x),
+            int(top_left.y),
+            int(bottom_right.x - top_left.x),
+            int(bottom_right.y - top_left.y),
+        )
+
+    # Camera settings have no effect on recorded frames, they are only kept to be reported.
+    def get_setting(self, name: str) -> CameraSetting:
+        if name not in self._settings:
+            raise StatusException(
+                code=StatusCode.UNIMPLEMENTED,
+                message=f"{name} property not set for this recording.",
+            )
+        return self._settings[name]
+
+    def set_setting(self, name: str, setting: CameraSetting):
+        self._settings[name] = CameraSetting(automatic=setting.automatic, ratio=setting.ratio)
+
+    def get_brightness(self) -> CameraSetting:
+        return self.get_setting("Brightness")
+
+    def set_brightness(self, brightness: CameraSetting):
+        self.set_setting("Brightness", brightness)
+
+    def get_gain(self) -> CameraSetting:
+        return self.get_setting("Gain")
+
+    def set_gain(self, gain: CameraSetting):
+        self.set_setting("Gain", gain)
+
+    def get_shutter(self) -> CameraSetting:
+        return self.get_setting("Shutter")
+
+    def set_shutter(self, shutter: CameraSetting):
+        self.set_setting("Shutter", shutter)
+
+    def get_white_balance_bu(self) -> CameraSetting:
+        return self.get_setting("WhiteBalanceBU")
+
+    def set_white_balance_bu(self, white_balance_bu: CameraSetting):
+        self.set_setting("WhiteBalanceBU", white_balance_bu)
+
+    def get_white_balance_rv(self) -> CameraSetting:
+        return self.get_setting("WhiteBalanceRV")
+
+    def set_white_balance_rv(self, white_balance_rv: CameraSetting):
+        self.set_setting("WhiteBalanceRV", white_balance_rv)
@@ -0,0 +1,47 @@
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Key of the `data` field of `is.vision.Image`: field number 1, length delimited wire type.
+DATA_KEY = b"\x0a"
+
+
+def encode_varint(value: int) -> bytes:
+    varint = bytearray()
+    while value > 0x7F:
+        varint.append((value & 0x7F) | 0x80)
+        value >>= 7
+    varint.append(value)
+    return bytes(varint)
+
+
+class EncodedImage:
+    # Stands for an `Image` holding only encoded data. Serializes into the same bytes as
+    # `Image(data=...).SerializeToString()`, but directly from the encoder output buffer, so the
+    # encoded frame is copied once into the message body instead of into a protobuf field first
+    # and again when serializing it.
+
+    def __init__(self, buffer: Optional[Union[bytes, "np.ndarray"]] = None):
+        # without a buffer, the data field is not set at all, as in `Image()`
+        self._view = None
+        if buffer is not None:
+            view = memoryview(buffer)
+            # flat view of the bytes, e.g. OpenCV returns a column of bytes
+            self._view = view.cast("B") if view.nbytes > 0 else memoryview(b"")
+
+    @property
+    def data(self) -> bytes:
+        # a copy, only for consumers that need the encoded bytes themselves
+        return b"" if self._view is None else self._view.tobytes()
+
+    def ByteSize(self) -> int:
+        if self._view is None:
+            return 0
+        size = self._view.nbytes
+        return len(DATA_KEY) + len(encode_varint(size)) + size
+
+    def SerializeToString(self) -> bytes:
+        if self._view is None:
+            return b""
+        return b"".join((DATA_KEY, encode_varint(self._view.nbytes), self._view))
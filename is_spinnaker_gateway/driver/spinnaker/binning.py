@@ -0,0 +1,18 @@
+from typing import Sequence, Tuple
+
+
+def choose_factors(sensor: int, requested: int, binnings: Sequence[int],
+                   decimations: Sequence[int]) -> Tuple[int, int]:
+    # Returns the binning and decimation factors of the largest reduction that still keeps at
+    # least `requested` pixels out of `sensor`. Binning is preferred for the same reduction, it
+    # combines neighboring pixels instead of skipping them, so it keeps more signal.
+    best = (1, 1)
+    for binning in binnings:
+        for decimation in decimations:
+            factor = binning * decimation
+            if sensor // factor < requested:
+                continue
+            best_factor = best[0] * best[1]
+            if factor > best_factor or (factor == best_factor and binning > best[0]):
+                best = (binning, decimation)
+    return best
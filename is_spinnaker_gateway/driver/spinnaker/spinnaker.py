@@ -1,49 +1,91 @@
-from typing import Union, List
+from typing import Union, List, Dict, Tuple, Optional, Sequence
 
-import cv2
 import PySpin
 import numpy as np
 
-from turbojpeg import TurboJPEG
 from is_wire.core import Status, StatusCode
 from google.protobuf.wrappers_pb2 import FloatValue
 
 from is_msgs.camera_pb2 import CameraSetting
 from is_msgs.image_pb2 import (
-    Image,
     ColorSpace,
     ColorSpaces,
     ImageFormat,
     ImageFormats,
     BoundingPoly,
+    Resolution,
 )
 
 from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.driver import lossless
 from is_spinnaker_gateway.driver.base import CameraDriver
+from is_spinnaker_gateway.driver.encoder import ImageEncoder
+from is_spinnaker_gateway.driver.serialization import EncodedImage
+from is_spinnaker_gateway.driver.recording import Frame
+from is_spinnaker_gateway.driver.spinnaker.binning import choose_factors
 from is_spinnaker_gateway.exceptions import StatusException
-from is_spinnaker_gateway.conf.options_pb2 import ColorProcessingAlgorithm
+from is_spinnaker_gateway.conf.options_pb2 import ColorProcessingAlgorithm, BufferHandlingMode
+from is_spinnaker_gateway.conf.capabilities_pb2 import Capability
 from is_spinnaker_gateway.driver.spinnaker.utils import (
     set_op_enum,
     get_op_enum,
     get_op_int,
     set_op_int,
+    get_op_str,
+    get_op_bool,
     get_op_float,
     set_op_float,
     set_op_bool,
+    execute_op,
     minmax_op_int,
     minmax_op_float,
+    unit_op_float,
+    access_op,
     get_value,
     get_ratio,
 )
 
+STREAM_STATISTICS = [
+    "StreamReceivedFrameCount",
+    "StreamIncompleteFrameCount",
+    "StreamLostFrameCount",
+    "StreamReceivedPacketCount",
+    "StreamPacketResendRequestedPacketCount",
+    "StreamPacketResendReceivedPacketCount",
+    "StreamBufferUnderrunCount",
+    "StreamDroppedFrameCount",
+]
+
+BUFFER_HANDLING = {
+    BufferHandlingMode.Value("NEWEST_ONLY"): "NewestOnly",
+    BufferHandlingMode.Value("OLDEST_FIRST"): "OldestFirst",
+    BufferHandlingMode.Value("OLDEST_FIRST_OVERWRITE"): "OldestFirstOverwrite",
+}
+
+# sensor size node and on-sensor pixel reduction nodes of each image axis
+RESOLUTION_AXES = {
+    "Horizontal": "SensorWidth",
+    "Vertical": "SensorHeight",
+}
+
+# Chunks appended by the camera to each frame, read with `ImagePtr.GetChunkData`.
+CHUNKS = ["ExposureTime", "Gain", "FrameID", "Timestamp"]
+
 
 class SpinnakerDriver(CameraDriver):
 
-    def __init__(self, use_turbojpeg: bool, compression_level: float,
-                 onboard_color_processing: bool, color_algorithm: ColorProcessingAlgorithm):
+    def __init__(self,
+                 use_turbojpeg: bool,
+                 compression_level: float,
+                 onboard_color_processing: bool,
+                 color_algorithm: ColorProcessingAlgorithm,
+                 jpeg_threads: int = 1,
+                 encoder_cpus: Sequence[int] = ()):
         super().__init__()
         self._logger = Logger("SpinnakerDriver")
-        self._encoder = TurboJPEG()
+        self._encoder = ImageEncoder(use_turbojpeg=use_turbojpeg,
+                                     jpeg_threads=jpeg_threads,
+                                     encoder_cpus=encoder_cpus)
         self._use_turbojpeg = use_turbojpeg
         self._compression_level = compression_level
         self._color_space = ColorSpaces.Value("RGB")
@@ -96,19 +138,23 @@ class SpinnakerDriver(CameraDriver):
             self._processor.SetColorProcessing(PySpin.SPINNAKER_COLOR_PROCESSING_ALGORITHM_NONE)
         self.running = False
         self.initied = False
-
-    def connect(self, ip: str = "10.20.6.0"):
+        self._last_frame_id = None
+        self._capabilities: Dict[str, Capability] = {}
+        self._chunk_data = False
+        self._counters = {
+            "IncompleteImageCount": 0,
+            "FrameIdGapCount": 0,
+            "FrameIdSkippedCount": 0,
+        }
+
+    def connect(self, ip: str = "10.20.6.0", user_set: str = "Default"):
         cam_list = self._system.GetCameras()
         n_cameras = cam_list.GetSize()
         self._logger.info("Found {} cameras.".format(n_cameras))
 
         not_found = True
-        i = 0
-        while not_found:
-            try:
-                self._camera = cam_list.GetByIndex(i)
-            except PySpin.SpinnakerException as ex:
-                self._logger.critical("Spinnaker Exception \n{}", ex)
+        for i in range(n_cameras):
+            self._camera = cam_list.GetByIndex(i)
             ip_address = get_op_int(self._camera.GetTLDeviceNodeMap(), "GevDeviceIPAddress")
             ip_address = self.get_ip(ip_address)
             if ip == ip_address:
@@ -116,20 +162,94 @@ class SpinnakerDriver(CameraDriver):
                     self._camera.Init()
                     self.initied = True
                 except PySpin.SpinnakerException as ex:
-                    self._logger.critical("Spinnaker Exception \n{}", ex)
+                    cam_list.Clear()
+                    raise StatusException(
+                        code=StatusCode.INTERNAL_ERROR,
+                        message=f"Failed to initialize camera with IP='{ip}'",
+                    ) from ex
 
-                set_op_enum(self._camera.GetNodeMap(), "UserSetSelector", "Default")
-                self._camera.UserSetLoad()
-                self._logger.info("Loaded default configuration.")
+                self.load_user_set(user_set)
 
                 set_op_enum(self._camera.GetNodeMap(), "AcquisitionMode", "Continuous")
                 set_op_enum(self._camera.GetTLStreamNodeMap(), "StreamBufferHandlingMode",
                             "NewestOnly")
+                self.probe_capabilities()
                 self._logger.info("Connected to camera with IP='{}'", ip_address)
                 not_found = False
-
-            i += 1
+                break
         cam_list.Clear()
+        if not_found:
+            raise StatusException(
+                code=StatusCode.NOT_FOUND,
+                message=f"Camera with IP='{ip}' not found.",
+            )
+
+    def load_user_set(self, user_set: str):
+        set_op_enum(self._camera.GetNodeMap(), "UserSetSelector", user_set)
+        self._camera.UserSetLoad()
+        # chunk settings are part of the user set
+        try:
+            self._chunk_data = get_op_bool(self._camera.GetNodeMap(), "ChunkModeActive")
+        except StatusException:
+            self._chunk_data = False
+        self._logger.info("Loaded '{}' configuration.", user_set)
+
+    def save_user_set(self, user_set: str):
+        # can only be saved while the camera is not streaming
+        set_op_enum(self._camera.GetNodeMap(), "UserSetSelector", user_set)
+        execute_op(self._camera.GetNodeMap(), "UserSetSave")
+
+    def get_serial_number(self) -> str:
+        return get_op_str(self._camera.GetTLDeviceNodeMap(), "DeviceSerialNumber")
+
+    def probe_node(self, name: str, controls: Tuple[str, ...] = (),
+                   has_range: bool = False) -> Capability:
+        # A setting is also writable through its control nodes, e.g. the exposure time is only
+        # writable once ExposureAuto is turned off, which the setter does.
+        node_map = self._camera.GetNodeMap()
+        readable, writable = access_op(node_map, name)
+        for control in controls:
+            writable = writable or access_op(node_map, control)[1]
+        capability = Capability(readable=readable, writable=writable)
+        if readable and has_range:
+            capability.min, capability.max = minmax_op_float(node_map, name)
+            capability.unit = unit_op_float(node_map, name)
+        return capability
+
+    def probe_capabilities(self):
+        # Node access modes and ranges depend on the pixel format and region of interest, so
+        # this is repeated when they change instead of on every GetConfig/SetConfig.
+        capabilities = {
+            "color_space": self.probe_node("PixelFormat"),
+            "format": Capability(readable=True, writable=True, min=0.0, max=1.0),
+            "region": self.probe_node("Width", controls=("Height", "OffsetX", "OffsetY")),
+            "resolution": self.probe_node("Width"),
+            "frequency": self.probe_node("AcquisitionFrameRate",
+                                         controls=("AcquisitionFrameRateEnabled",),
+                                         has_range=True),
+            "brightness": self.probe_node("BlackLevel", has_range=True),
+            "gain": self.probe_node("Gain", controls=("GainAuto",), has_range=True),
+            "shutter": self.probe_node("ExposureTime", controls=("ExposureAuto",),
+                                       has_range=True),
+        }
+        # resolution is only writable through binning or decimation
+        node_map = self._camera.GetNodeMap()
+        capabilities["resolution"].writable = any(
+            access_op(node_map, "{}{}".format(reduction, axis))[1]
+            for reduction in ("Binning", "Decimation") for axis in RESOLUTION_AXES)
+        if self._color_space == ColorSpaces.Value("RGB"):
+            white_balance = self.probe_node("BalanceRatio", controls=("BalanceWhiteAuto",),
+                                            has_range=True)
+            capabilities["white_balance_bu"] = white_balance
+            capabilities["white_balance_rv"] = white_balance
+        self._capabilities = {
+            name: capability
+            for name, capability in capabilities.items()
+            if capability.readable or capability.writable
+        }
+
+    def get_capabilities(self) -> Dict[str, Capability]:
+        return self._capabilities
 
     def get_ip(self, ip: int) -> str:
         ip_list = self.int2base(x=ip, base=256)
@@ -140,11 +260,17 @@ class SpinnakerDriver(CameraDriver):
             if self._camera.IsStreaming():
                 self._camera.EndAcquisition()
             self._camera.DeInit()
+        except (PySpin.SpinnakerException, AttributeError):
+            pass
+        # also released when the camera was not found or failed to initialize
+        if hasattr(self, "_camera"):
             del self._camera
+        try:
             if not self._system.IsInUse():
                 self._system.ReleaseInstance()
         except PySpin.SpinnakerException:
             pass
+        self._encoder.close()
 
     @staticmethod
     def int2base(x: int, base: int) -> List[int]:
@@ -160,11 +286,30 @@ class SpinnakerDriver(CameraDriver):
     def start_capture(self):
         if not self._camera.IsStreaming():
             self._camera.BeginAcquisition()
+            # frame ids restart with each acquisition
+            self._last_frame_id = None
 
     def stop_capture(self):
         if self._camera.IsStreaming():
             self._camera.EndAcquisition()
 
+    def is_streaming(self) -> bool:
+        return self._camera.IsStreaming()
+
+    def flush_buffers(self) -> int:
+        flushed = 0
+        while self._camera.IsStreaming():
+            try:
+                image = self._camera.GetNextImage(PySpin.EVENT_TIMEOUT_NONE)
+            except PySpin.SpinnakerException:
+                break
+            # discarded on purpose, must not be reported as a frame id gap
+            if not image.IsIncomplete():
+                self._last_frame_id = image.GetFrameID()
+            image.Release()
+            flushed += 1
+        return flushed
+
     def to_array(self, image: PySpin.ImagePtr) -> np.ndarray:
         if not self._onboard_color_processing:
             if self._color_space == ColorSpaces.Value("RGB"):
@@ -175,44 +320,99 @@ class SpinnakerDriver(CameraDriver):
         else:
             array = image.GetNDArray()
         image.Release()
+        self.timers.mark("convert")
         return array
 
-    def to_image(self, image: PySpin.ImagePtr) -> Image:
-        array = self.to_array(image=image)
-        if self._encode_format == ImageFormats.Value("JPEG"):
-            if self._use_turbojpeg and self._color_space == ColorSpaces.Value("RGB"):
-                quality = int(self._compression_level * (100 - 0) + 0)
-                return Image(data=self._encoder.encode(array, quality=quality))
-            else:
-                encode_format = ".jpeg"
-                params = [cv2.IMWRITE_JPEG_QUALITY, int(self._compression_level * (100 - 0) + 0)]
-        elif self._encode_format == ImageFormats.Value("PNG"):
-            encode_format = ".png"
-            params = [cv2.IMWRITE_PNG_COMPRESSION, int(self._compression_level * (9 - 0) + 0)]
-        elif self._encode_format == ImageFormats.Value("WebP"):
-            encode_format = ".webp"
-            params = [cv2.IMWRITE_WEBP_QUALITY, int(self._compression_level * (100 - 1) + 1)]
-        else:
-            return Image()
-        cimage = cv2.imencode(ext=encode_format, img=array, params=params)
-        return Image(data=cimage[1].tobytes())
+    def to_image(self, image: PySpin.ImagePtr) -> EncodedImage:
+        return self.encode(array=self.to_array(image=image))
+
+    def encode(self,
+               array: np.ndarray,
+               color_space: Optional[int] = None,
+               image_format: Optional[ImageFormat] = None) -> EncodedImage:
+        # defaults to the configured color space and format
+        encode_format, compression_level = self._encode_format, self._compression_level
+        if image_format is not None:
+            encode_format = image_format.format
+            if image_format.HasField("compression"):
+                compression_level = image_format.compression.value
+        data = self._encoder.encode(
+            array=array,
+            encode_format=encode_format,
+            compression_level=compression_level,
+            color_space=self._color_space if color_space is None else color_space,
+        )
+        self.timers.mark("encode")
+        if data is None:
+            return EncodedImage()
+        return EncodedImage(data)
+
+    def release_image(self, image: PySpin.ImagePtr):
+        image.Release()
 
-    def grab_image(self, wait: bool = True) -> Union[PySpin.ImagePtr, None]:
+    def get_metadata(self, image: PySpin.ImagePtr) -> Dict[str, Union[int, float]]:
+        # Read from the frame payload, at no extra cost on the control channel. Must be called
+        # before the image is released (e.g. by `to_image`).
+        if not self._chunk_data:
+            return {"frame_id": image.GetFrameID(), "timestamp": image.GetTimeStamp()}
+        chunk_data = image.GetChunkData()
+        return {
+            "frame_id": chunk_data.GetFrameID(),
+            "timestamp": chunk_data.GetTimestamp(),
+            "exposure_time": chunk_data.GetExposureTime(),
+            "gain": chunk_data.GetGain(),
+        }
+
+    def to_frame(self, image: PySpin.ImagePtr) -> Frame:
+        # raw sensor data, still owned by the stream buffer until the image is released
+        return Frame(
+            data=image.GetNDArray(),
+            pixel_format=image.GetPixelFormatName(),
+            frame_id=image.GetFrameID(),
+            timestamp=image.GetTimeStamp(),
+        )
+
+    def set_triggered(self, triggered: bool):
+        # Frames are only captured on `trigger` calls. The trigger can only be configured while
+        # it is off, and only while the camera is not streaming on some models.
+        node_map = self._camera.GetNodeMap()
+        set_op_enum(node_map, "TriggerMode", "Off")
+        if triggered:
+            set_op_enum(node_map, "TriggerSelector", "FrameStart")
+            set_op_enum(node_map, "TriggerSource", "Software")
+            set_op_enum(node_map, "TriggerMode", "On")
+
+    def trigger(self):
+        execute_op(self._camera.GetNodeMap(), "TriggerSoftware")
+
+    def grab_image(self,
+                   wait: bool = True,
+                   timeout: Optional[int] = None) -> Union[PySpin.ImagePtr, None]:
         try:
-            if wait:
+            if wait and timeout is not None:
+                image = self._camera.GetNextImage(timeout)
+            elif wait:
                 image = self._camera.GetNextImage(PySpin.EVENT_TIMEOUT_INFINITE)
             else:
                 image = self._camera.GetNextImage(PySpin.EVENT_TIMEOUT_NONE)
             if image.IsIncomplete():
                 self._logger.warn('Image incomplete with status {}.', image.GetImageStatus())
+                self._counters["IncompleteImageCount"] += 1
                 image.Release()
                 return None
             else:
+                self.check_frame_id(image.GetFrameID())
                 return image
         except PySpin.SpinnakerException as ex:
             self._logger.warn('Spinnaker Exception: {}.', ex)
             return None
 
+    def check_frame_id(self, frame_id: int):
+        if self._last_frame_id is not None and frame_id > self._last_frame_id + 1:
+            self._counters["FrameIdGapCount"] += 1
+            self._counters["FrameIdSkippedCount"] += frame_id - self._last_frame_id - 1
+        self._last_frame_id = frame_id
+
     def get_sampling_rate(self) -> FloatValue:
         value = get_op_float(self._camera.GetNodeMap(), "AcquisitionFrameRate")
         rate = FloatValue()
@@ -245,6 +445,7 @@ class SpinnakerDriver(CameraDriver):
                     code=StatusCode.FAILED_PRECONDITION,
                     message="'ColorSpace' property only accept RGB or GRAY values.",
                 )
+            self.probe_capabilities()
         else:
             raise StatusException(
                 code=StatusCode.PERMISSION_DENIED,
@@ -264,10 +465,12 @@ class SpinnakerDriver(CameraDriver):
             self._encode_format = ImageFormats.Value("PNG")
         elif image_format.format == ImageFormats.Value("WebP"):
             self._encode_format = ImageFormats.Value("WebP")
+        elif image_format.format == lossless.RAW_ZSTD:
+            self._encode_format = lossless.RAW_ZSTD
         else:
             raise StatusException(
                 code=StatusCode.FAILED_PRECONDITION,
-                message="'ImageFormat' property only accept JPEG, PNG or WebP values.",
+                message="'ImageFormat' property only accept JPEG, PNG, WebP or RAW_ZSTD values.",
             )
         if image_format.compression.value > 0 and image_format.compression.value < 1:
             self._compression_level = image_format.compression.value
@@ -313,19 +516,63 @@ class SpinnakerDriver(CameraDriver):
                                                                  int(top_left.x)))
             set_op_int(self._camera.GetNodeMap(), "OffsetY", min(offset_y_range[1],
                                                                  int(top_left.y)))
+            self.probe_capabilities()
         else:
             raise StatusException(
                 code=StatusCode.PERMISSION_DENIED,
                 message="'RegionOfInterest' property cannot be modify during streaming.",
             )
 
-    # def get_resolution(self) -> Resolution:
-    #     resolution = Resolution()
-    #     width = get_op_int(self._camera.GetNodeMap(), "Width")
-    #     height = get_op_int(self._camera.GetNodeMap(), "Height")
-    #     resolution.width = width
-    #     resolution.height = height
-    #     return resolution
+    def get_resolution(self) -> Resolution:
+        # size of the full field of view after binning and decimation, regardless of the region
+        resolution = Resolution()
+        resolution.width = get_op_int(self._camera.GetNodeMap(), "WidthMax")
+        resolution.height = get_op_int(self._camera.GetNodeMap(), "HeightMax")
+        return resolution
+
+    def set_resolution(self, resolution: Resolution):
+        # Reduces the full field of view on the sensor, with the binning and decimation factors
+        # closest to the requested size without going below it. The region of interest is reset
+        # to the full (reduced) field of view.
+        if self._camera.IsStreaming():
+            raise StatusException(
+                code=StatusCode.PERMISSION_DENIED,
+                message="'Resolution' property cannot be modify during streaming.",
+            )
+        if resolution.width <= 0 or resolution.height <= 0:
+            raise StatusException(
+                code=StatusCode.INVALID_ARGUMENT,
+                message="'Resolution' property must have a positive width and height.",
+            )
+        node_map = self._camera.GetNodeMap()
+        requested = {"Horizontal": resolution.width, "Vertical": resolution.height}
+        for axis, sensor_node in RESOLUTION_AXES.items():
+            binning, decimation = "Binning" + axis, "Decimation" + axis
+            # some models do not combine both, so start from no reduction at all
+            for name in (binning, decimation):
+                if access_op(node_map, name)[1]:
+                    set_op_int(node_map, name, 1)
+            factors = choose_factors(
+                sensor=get_op_int(node_map, sensor_node),
+                requested=requested[axis],
+                binnings=self.factor_range(binning),
+                decimations=self.factor_range(decimation),
+            )
+            for name, factor in zip((binning, decimation), factors):
+                if factor > 1:
+                    set_op_int(node_map, name, factor)
+        set_op_int(node_map, "OffsetX", 0)
+        set_op_int(node_map, "OffsetY", 0)
+        set_op_int(node_map, "Width", get_op_int(node_map, "WidthMax"))
+        set_op_int(node_map, "Height", get_op_int(node_map, "HeightMax"))
+        self.probe_capabilities()
+
+    def factor_range(self, name: str) -> List[int]:
+        node_map = self._camera.GetNodeMap()
+        if not access_op(node_map, name)[1]:
+            return [1]
+        min_factor, max_factor = minmax_op_int(node_map, name)
+        return list(range(min_factor, max_factor + 1))
 
     def get_white_balance(self, choice: str):
         if self._color_space != ColorSpaces.Value("RGB"):
@@ -424,12 +671,93 @@ class SpinnakerDriver(CameraDriver):
     def set_reverse_x(self, reverse_x: bool):
         set_op_bool(self._camera.GetNodeMap(), "ReverseX", reverse_x)
 
+    def get_packet_size(self) -> int:
+        return get_op_int(self._camera.GetNodeMap(), "GevSCPSPacketSize")
+
     def set_packet_size(self, packet_size: int):
         set_op_int(self._camera.GetNodeMap(), "GevSCPSPacketSize", packet_size)
 
+    def discover_max_packet_size(self) -> int:
+        # Sends test packets of increasing size to find the largest one that reaches the host
+        # without fragmentation, i.e. jumbo frames are only used when the whole path supports it.
+        max_packet_size = minmax_op_int(self._camera.GetNodeMap(), "GevSCPSPacketSize")[1]
+        try:
+            return min(self._camera.DiscoverMaxPacketSize(), max_packet_size)
+        except PySpin.SpinnakerException as ex:
+            self._logger.warn('Unable to discover max packet size: {}.', ex)
+            return self.get_packet_size()
+
+    def get_packet_delay(self) -> int:
+        return get_op_int(self._camera.GetNodeMap(), "GevSCPD")
+
     def set_packet_delay(self, packet_delay: int):
         set_op_int(self._camera.GetNodeMap(), "GevSCPD", packet_delay)
 
+    def minmax_packet_delay(self) -> Tuple[int, int]:
+        return minmax_op_int(self._camera.GetNodeMap(), "GevSCPD")
+
+    def get_payload_size(self) -> int:
+        return get_op_int(self._camera.GetNodeMap(), "PayloadSize")
+
+    def get_timestamp_frequency(self) -> int:
+        try:
+            return get_op_int(self._camera.GetNodeMap(), "GevTimestampTickFrequency")
+        except StatusException:
+            return 1000000000
+
+    def get_stream_statistics(self) -> Dict[str, int]:
+        statistics = {}
+        for name in STREAM_STATISTICS:
+            try:
+                statistics[name] = get_op_int(self._camera.GetTLStreamNodeMap(), name)
+            except StatusException:
+                statistics[name] = 0
+        statistics.update(self.get_buffer_statistics())
+        statistics.update(self._counters)
+        return statistics
+
+    def get_buffer_statistics(self) -> Dict[str, int]:
+        stream_node_map = self._camera.GetTLStreamNodeMap()
+        try:
+            count = get_op_int(stream_node_map, "StreamBufferCountResult")
+            payload_size = get_op_int(self._camera.GetNodeMap(), "PayloadSize")
+            queued = get_op_int(stream_node_map, "StreamOutputBufferCount")
+        except StatusException:
+            return {}
+        return {
+            "StreamBufferCount": count,
+            "StreamBufferBytes": count * payload_size,
+            "StreamOutputBufferCount": queued,
+        }
+
+    def set_buffer_handling(self, mode: BufferHandlingMode):
+        set_op_enum(self._camera.GetTLStreamNodeMap(), "StreamBufferHandlingMode",
+                    BUFFER_HANDLING[mode])
+
+    def set_buffer_count(self, count: int):
+        # buffers are allocated when the stream starts, so it only applies on the next one
+        stream_node_map = self._camera.GetTLStreamNodeMap()
+        set_op_enum(stream_node_map, "StreamBufferCountMode", "Manual")
+        set_op_int(stream_node_map, "StreamBufferCountManual", count)
+
+    def set_chunk_data(self, chunk_data: bool):
+        # chunk nodes can only be written while the camera is not streaming
+        node_map = self._camera.GetNodeMap()
+        try:
+            set_op_bool(node_map, "ChunkModeActive", chunk_data)
+            for chunk in CHUNKS:
+                set_op_enum(node_map, "ChunkSelector", chunk)
+                set_op_bool(node_map, "ChunkEnable", chunk_data)
+        except StatusException:
+            # not left half enabled, it would be saved into the user set and read back as enabled
+            try:
+                set_op_bool(node_map, "ChunkModeActive", False)
+            except StatusException:
+                pass
+            self._chunk_data = False
+            raise
+        self._chunk_data = chunk_data
+
     def set_packet_resend(self, packet_resend: bool):
         set_op_bool(self._camera.GetTLStreamNodeMap(), "StreamPacketResendEnable", packet_resend)
 
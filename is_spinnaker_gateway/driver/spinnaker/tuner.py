@@ -0,0 +1,172 @@
+import os
+import json
+import math
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.exceptions import StatusException
+
+if TYPE_CHECKING:
+    from is_spinnaker_gateway.driver.spinnaker.spinnaker import SpinnakerDriver
+
+DEFAULT_TUNE_PATH = "/var/lib/is-spinnaker-gateway/stream.json"
+# used when the frame period is unknown, a stalled stream must not block the tuning
+DEFAULT_GRAB_TIMEOUT_MS = 1000
+
+# IP (20 bytes) + UDP (8 bytes) + GVSP (8 bytes) headers carried by each stream packet.
+PACKET_OVERHEAD = 36
+
+
+# Finds the largest packet size and the smallest inter-packet delay that keep the GigE stream
+# free of incomplete frames and resend storms, i.e. the highest stable throughput for the current
+# frame rate and region of interest.
+class StreamTuner:
+
+    def __init__(self,
+                 driver: "SpinnakerDriver",
+                 path: str = DEFAULT_TUNE_PATH,
+                 grab_timeout: Optional[int] = None,
+                 frames: int = 30,
+                 bisect_steps: int = 6,
+                 max_incomplete_ratio: float = 0.0,
+                 max_resend_ratio: float = 0.01):
+        self._logger = Logger("StreamTuner")
+        self._driver = driver
+        self._path = path
+        self._grab_timeout = grab_timeout or DEFAULT_GRAB_TIMEOUT_MS
+        self._frames = frames
+        self._bisect_steps = bisect_steps
+        self._max_incomplete_ratio = max_incomplete_ratio
+        self._max_resend_ratio = max_resend_ratio
+
+    def fingerprint(self) -> Dict[str, float]:
+        # Tuned values are only valid for the bandwidth they were measured with.
+        return {
+            "sampling_rate": round(self._driver.get_sampling_rate().value, 3),
+            "payload_size": self._driver.get_payload_size(),
+        }
+
+    def load(self, key: str) -> Optional[Tuple[int, int]]:
+        try:
+            with open(self._path, 'r') as f:
+                entry = json.load(f)[key]
+        except (OSError, ValueError, KeyError):
+            return None
+        try:
+            fingerprint = self.fingerprint()
+        except StatusException as ex:
+            self._logger.warn("Unable to check stored stream settings for '{}': {}", key,
+                              ex.status.why)
+            return None
+        if entry.get("fingerprint") != fingerprint:
+            self._logger.info("Stored stream settings for '{}' are outdated.", key)
+            return None
+        return entry["packet_size"], entry["packet_delay"]
+
+    def save(self, key: str, packet_size: int, packet_delay: int):
+        try:
+            with open(self._path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        try:
+            fingerprint = self.fingerprint()
+        except StatusException as ex:
+            self._logger.warn("Unable to persist stream settings to '{}': {}", self._path,
+                              ex.status.why)
+            return
+        entries[key] = {
+            "packet_size": packet_size,
+            "packet_delay": packet_delay,
+            "fingerprint": fingerprint,
+        }
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._path, 'w') as f:
+                json.dump(entries, f, indent=2)
+        except OSError as ex:
+            self._logger.warn("Unable to persist stream settings to '{}': {}", self._path, ex)
+
+    def max_sustainable_delay(self, packet_size: int) -> int:
+        # Above this delay the camera cannot send a whole frame within one frame period.
+        min_delay, max_delay = self._driver.minmax_packet_delay()
+        try:
+            sampling_rate = self._driver.get_sampling_rate().value
+        except StatusException:
+            return max_delay
+        packets = math.ceil(self._driver.get_payload_size() / (packet_size - PACKET_OVERHEAD))
+        period = self._driver.get_timestamp_frequency() / sampling_rate
+        return max(min_delay, min(max_delay, int(period / packets)))
+
+    def measure(self, packet_delay: int) -> Tuple[float, float]:
+        self._driver.set_packet_delay(packet_delay)
+        self._driver.flush_buffers()
+        before = self._driver.get_stream_statistics()
+        incomplete = 0
+        for _ in range(self._frames):
+            # a frame not received in time counts as incomplete
+            image = self._driver.grab_image(timeout=self._grab_timeout)
+            if image is None:
+                incomplete += 1
+            else:
+                image.Release()
+        after = self._driver.get_stream_statistics()
+
+        def delta(name: str) -> int:
+            return after[name] - before[name]
+
+        incomplete = max(
+            incomplete,
+            delta("StreamIncompleteFrameCount") + delta("StreamLostFrameCount"),
+        )
+        incomplete_ratio = incomplete / self._frames
+        resend_ratio = delta("StreamPacketResendRequestedPacketCount") / max(
+            delta("StreamReceivedPacketCount"), 1)
+        self._logger.info("GevSCPD={}, incomplete_ratio={:.3f}, resend_ratio={:.4f}",
+                          packet_delay, incomplete_ratio, resend_ratio)
+        return incomplete_ratio, resend_ratio
+
+    def is_stable(self, packet_delay: int) -> bool:
+        incomplete_ratio, resend_ratio = self.measure(packet_delay)
+        return (incomplete_ratio <= self._max_incomplete_ratio
+                and resend_ratio <= self._max_resend_ratio)
+
+    def tune(self) -> Tuple[int, int]:
+        self._driver.stop_capture()
+        packet_size = self._driver.discover_max_packet_size()
+        self._driver.set_packet_size(packet_size)
+        self._logger.info("Using GevSCPSPacketSize={}", packet_size)
+
+        min_delay, _ = self._driver.minmax_packet_delay()
+        max_delay = self.max_sustainable_delay(packet_size)
+        self._driver.start_capture()
+        try:
+            # Exponential search from the highest throughput (smallest delay) until the stream
+            # becomes stable, then bisect between the last unstable and the first stable delay.
+            unstable, stable = min_delay, None
+            step = max(1, (max_delay - min_delay) // 64)
+            packet_delay = min_delay
+            while packet_delay <= max_delay:
+                if self.is_stable(packet_delay):
+                    stable = packet_delay
+                    break
+                unstable = packet_delay
+                packet_delay += step
+                step *= 2
+            if stable is None:
+                self._logger.warn("No stable GevSCPD below {}, the link is saturated.", max_delay)
+                stable = max_delay
+            else:
+                for _ in range(self._bisect_steps):
+                    if stable - unstable <= 1:
+                        break
+                    packet_delay = (unstable + stable) // 2
+                    if self.is_stable(packet_delay):
+                        stable = packet_delay
+                    else:
+                        unstable = packet_delay
+            self._driver.set_packet_delay(stable)
+        finally:
+            self._driver.stop_capture()
+        self._logger.info("Tuned GevSCPSPacketSize={}, GevSCPD={}", packet_size, stable)
+        return packet_size, stable
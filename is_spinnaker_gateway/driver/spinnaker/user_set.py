@@ -0,0 +1,55 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, Optional
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.conf.options_pb2 import Camera
+
+DEFAULT_USER_SET_PATH = "/var/lib/is-spinnaker-gateway/user_set.json"
+# camera user set holding the configuration applied by the gateway
+USER_SET = "UserSet1"
+
+
+def options_hash(camera: Camera) -> str:
+    # Everything the gateway writes to the camera on start comes from its options, so any change
+    # to them invalidates the stored user set.
+    return hashlib.sha256(camera.SerializeToString(deterministic=True)).hexdigest()
+
+
+# Keeps, for each camera, the hash of the options whose configuration was saved into the camera
+# user set, and the serial number of the camera it was saved into.
+class UserSetStore:
+
+    def __init__(self, path: str = DEFAULT_USER_SET_PATH):
+        self._logger = Logger("UserSetStore")
+        self._path = path
+
+    def load(self, key: str, config_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path, 'r') as f:
+                entry = json.load(f)[key]
+        except (OSError, ValueError, KeyError):
+            return None
+        if entry.get("hash") != config_hash:
+            self._logger.info("Stored user set for '{}' is outdated.", key)
+            return None
+        return entry
+
+    def save(self, key: str, config_hash: str, serial_number: str):
+        try:
+            with open(self._path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+        entries[key] = {
+            "user_set": USER_SET,
+            "hash": config_hash,
+            "serial_number": serial_number,
+        }
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._path, 'w') as f:
+                json.dump(entries, f, indent=2)
+        except OSError as ex:
+            self._logger.warn("Unable to persist user set to '{}': {}", self._path, ex)
@@ -11,6 +11,7 @@ from PySpin import (
     CBooleanPtr,
     CIntegerPtr,
     CEnumerationPtr,
+    CCommandPtr,
     SpinnakerException,
 )
 
@@ -43,6 +44,13 @@ def is_writible(node: INode):
         )
 
 
+def access_op(node_map: INodeMap, name: str) -> Tuple[bool, bool]:
+    node = node_map.GetNode(name)
+    if node is None or not IsAvailable(node):
+        return (False, False)
+    return (IsReadable(node), IsWritable(node))
+
+
 def get_op_bool(node_map: INodeMap, name: str) -> bool:
     node = CBooleanPtr(node_map.GetNode(name))
     is_readable(node)
@@ -67,6 +75,18 @@ def set_op_bool(node_map: INodeMap, name: str, value: bool):
         ) from ex
 
 
+def execute_op(node_map: INodeMap, name: str):
+    node = CCommandPtr(node_map.GetNode(name))
+    is_writible(node)
+    try:
+        node.Execute()
+    except SpinnakerException as ex:
+        raise StatusException(
+            code=StatusCode.INTERNAL_ERROR,
+            message=f"Failed to execute command '{name}'",
+        ) from ex
+
+
 def get_op_int(node_map: INodeMap, name: str) -> int:
     node = CIntegerPtr(node_map.GetNode(name))
     is_readable(node)
@@ -192,6 +212,18 @@ def minmax_op_int(node_map: INodeMap, name: str) -> Tuple[int, int]:
         ) from ex
 
 
+def unit_op_float(node_map: INodeMap, name: str) -> str:
+    node = CFloatPtr(node_map.GetNode(name))
+    is_readable(node)
+    try:
+        return node.GetUnit()
+    except SpinnakerException as ex:
+        raise StatusException(
+            code=StatusCode.INTERNAL_ERROR,
+            message=f"Failed to get property '{name}'",
+        ) from ex
+
+
 def get_value(ratio: float, min_value: float, max_value: float):
     return (ratio * ((max_value - min_value))) + min_value
 
@@ -0,0 +1,100 @@
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from is_spinnaker_gateway.placement import place_thread
+
+SOF0 = 0xC0
+SOS = 0xDA
+EOI = b"\xff\xd9"
+RST0 = 0xD0
+# Bands are multiples of the tallest MCU (16 rows with 4:2:0 chroma subsampling), so they are made
+# of whole MCU rows with any subsampling.
+BAND_ALIGNMENT = 16
+MAX_RESTART_INTERVAL = 0xFFFF
+
+
+def segments(data: memoryview) -> Iterator[Tuple[int, int, int]]:
+    # Yields the marker, start and end of each header segment, up to the start of scan one.
+    position = 2
+    while True:
+        marker = data[position + 1]
+        end = position + 2 + int.from_bytes(data[position + 2:position + 4], "big")
+        yield marker, position, end
+        if marker == SOS:
+            return
+        position = end
+
+
+def mcu_size(sof: memoryview) -> Tuple[int, int]:
+    # from the sampling factors of the components in the start of frame segment
+    components = sof[9]
+    factors = [sof[11 + 3 * i] for i in range(components)]
+    return 8 * max(f >> 4 for f in factors), 8 * max(f & 0x0F for f in factors)
+
+
+def stitch(bands: List[Any], height: int, band_height: int) -> bytes:
+    # Joins baseline JPEGs of horizontal bands of an image, all encoded with the same tables, into
+    # one JPEG. Band boundaries become restart markers: entropy coding of each band starts from
+    # zeroed DC predictions and ends byte aligned, which is what a decoder expects after a restart
+    # interval of one band worth of MCUs.
+    views = [memoryview(band).cast("B") for band in bands]
+    first = views[0]
+    headers = {marker: (start, end) for marker, start, end in segments(first)}
+    sof_start, sof_end = headers[SOF0]
+    sos_start, sos_end = headers[SOS]
+    sof = bytearray(first[sof_start:sof_end])
+    sof[5:7] = height.to_bytes(2, "big")
+    width = int.from_bytes(sof[7:9], "big")
+    mcu_width, mcu_height = mcu_size(memoryview(sof))
+    interval = math.ceil(width / mcu_width) * (band_height // mcu_height)
+    parts = [
+        first[:sof_start], sof, first[sof_end:sos_start],
+        b"\xff\xdd\x00\x04" + interval.to_bytes(2, "big"),
+        first[sos_start:sos_end],
+    ]
+    for index, view in enumerate(views):
+        if index > 0:
+            parts.append(bytes([0xFF, RST0 + (index - 1) % 8]))
+            parts.append(view[[end for marker, _, end in segments(view)][-1]:-2])
+        else:
+            parts.append(view[sos_end:-2])
+    parts.append(EOI)
+    return b"".join(parts)
+
+
+class TiledJpegEncoder:
+
+    def __init__(self, threads: int, cpus: Sequence[int] = ()):
+        self.threads = threads
+        self._pool = ThreadPoolExecutor(
+            max_workers=threads,
+            thread_name_prefix="JpegBand",
+            initializer=self.place_worker,
+            initargs=(list(cpus), ),
+        )
+
+    def place_worker(self, cpus: List[int]):
+        place_thread(name=threading.current_thread().name, cpus=cpus)
+
+    def band_height(self, array: np.ndarray) -> int:
+        rows = math.ceil(array.shape[0] / self.threads)
+        return max(BAND_ALIGNMENT, math.ceil(rows / BAND_ALIGNMENT) * BAND_ALIGNMENT)
+
+    def encode(self, array: np.ndarray, encode: Callable[[np.ndarray], Any]) -> Any:
+        # `encode` must produce baseline JPEGs with fixed tables (i.e. no optimized Huffman
+        # tables), OpenCV and TurboJPEG do by default. Bands are encoded in parallel, both release
+        # the GIL while encoding.
+        height = array.shape[0]
+        band_height = self.band_height(array)
+        mcu_columns = math.ceil(array.shape[1] / 8)
+        if band_height >= height or mcu_columns * band_height // 8 > MAX_RESTART_INTERVAL:
+            return encode(array)
+        bands = [array[y:y + band_height] for y in range(0, height, band_height)]
+        return stitch(list(self._pool.map(encode, bands)), height=height, band_height=band_height)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,117 @@
+import time
+from fractions import Fraction
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+# PyAV bundles the libavcodec encoders and decoders, it is only imported when video is used.
+
+
+class VideoPacket(NamedTuple):
+    data: bytes
+    keyframe: bool
+    pts: int
+    encode_ms: float
+
+
+class VideoEncoder:
+
+    def __init__(self,
+                 codec: str = "libx264",
+                 gop: int = 30,
+                 bitrate: int = 2000000,
+                 frame_rate: float = 30.0):
+        import av
+        self._av = av
+        self.codec = codec
+        # name of the codec for decoders, e.g. `h264` for `libx264`
+        self.decoder = av.Codec(codec, "w").canonical_name
+        self.gop = gop
+        self.bitrate = bitrate
+        self.frame_rate = frame_rate
+        self._context = None
+        self._shape = None
+        self._pts = -1
+        self._origin = None
+        self._timestamp = None
+        self._keyframe = False
+
+    def request_keyframe(self):
+        # e.g. for consumers joining the stream, which can only decode from a keyframe
+        self._keyframe = True
+
+    def open(self, width: int, height: int):
+        formats = [video_format.name for video_format in self._av.Codec(self.codec,
+                                                                        "w").video_formats]
+        context = self._av.CodecContext.create(self.codec, "w")
+        context.width = width
+        context.height = height
+        context.pix_fmt = "yuv420p" if "yuv420p" in formats else formats[0]
+        context.time_base = Fraction(1, 1000)
+        context.framerate = Fraction(self.frame_rate).limit_denominator(1000)
+        context.bit_rate = self.bitrate
+        context.gop_size = self.gop
+        # one packet per frame, as soon as it is encoded
+        context.max_b_frames = 0
+        if self.codec == "libx264":
+            context.options = {"preset": "ultrafast", "tune": "zerolatency"}
+        context.open()
+        self._context = context
+        self._pts = -1
+        self._origin = None
+
+    def next_pts(self, timestamp: int) -> int:
+        # Milliseconds since the stream opened, from capture timestamps in nanoseconds. Frames not
+        # encoded (e.g. suppressed or idle) leave a gap, and a clock going back (e.g. a camera
+        # reset or a replay looping) continues right after the last frame.
+        if self._origin is None:
+            self._origin = timestamp
+        elif timestamp < self._timestamp:
+            self._origin = timestamp - (self._pts + 1) * 1000000
+        self._timestamp = timestamp
+        self._pts = max((timestamp - self._origin) // 1000000, self._pts + 1)
+        return self._pts
+
+    def encode(self, array: np.ndarray, timestamp: Optional[int] = None) -> List[VideoPacket]:
+        # 4:2:0 chroma subsampling needs even dimensions
+        array = array[:array.shape[0] - array.shape[0] % 2, :array.shape[1] - array.shape[1] % 2]
+        if self._context is None or self._shape != array.shape:
+            # color space or region of interest changed, the stream restarts with a keyframe
+            self.open(width=array.shape[1], height=array.shape[0])
+            self._shape = array.shape
+        frame = self._av.VideoFrame.from_ndarray(
+            np.ascontiguousarray(array),
+            format="bgr24" if array.ndim == 3 else "gray",
+        )
+        frame.pts = self.next_pts(time.monotonic_ns() if timestamp is None else timestamp)
+        if self._keyframe:
+            frame.pict_type = self._av.video.frame.PictureType.I
+            self._keyframe = False
+        started = time.perf_counter()
+        packets = self._context.encode(frame)
+        encode_ms = (time.perf_counter() - started) * 1000.0
+        return [
+            VideoPacket(
+                data=bytes(packet),
+                keyframe=packet.is_keyframe,
+                pts=packet.pts,
+                encode_ms=encode_ms,
+            ) for packet in packets
+        ]
+
+
+class VideoDecoder:
+
+    def __init__(self, codec: str = "h264"):
+        import av
+        self._av = av
+        self._context = av.CodecContext.create(codec, "r")
+
+    def decode(self, data: bytes) -> List[np.ndarray]:
+        # Decodes the packet published with a frame into BGR arrays. Packets before the first
+        # keyframe can not be decoded, see `CameraGateway.{id}.RequestKeyframe`.
+        try:
+            frames = self._context.decode(self._av.Packet(data))
+        except self._av.error.InvalidDataError:
+            return []
+        return [frame.to_ndarray(format="bgr24") for frame in frames]
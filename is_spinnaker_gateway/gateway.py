@@ -1,51 +1,241 @@
+import os
 import re
+import math
 import time
+import threading
 import socket
 
-from typing import Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union, Optional
 
-from dateutil import parser as dp
+from amqp.exceptions import AMQPError
 from google.protobuf.empty_pb2 import Empty
-
-from opencensus.trace.span import Span
-from opencensus.ext.zipkin.trace_exporter import ZipkinExporter
+from google.protobuf.wrappers_pb2 import BoolValue, FloatValue
 
 from is_wire.rpc.context import Context
 from is_wire.rpc import ServiceProvider, LogInterceptor, TracingInterceptor
-from is_wire.core import Channel, Message, AsyncTransport, Tracer, Status
+from is_wire.core import Channel, Message, AsyncTransport, Tracer, Status, StatusCode
+from is_wire.core.utils import now
 
 from is_msgs.common_pb2 import FieldSelector
+from is_msgs.image_pb2 import Image, ImageFormat, ImageSettings, ColorSpaces
 from is_msgs.camera_pb2 import CameraConfig, CameraConfigFields
 
+from is_spinnaker_gateway import placement
 from is_spinnaker_gateway.logger import Logger
-from is_spinnaker_gateway.conf.options_pb2 import Camera
+from is_spinnaker_gateway.demand import Demand
+from is_spinnaker_gateway.streams import FORMATS, OutputStream
+from is_spinnaker_gateway.watchdog import Watchdog
+from is_spinnaker_gateway.metrics import StreamMetrics
+from is_spinnaker_gateway.profiler import StartupProfile, StageTimers, SamplingProfiler
+from is_spinnaker_gateway.driver.base import CameraDriver
+from is_spinnaker_gateway.driver.serialization import EncodedImage
+from is_spinnaker_gateway.conf.options_pb2 import Camera, SpoolPolicy
+from is_spinnaker_gateway.conf.capabilities_pb2 import Capabilities
 from is_spinnaker_gateway.exceptions import StatusException
-from is_spinnaker_gateway.driver.spinnaker.spinnaker import SpinnakerDriver
+
+# Heavy modules (PySpin, cv2, turbojpeg, zipkin exporter and dateutil) are imported on the code
+# paths that need them, so tools that only need this module's protobufs start fast.
+if TYPE_CHECKING:
+    from opencensus.trace.span import Span
+
+STATISTICS_PERIOD = 1.0
+# grab deadline, in frame periods plus a fixed margin for exposure and transfer
+GRAB_TIMEOUT_PERIODS = 3
+GRAB_TIMEOUT_MARGIN_MS = 100
+# stream statistics counting frames lost by the camera or the host
+LOST_FRAME_STATISTICS = ("StreamLostFrameCount", "StreamDroppedFrameCount")
+RECONNECT_DELAY = 1.0
+RECONNECT_MAX_DELAY = 30.0
+# errors of broker connections, from sockets or the AMQP client
+BROKER_ERRORS = (OSError, AMQPError)
+DEFAULT_SPOOL_FRAMES = 100
+DEFAULT_SPOOL_MEGABYTES = 256
+# spooled frames published per iteration of the acquisition loop
+SPOOL_FLUSH_BATCH = 10
+# how long to wait for the first frame after the initial configuration
+READY_TIMEOUT = 10.0
+# how long to wait for RPCs on each loop iteration while frames are not streamed
+RPC_POLL_TIMEOUT = 0.1
+# seconds to profile the acquisition loop for, from startup
+PROFILE_ENV = "IS_SPINNAKER_GATEWAY_PROFILE"
+DEFAULT_PROFILE_DURATION = 10.0
+
+# CameraConfig fields, as named in the capability map, and the driver properties behind them,
+# i.e. `get_<property>` and `set_<property>` methods.
+IMAGE_SETTINGS = {
+    "resolution": "resolution",
+    "color_space": "color_space",
+    "format": "format",
+    "region": "region_of_interest",
+}
+SAMPLING_SETTINGS = {
+    "frequency": "sampling_rate",
+    "delay": "delay",
+}
+CAMERA_SETTINGS = {
+    "brightness": "brightness",
+    "exposure": "exposure",
+    "focus": "focus",
+    "gain": "gain",
+    "gamma": "gamma",
+    "hue": "hue",
+    "iris": "iris",
+    "saturation": "saturation",
+    "sharpness": "sharpness",
+    "shutter": "shutter",
+    "white_balance_bu": "white_balance_bu",
+    "white_balance_rv": "white_balance_rv",
+    "zoom": "zoom",
+}
 
 
 class CameraGateway:
 
-    def __init__(self, logger: Logger, broker_uri: str, zipkin_uri: str, camera: Camera):
+    def __init__(self,
+                 logger: Logger,
+                 broker_uri: str,
+                 zipkin_uri: str,
+                 camera: Camera,
+                 profile: Optional[StartupProfile] = None):
         self.logger = logger
+        self.profile = profile or StartupProfile(enabled=False)
         self.camera = camera
+        self.user_set_store = None
+        self.options_hash = None
+        # the camera holds the configuration from the options, loaded from its user set
+        self.warm = False
+        self.config_changed = False
+        if self.camera.user_set_warm_start and not self.camera.replay_path:
+            from is_spinnaker_gateway.driver.spinnaker.user_set import (
+                UserSetStore,
+                DEFAULT_USER_SET_PATH,
+                options_hash,
+            )
+            self.user_set_store = UserSetStore(
+                path=self.camera.user_set_path or DEFAULT_USER_SET_PATH)
+            # before the options are changed by packet tuning or SetConfig
+            self.options_hash = options_hash(self.camera)
         self.broker_uri = broker_uri
         self.zipkin_uri = zipkin_uri
         self.config = self.camera.initial_config
-        self.driver = SpinnakerDriver(
+        self.restart_period = self.camera.restart_period
+        self.metrics = StreamMetrics(camera_id=self.camera.id)
+        self.watchdog = Watchdog(
+            max_failures=self.camera.watchdog_max_failures or 10,
+            max_failure_ratio=self.camera.watchdog_max_failure_ratio or 0.5,
+        )
+        self.grab_timeout = None
+        self.recorder = None
+        self.demand = None
+        self.extra_outputs = None
+        self.change = None
+        self.video = None
+        self.triggered = self.camera.snapshot_mode
+        self.timers = StageTimers()
+        self.sampler = None
+        self.loop_thread = None
+        self.exporter = None
+        self.spool = None
+        # set while the broker is unreachable, until a new connection is made
+        self.broker_down = False
+        self.broker_thread = None
+        self.broker_connection = None
+        self.broker_lost_at = 0.0
+        spool = self.camera.spool
+        if self.camera.HasField("spool") and spool.policy == SpoolPolicy.Value("FLUSH"):
+            from is_spinnaker_gateway.spool import FrameSpool
+            self.spool = FrameSpool(
+                max_frames=spool.max_frames or DEFAULT_SPOOL_FRAMES,
+                max_bytes=(spool.max_megabytes or DEFAULT_SPOOL_MEGABYTES) * 2**20,
+                path=spool.path,
+            )
+        self.streams = []
+        for stream in self.camera.streams:
+            if stream.HasField("format") and stream.format.format not in FORMATS:
+                self.logger.warn("Skipping stream '{}', unsupported format={}", stream.name,
+                                 stream.format.format)
+                continue
+            self.streams.append(OutputStream(options=stream))
+        if self.camera.change_threshold > 0:
+            from is_spinnaker_gateway.change import ChangeGate
+            self.change = ChangeGate(
+                threshold=self.camera.change_threshold,
+                keep_alive_rate=self.camera.change_keep_alive_rate or 1.0,
+            )
+        if len(self.camera.extra_outputs) > 0:
+            from is_spinnaker_gateway.driver.outputs import ExtraOutputs
+            self.extra_outputs = ExtraOutputs(outputs=self.camera.extra_outputs)
+        self.idle = False
+        self.active_rate = None
+        if self.camera.on_demand:
+            self.demand = Demand(lease=self.camera.on_demand_lease or 5.0)
+        try:
+            self.driver = self.connect_driver()
+        except StatusException as ex:
+            self.logger.critical("Failed to connect to camera.\n \
+                                  Code={}, why={}".format(ex.status.code, ex.status.why))
+        self.profile.mark("connect")
+
+    def connect_driver(self) -> CameraDriver:
+        if self.camera.replay_path:
+            from is_spinnaker_gateway.driver.replay.replay import ReplayDriver
+            driver = ReplayDriver(
+                path=self.camera.replay_path,
+                compression_level=0.8,
+                use_turbojpeg=self.camera.use_turbojpeg,
+                max_speed=self.camera.replay_max_speed,
+                jpeg_threads=self.camera.jpeg_threads,
+                encoder_cpus=self.camera.encoder_cpus,
+            )
+            driver.connect()
+            driver.timers = self.timers
+            driver.set_triggered(self.triggered)
+            return driver
+        from is_spinnaker_gateway.driver.spinnaker.spinnaker import SpinnakerDriver
+        from is_spinnaker_gateway.driver.spinnaker.user_set import USER_SET
+        driver = SpinnakerDriver(
             compression_level=0.8,
             use_turbojpeg=self.camera.use_turbojpeg,
             color_algorithm=self.camera.algorithm,
             onboard_color_processing=self.camera.onboard_color_processing,
+            jpeg_threads=self.camera.jpeg_threads,
+            encoder_cpus=self.camera.encoder_cpus,
         )
-        self.restart_period = self.camera.restart_period
-        self.driver.connect(ip=self.camera.ip)
-
-        self.driver.set_reverse_x(reverse_x=self.camera.reverse_x)
-        self.driver.set_packet_size(self.camera.packet_size)
-        self.driver.set_packet_delay(self.camera.packet_delay)
-        self.driver.set_packet_resend(self.camera.packet_resend)
-        self.driver.set_packet_resend_timeout(self.camera.packet_resend_timeout)
-        self.driver.set_packet_resend_max_requests(self.camera.packet_resend_max_requests)
+        try:
+            stored = None
+            if self.user_set_store is not None and not self.config_changed:
+                stored = self.user_set_store.load(key=self.camera.ip,
+                                                  config_hash=self.options_hash)
+            driver.connect(ip=self.camera.ip,
+                           user_set=USER_SET if stored is not None else "Default")
+            self.warm = (stored is not None
+                         and stored["serial_number"] == driver.get_serial_number())
+            if stored is not None and not self.warm:
+                self.logger.info("Stored user set belongs to another camera")
+                driver.load_user_set("Default")
+            if not self.warm:
+                driver.set_reverse_x(reverse_x=self.camera.reverse_x)
+                driver.set_packet_size(self.camera.packet_size)
+                driver.set_packet_delay(self.camera.packet_delay)
+            # stream settings are kept on the host, not in user sets
+            driver.set_packet_resend(self.camera.packet_resend)
+            driver.set_packet_resend_timeout(self.camera.packet_resend_timeout)
+            driver.set_packet_resend_max_requests(self.camera.packet_resend_max_requests)
+            driver.set_buffer_handling(self.camera.buffer_handling)
+            if self.camera.buffer_count > 0:
+                driver.set_buffer_count(self.camera.buffer_count)
+            if self.camera.chunk_data and not self.warm:
+                try:
+                    driver.set_chunk_data(True)
+                except StatusException as ex:
+                    self.logger.warn("Failed to enable chunk data, why={}".format(ex.status.why))
+            driver.timers = self.timers
+            driver.set_triggered(self.triggered)
+        except Exception:
+            # the encoder pool and the PySpin system are not leaked on each reconnection attempt
+            driver.close()
+            raise
+        return driver
 
     def get_config(self, field_selector: FieldSelector, ctx: Context) -> CameraConfig:
         fields = field_selector.fields
@@ -59,183 +249,444 @@ class CameraGateway:
         config = CameraConfig()
         for field in fields:
             if field == CameraConfigFields.Value("IMAGE_SETTINGS"):
-                try:
-                    value = self.driver.get_resolution()
-                    config.image.resolution.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_color_space()
-                    config.image.color_space.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_format()
-                    config.image.format.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_region_of_interest()
-                    config.image.region.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
+                self.read_settings(settings=config.image, properties=IMAGE_SETTINGS)
             if field == CameraConfigFields.Value("SAMPLING_SETTINGS"):
-                try:
-                    value = self.driver.get_sampling_rate()
-                    config.sampling.frequency.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_delay()
-                    config.sampling.delay.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
+                self.read_settings(settings=config.sampling, properties=SAMPLING_SETTINGS)
             if field == CameraConfigFields.Value("CAMERA_SETTINGS"):
-                try:
-                    value = self.driver.get_brightness()
-                    config.camera.brightness.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_exposure()
-                    config.camera.exposure.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_focus()
-                    config.camera.focus.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_gain()
-                    config.camera.gain.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_gamma()
-                    config.camera.gamma.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_hue()
-                    config.camera.hue.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_iris()
-                    config.camera.iris.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_saturation()
-                    config.camera.saturation.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_sharpness()
-                    config.camera.sharpness.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_shutter()
-                    config.camera.shutter.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_white_balance_bu()
-                    config.camera.white_balance_bu.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_white_balance_rv()
-                    config.camera.white_balance_rv.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
-                try:
-                    value = self.driver.get_zoom()
-                    config.camera.white_balance_rv.CopyFrom(value)
-                except (StatusException, TypeError):
-                    pass
+                self.read_settings(settings=config.camera, properties=CAMERA_SETTINGS)
+        if self.idle and self.active_rate is not None and config.sampling.HasField("frequency"):
+            # the camera is at the idle rate, which is not the desired one
+            config.sampling.frequency.CopyFrom(self.active_rate)
         return config
 
+    def read_settings(self, settings: Any, properties: Dict[str, str]):
+        # only settings the camera can read are requested, see `probe_capabilities`
+        capabilities = self.driver.get_capabilities()
+        for name, driver_property in properties.items():
+            capability = capabilities.get(name)
+            if capability is None or not capability.readable:
+                continue
+            try:
+                value = getattr(self.driver, "get_" + driver_property)()
+                getattr(settings, name).CopyFrom(value)
+            except StatusException as ex:
+                self.logger.warn("Failed to read '{}', why={}".format(name, ex.status.why))
+
+    def check_writable(self, settings: Any, properties: Dict[str, str]):
+        # Rejects a group of settings before any of them is written. Checked per group, since
+        # image settings (e.g. color space) change which camera settings are available.
+        capabilities = self.driver.get_capabilities()
+        for name in properties:
+            capability = capabilities.get(name)
+            if settings.HasField(name) and (capability is None or not capability.writable):
+                raise StatusException(
+                    code=StatusCode.UNIMPLEMENTED,
+                    message=f"'{name}' property not supported by this camera.",
+                )
+
+    def get_capabilities(self, request: Empty, ctx: Context) -> Capabilities:
+        return Capabilities(settings=self.driver.get_capabilities())
+
     def set_config(self, config: CameraConfig, ctx: Context) -> Union[Empty, Status]:
+        if ctx is not None:
+            # the camera no longer holds the configuration saved into its user set
+            self.config_changed = True
         try:
             if config.HasField("image"):
                 image = config.image
-                if image.HasField("resolution"):
-                    self.driver.set_resolution(image.resolution)
-                if image.HasField("color_space"):
-                    self.driver.set_color_space(image.color_space)
+                self.check_writable(settings=image, properties=IMAGE_SETTINGS)
+                if any(image.HasField(name) for name in ("resolution", "color_space", "region")):
+                    self.set_stream_settings(image=image, ctx=ctx)
                 if image.HasField("format"):
                     self.driver.set_format(image.format)
-                if image.HasField("region"):
-                    self.driver.set_region_of_interest(image.region)
             if config.HasField("sampling"):
                 sampling = config.sampling
+                self.check_writable(settings=sampling, properties=SAMPLING_SETTINGS)
                 if sampling.HasField("frequency"):
-                    self.driver.set_sampling_rate(sampling.frequency)
+                    if self.idle and self.camera.on_demand_idle_rate > 0:
+                        # applied when consumers return
+                        self.active_rate = FloatValue(value=sampling.frequency.value)
+                    else:
+                        self.driver.set_sampling_rate(sampling.frequency)
                 if sampling.HasField("delay"):
                     self.driver.set_delay(sampling.delay)
+                self.grab_timeout = self.frame_timeout()
             if config.HasField("camera"):
                 camera = config.camera
-                if camera.HasField("brightness"):
-                    self.driver.set_brightness(camera.brightness)
-                if camera.HasField("exposure"):
-                    self.driver.set_exposure(camera.exposure)
-                if camera.HasField("focus"):
-                    self.driver.set_focus(camera.focus)
-                if camera.HasField("gain"):
-                    self.driver.set_gain(camera.gain)
-                if camera.HasField("gamma"):
-                    self.driver.set_gamma(camera.gamma)
-                if camera.HasField("hue"):
-                    self.driver.set_hue(camera.hue)
-                if camera.HasField("iris"):
-                    self.driver.set_iris(camera.iris)
-                if camera.HasField("saturation"):
-                    self.driver.set_saturation(camera.saturation)
-                if camera.HasField("sharpness"):
-                    self.driver.set_sharpness(camera.sharpness)
-                if camera.HasField("shutter"):
-                    self.driver.set_shutter(camera.shutter)
-                if camera.HasField("white_balance_bu"):
-                    self.driver.set_white_balance_bu(camera.white_balance_bu)
-                if camera.HasField("white_balance_rv"):
-                    self.driver.set_white_balance_rv(camera.white_balance_rv)
-                if camera.HasField("zoom"):
-                    self.driver.set_zoom(camera.zoom)
+                self.check_writable(settings=camera, properties=CAMERA_SETTINGS)
+                for name, driver_property in CAMERA_SETTINGS.items():
+                    if camera.HasField(name):
+                        getattr(self.driver, "set_" + driver_property)(getattr(camera, name))
+            self.remember_config(config)
             return Empty()
         except StatusException as ex:
             return ex.status
 
-    def restart(self):
-        # get current configuration
-        selector = FieldSelector(fields=[CameraConfigFields.Value("ALL")])
-        config = self.get_config(field_selector=selector, ctx=None)
-        # stop and restart driver
+    def set_stream_settings(self, image: ImageSettings, ctx: Context):
+        # Resolution, ColorSpace and RegionOfInterest can only be written while the camera is not
+        # streaming, so pause acquisition, apply them at once and resume. On failure, the previous
+        # values are restored before resuming. The region is applied last, since a resolution
+        # change resets it. Frames still buffered from the previous settings are discarded before
+        # resuming, so none of the new acquisition is dropped.
+        if not self.driver.is_streaming():
+            self.apply_stream_settings(image)
+            return
+        color_space = self.driver.get_color_space()
+        region = self.driver.get_region_of_interest()
+        resolution = self.driver.get_resolution() if image.HasField("resolution") else None
+        statistics = self.driver.get_stream_statistics()
+        started = time.perf_counter()
         self.driver.stop_capture()
-        self.driver.close()
-        del self.driver
-        self.driver = SpinnakerDriver(
-            compression_level=0.8,
-            use_turbojpeg=self.camera.use_turbojpeg,
-            color_algorithm=self.camera.algorithm,
-            onboard_color_processing=self.camera.onboard_color_processing,
+        flushed = self.driver.flush_buffers()
+        try:
+            self.apply_stream_settings(image)
+        except StatusException:
+            try:
+                if resolution is not None:
+                    self.driver.set_resolution(resolution)
+                self.driver.set_color_space(color_space)
+                self.driver.set_region_of_interest(region)
+            except StatusException as ex:
+                self.logger.error("Failed to restore previous stream settings, why={}", ex)
+            raise
+        finally:
+            self.driver.start_capture()
+            paused_ms = (time.perf_counter() - started) * 1000.0
+            frames_lost = flushed + self.frames_lost_since(statistics)
+            self.logger.info("Stream paused to apply settings, paused_ms={}, frames_lost={}",
+                             round(paused_ms, 2), frames_lost)
+            if ctx is not None:
+                ctx.reply.metadata["paused_ms"] = round(paused_ms, 2)
+                ctx.reply.metadata["frames_lost"] = frames_lost
+
+    def apply_stream_settings(self, image: ImageSettings):
+        if image.HasField("resolution"):
+            self.driver.set_resolution(image.resolution)
+        if image.HasField("color_space"):
+            self.driver.set_color_space(image.color_space)
+        if image.HasField("region"):
+            self.driver.set_region_of_interest(image.region)
+
+    def apply_config(self, config: CameraConfig) -> Union[Empty, Status]:
+        if self.warm:
+            # Loaded from the user set, only settings kept by the driver on the host are applied.
+            host_config = CameraConfig()
+            if config.image.HasField("color_space"):
+                host_config.image.color_space.CopyFrom(config.image.color_space)
+            if config.image.HasField("format"):
+                host_config.image.format.CopyFrom(config.image.format)
+            config = host_config
+        return self.set_config(config=config, ctx=None)
+
+    def save_user_set(self):
+        from is_spinnaker_gateway.driver.spinnaker.user_set import USER_SET
+        try:
+            self.driver.save_user_set(USER_SET)
+            serial_number = self.driver.get_serial_number()
+        except StatusException as ex:
+            self.logger.warn("Failed to save configuration into user set, why={}".format(ex))
+            return
+        self.user_set_store.save(key=self.camera.ip, config_hash=self.options_hash,
+                                 serial_number=serial_number)
+        self.logger.info("Configuration saved into camera '{}'".format(USER_SET))
+
+    def remember_config(self, config: CameraConfig):
+        # keeps the desired configuration, used to reconfigure the camera after a reconnection
+        if config is self.config:
+            return
+        if config.image.HasField("region") or config.image.HasField("resolution"):
+            # a new resolution also resets the region
+            self.config.image.ClearField("region")
+        self.config.MergeFrom(config)
+
+    def frame_timeout(self) -> Optional[int]:
+        try:
+            sampling_rate = self.driver.get_sampling_rate().value
+        except StatusException:
+            return None
+        if sampling_rate <= 0:
+            return None
+        return int(GRAB_TIMEOUT_PERIODS * 1000.0 / sampling_rate) + GRAB_TIMEOUT_MARGIN_MS
+
+    def frames_lost_since(self, statistics: Dict[str, int]) -> int:
+        current = self.driver.get_stream_statistics()
+        return sum(max(0, current.get(name, 0) - statistics.get(name, 0))
+                   for name in LOST_FRAME_STATISTICS)
+
+    def tune_stream(self):
+        from is_spinnaker_gateway.driver.spinnaker.tuner import StreamTuner, DEFAULT_TUNE_PATH
+        tuner = StreamTuner(
+            driver=self.driver,
+            path=self.camera.packet_auto_tune_path or DEFAULT_TUNE_PATH,
+            grab_timeout=self.frame_timeout(),
         )
-        self.driver.connect(ip=self.camera.ip)
-        self.driver.set_reverse_x(reverse_x=self.camera.reverse_x)
-        self.driver.set_packet_size(self.camera.packet_size)
-        self.driver.set_packet_delay(self.camera.packet_delay)
-        self.driver.set_packet_resend(self.camera.packet_resend)
-        self.driver.set_packet_resend_timeout(self.camera.packet_resend_timeout)
-        self.driver.set_packet_resend_max_requests(self.camera.packet_resend_max_requests)
+        try:
+            tuned = tuner.load(key=self.camera.ip)
+            if tuned is None:
+                tuned = tuner.tune()
+                tuner.save(self.camera.ip, *tuned)
+            else:
+                self.logger.info("Loaded tuned packet settings, packet_size={}, packet_delay={}",
+                                 *tuned)
+                self.driver.set_packet_size(tuned[0])
+                self.driver.set_packet_delay(tuned[1])
+        except StatusException as ex:
+            self.logger.warn("Failed to tune packet settings, why={}", ex.status.why)
+            # tuning may have stopped with other values written
+            try:
+                self.driver.set_packet_size(self.camera.packet_size)
+                self.driver.set_packet_delay(self.camera.packet_delay)
+            except StatusException as ex:
+                self.logger.warn("Failed to restore packet settings, why={}", ex.status.why)
+            return
+        # keep tuned values so restarts apply them instead of the static options
+        self.camera.packet_size, self.camera.packet_delay = tuned
+
+    def restart(self, config: Optional[CameraConfig] = None):
+        if config is None:
+            # get current configuration
+            selector = FieldSelector(fields=[CameraConfigFields.Value("ALL")])
+            config = self.get_config(field_selector=selector, ctx=None)
+            self.metrics.update(self.driver.get_stream_statistics())
+        self.metrics.reset()
+        # stop and restart driver, the closed one is kept until another connects so a failed
+        # attempt can be retried
+        self.driver.close()
+        self.driver = self.connect_driver()
         # apply last configuration
-        maybe_ok = self.set_config(config=config, ctx=None)
+        maybe_ok = self.apply_config(config)
         if isinstance(maybe_ok, Status):
-            self.logger.critical("Failed to set previous configuration.\n \
-                                  Code={}, why={}".format(maybe_ok.code, maybe_ok.why))
+            raise StatusException(maybe_ok.code, "Failed to set previous configuration, why={}"
+                                  .format(maybe_ok.why))
+        if self.idle:
+            self.apply_idle_rate()
+        self.grab_timeout = self.frame_timeout()
         self.driver.start_capture()
 
+    def recover(self):
+        # The camera stopped delivering frames (e.g. PoE drop or cable). Reconnect with the
+        # desired configuration, since the current one can no longer be read from the device.
+        self.logger.warn("Stream health degraded, failure_ratio={}, reconnecting camera".format(
+            round(self.watchdog.failure_ratio(), 2)))
+        self.watchdog.recovering()
+        attempt = 0
+        while True:
+            try:
+                self.restart(config=self.config)
+                break
+            except Exception as ex:
+                delay = min(RECONNECT_MAX_DELAY, RECONNECT_DELAY * 2**attempt)
+                self.logger.warn("Failed to reconnect camera, retrying in {}s, why={}".format(
+                    delay, ex))
+                time.sleep(delay)
+                attempt += 1
+        self.metrics.observe_reconnection()
+
+    def subscribe(self, request: Empty, ctx: Context) -> Empty:
+        # Consumers call it periodically while they want frames, see `on_demand_lease`.
+        self.demand.renew()
+        if self.idle:
+            self.set_idle(False)
+        return Empty()
+
+    def start_profile(self, request: FloatValue, ctx: Context) -> Union[Empty, Status]:
+        if self.sampler is not None:
+            return Status(StatusCode.FAILED_PRECONDITION, "A profile is already running.")
+        if not math.isfinite(request.value) or request.value < 0:
+            return Status(StatusCode.INVALID_ARGUMENT, "Profile window must be a positive number "
+                          "of seconds, or zero for the default.")
+        duration = request.value or DEFAULT_PROFILE_DURATION
+        self.sampler = SamplingProfiler(thread_id=self.loop_thread, duration=duration)
+        self.timers.start()
+        self.logger.info("Profiling acquisition loop for {}s".format(duration))
+        return Empty()
+
+    def profile_from_environment(self):
+        # an invalid window is logged and skipped, the gateway starts without profiling
+        value = os.environ.get(PROFILE_ENV)
+        if not value:
+            return
+        try:
+            maybe_ok = self.start_profile(FloatValue(value=float(value)), ctx=None)
+        except ValueError:
+            maybe_ok = Status(StatusCode.INVALID_ARGUMENT, "Not a number.")
+        if isinstance(maybe_ok, Status):
+            self.logger.warn("Ignoring {}='{}', why={}".format(PROFILE_ENV, value, maybe_ok.why))
+
+    def finish_profile(self, channel: Channel, prefix: str):
+        self.timers.stop()
+        self.logger.info("Stage profile:\n{}".format(self.timers.report()))
+        self.logger.info("Thread placement:\n{}".format(placement.report()))
+        collapsed = self.sampler.collapsed()
+        if self.camera.profile_path:
+            path = os.path.join(self.camera.profile_path,
+                                "profile-{}.collapsed".format(int(time.time())))
+            try:
+                with open(path, "w") as f:
+                    f.write(collapsed)
+                self.logger.info("Collapsed stacks written to '{}'".format(path))
+            except OSError as ex:
+                self.logger.warn("Failed to write collapsed stacks, why={}".format(ex))
+        else:
+            message = Message(content=collapsed.encode())
+            message.topic = "{}.Profile".format(prefix)
+            message.metadata = {"samples": self.sampler.samples}
+            self.publish(channel, message)
+        self.sampler = None
+
+    def set_snapshot_mode(self, request: BoolValue, ctx: Context) -> Union[Empty, Status]:
+        if request.value == self.triggered:
+            return Empty()
+        try:
+            self.driver.stop_capture()
+            self.driver.set_triggered(request.value)
+        except StatusException as ex:
+            return ex.status
+        finally:
+            self.driver.start_capture()
+        self.triggered = request.value
+        self.logger.info("Snapshot mode {}".format("enabled" if self.triggered else "disabled"))
+        return Empty()
+
+    def grab_frame(self, request: Empty, ctx: Context) -> Union[Image, Status]:
+        # In snapshot mode the camera is triggered for the frame, otherwise the next streamed
+        # frame is taken (and not published).
+        started = time.perf_counter()
+        try:
+            if self.triggered:
+                self.driver.flush_buffers()
+                self.driver.trigger()
+        except StatusException as ex:
+            return ex.status
+        image = self.driver.grab_image(timeout=self.grab_timeout or int(READY_TIMEOUT * 1000))
+        if image is None:
+            return Status(StatusCode.DEADLINE_EXCEEDED, "No frame received from the camera.")
+        metadata = self.driver.get_metadata(image)
+        # replies are checked against the Image reply type and may be packed as JSON, which an
+        # EncodedImage does not support
+        content = Image(data=self.driver.to_image(image).data)
+        took = time.perf_counter() - started
+        self.metrics.observe_grab_frame(took)
+        if ctx is not None:
+            ctx.reply.metadata.update(metadata)
+            ctx.reply.metadata["grab_ms"] = round(took * 1000.0, 2)
+            # also counts the time the request spent on the broker and waiting to be served
+            latency_ms = (now() - ctx.request.created_at) * 1000.0
+            self.logger.info("Grab frame, took_ms={}, latency_ms={}".format(
+                round(took * 1000.0, 2), round(latency_ms, 2)))
+        return content
+
+    def set_idle(self, idle: bool):
+        if idle and self.camera.on_demand_idle_rate > 0:
+            # the user set holds the full rate, a warm restart would resume at it while idle
+            self.config_changed = True
+            try:
+                self.active_rate = self.driver.get_sampling_rate()
+            except StatusException as ex:
+                self.logger.warn("Failed to read sampling rate, why={}".format(ex))
+        self.idle = idle
+        if not idle and self.video is not None:
+            # returning consumers can only decode from a keyframe
+            self.video.request_keyframe()
+        self.logger.info("No consumers, publishing paused" if idle else "Publishing resumed")
+        self.apply_idle_rate()
+
+    def apply_idle_rate(self):
+        # The idle rate is only set on the camera, the desired rate is kept in `active_rate` and
+        # in the remembered configuration.
+        if self.camera.on_demand_idle_rate <= 0:
+            return
+        try:
+            if self.idle:
+                self.driver.set_sampling_rate(FloatValue(value=self.camera.on_demand_idle_rate))
+            elif self.active_rate is not None:
+                self.driver.set_sampling_rate(self.active_rate)
+        except StatusException as ex:
+            self.logger.warn("Failed to change sampling rate, why={}".format(ex))
+        self.grab_timeout = self.frame_timeout()
+
+    def encode_images(self, prefix: str, image: Any, timestamp: Optional[int] = None
+                      ) -> List[Tuple[str, EncodedImage, Dict[str, Any]]]:
+        # Returns the topic, content and additional metadata of each message of a frame, video
+        # timestamps follow the capture `timestamp` (in nanoseconds) when known.
+        topic = "{}.Frame".format(prefix)
+        streams = [stream for stream in self.streams if stream.wants()]
+        if self.extra_outputs is None and self.video is None and len(streams) == 0:
+            return [(topic, self.driver.to_image(image), {})]
+        # the sensor readout is converted once, video and other outputs are derived from it
+        array = self.driver.to_array(image)
+        # images of this frame already encoded, by format and compression
+        encoded = {}
+        if self.video is None:
+            images = [(topic, self.encode_shared(array, None, encoded), {})]
+        else:
+            images = []
+            for packet in self.video.encode(array, timestamp=timestamp):
+                self.metrics.observe_video_encode(packet.encode_ms / 1000.0)
+                images.append(("{}.Video".format(prefix), EncodedImage(packet.data), {
+                    "codec": self.video.decoder,
+                    "keyframe": packet.keyframe,
+                    "pts": packet.pts,
+                    "encode_ms": round(packet.encode_ms, 2),
+                }))
+        if self.extra_outputs is not None:
+            for suffix, derived in self.extra_outputs.derive(array):
+                content = self.driver.encode(array=derived, color_space=ColorSpaces.Value("GRAY"))
+                images.append(("{}.{}".format(topic, suffix), content, {}))
+        for stream in streams:
+            content = self.encode_shared(array, stream.format, encoded)
+            images.append(("{}.{}".format(prefix, stream.name), content, {}))
+        return images
+
+    def encode_shared(self, array: Any, image_format: Optional[ImageFormat],
+                      encoded: Dict[Tuple[int, float], EncodedImage]) -> EncodedImage:
+        default = self.driver.get_format()
+        if image_format is None:
+            image_format = default
+        elif not image_format.HasField("compression"):
+            image_format = ImageFormat(format=image_format.format,
+                                       compression=default.compression)
+        key = (image_format.format, round(image_format.compression.value, 6))
+        if key not in encoded:
+            encoded[key] = self.driver.encode(array=array, image_format=image_format)
+        return encoded[key]
+
+    def request_keyframe(self, request: Empty, ctx: Context) -> Empty:
+        self.video.request_keyframe()
+        return Empty()
+
+    def start_video(self):
+        from is_spinnaker_gateway.driver.video import VideoEncoder
+        try:
+            frame_rate = self.driver.get_sampling_rate().value
+        except StatusException:
+            frame_rate = 30.0
+        self.video = VideoEncoder(
+            codec=self.camera.video.codec or "libx264",
+            gop=self.camera.video.gop or 30,
+            bitrate=self.camera.video.bitrate or 2000000,
+            frame_rate=frame_rate if frame_rate > 0 else 30.0,
+        )
+        self.logger.info("Publishing {} video, gop={}, bitrate={}".format(
+            self.video.codec, self.video.gop, self.video.bitrate))
+
+    def serve_rpc(self, server: ServiceProvider, channel: Channel, timeout: float):
+        if self.broker_down:
+            # served again once the broker is reconnected
+            time.sleep(timeout)
+            return
+        try:
+            message = channel.consume(timeout=timeout)
+            if server.should_serve(message):
+                server.serve(message)
+        except socket.timeout:
+            pass
+        except BROKER_ERRORS as ex:
+            self.broker_lost(ex)
+
+    def make_channel(self) -> Channel:
+        return Channel(self.broker_uri)
+
     def get_zipkin(self, uri: str) -> Tuple[str, str]:
         zipkin_ok = re.match("http:\\/\\/([a-zA-Z0-9\\.]+)(:(\\d+))?", uri)
         if not zipkin_ok:
@@ -244,33 +695,99 @@ class CameraGateway:
         return zipkin_ok.group(1), int(zipkin_ok.group(3))
 
     @staticmethod
-    def span_duration_ms(span: Span) -> float:
+    def span_duration_ms(span: "Span") -> float:
+        from dateutil import parser as dp
         dt = dp.parse(span.end_time) - dp.parse(span.start_time)
         return dt.total_seconds() * 1000.0
 
-    def run(self) -> None:
-        service_name = "CameraGateway"
-        maybe_ok = self.set_config(config=self.config, ctx=None)
-        if isinstance(maybe_ok, Status):
-            self.logger.critical("Failed to set initial configuration.\n \
-                                  Code={}, why={}".format(maybe_ok.code, maybe_ok.why))
-        time.sleep(2)
+    def wait_ready(self) -> Any:
+        # The camera is ready once it delivers its first complete frame with the applied
+        # configuration, which is kept to be published.
+        deadline = time.perf_counter() + READY_TIMEOUT
+        while time.perf_counter() < deadline:
+            image = self.driver.grab_image(timeout=self.grab_timeout)
+            if image is not None:
+                return image
+        self.logger.warn("No frame received after {}s, the watchdog will take over".format(
+            READY_TIMEOUT))
+        return None
 
-        publish_channel = Channel(self.broker_uri)
-        rpc_channel = Channel(self.broker_uri)
+    def publish(self, channel: Channel, message: Message):
+        # While the broker is unreachable frames are spooled, or dropped, and capture goes on.
+        # Until the spool is flushed, new frames are spooled behind the older ones.
+        if not self.broker_down and (self.spool is None or len(self.spool) == 0):
+            try:
+                channel.publish(message=message)
+                return
+            except BROKER_ERRORS as ex:
+                self.broker_lost(ex)
+        if self.spool is None:
+            self.metrics.observe_outage_dropped(1)
+            return
+        dropped = self.spool.dropped
+        self.spool.put(message)
+        self.metrics.observe_spooled()
+        self.metrics.observe_outage_dropped(self.spool.dropped - dropped)
 
-        zipkin_uri, zipkin_port = self.get_zipkin(uri=self.zipkin_uri)
-        exporter = ZipkinExporter(
-            service_name=service_name,
-            host_name=zipkin_uri,
-            port=zipkin_port,
-            transport=AsyncTransport,
-        )
+    def broker_lost(self, ex: Exception):
+        # the acquisition loop starts reconnecting
+        if self.broker_down:
+            return
+        self.logger.warn("Broker connection lost, capture goes on, why={}".format(ex))
+        self.broker_lost_at = time.perf_counter()
+        self.broker_connection = None
+        self.broker_down = True
+
+    def reconnect_broker(self, service_name: str):
+        # Runs apart from the acquisition loop, connecting may block for seconds.
+        attempt = 0
+        while True:
+            try:
+                self.broker_connection = self.connect_broker(service_name)
+                return
+            except Exception as ex:
+                delay = min(RECONNECT_MAX_DELAY, RECONNECT_DELAY * 2**attempt)
+                self.logger.warn("Failed to reconnect broker, retrying in {}s, why={}".format(
+                    delay, ex))
+                time.sleep(delay)
+                attempt += 1
 
+    def broker_restored(self, channels: List[Channel]) -> Tuple[Channel, Channel, ServiceProvider]:
+        # Returns the new connection, spooled frames are flushed by the acquisition loop.
+        for channel in channels:
+            try:
+                channel.close()
+            except Exception:
+                pass
+        self.broker_down = False
+        self.broker_thread = None
+        outage = time.perf_counter() - self.broker_lost_at
+        self.metrics.observe_broker_outage(outage)
+        self.logger.info("Broker connection restored, outage_s={}, spooled={}".format(
+            round(outage, 2), 0 if self.spool is None else len(self.spool)))
+        return self.broker_connection
+
+    def flush_spool(self, channel: Channel):
+        # A batch per iteration, so the loop keeps grabbing frames while the spool is published.
+        for _ in range(SPOOL_FLUSH_BATCH):
+            oldest = self.spool.oldest()
+            if oldest is None:
+                return
+            sequence, message = oldest
+            try:
+                channel.publish(message=message)
+            except BROKER_ERRORS as ex:
+                self.broker_lost(ex)
+                return
+            self.spool.pop(sequence)
+
+    def connect_broker(self, service_name: str) -> Tuple[Channel, Channel, ServiceProvider]:
+        publish_channel = self.make_channel()
+        rpc_channel = self.make_channel()
         server = ServiceProvider(channel=rpc_channel)
         logging = LogInterceptor()
         logging.log.logger.propagate = False
-        tracing = TracingInterceptor(exporter=exporter)
+        tracing = TracingInterceptor(exporter=self.exporter)
         server.add_interceptor(interceptor=logging)
         server.add_interceptor(interceptor=tracing)
         server.delegate(
@@ -285,31 +802,197 @@ class CameraGateway:
             reply_type=Empty,
             function=self.set_config,
         )
-        self.logger.info("RPC listening for requests")
+        server.delegate(
+            topic="{}.{}.GetCapabilities".format(service_name, self.camera.id),
+            request_type=Empty,
+            reply_type=Capabilities,
+            function=self.get_capabilities,
+        )
+        if self.video is not None:
+            server.delegate(
+                topic="{}.{}.RequestKeyframe".format(service_name, self.camera.id),
+                request_type=Empty,
+                reply_type=Empty,
+                function=self.request_keyframe,
+            )
+        if self.demand is not None:
+            server.delegate(
+                topic="{}.{}.Subscribe".format(service_name, self.camera.id),
+                request_type=Empty,
+                reply_type=Empty,
+                function=self.subscribe,
+            )
+        server.delegate(
+            topic="{}.{}.GrabFrame".format(service_name, self.camera.id),
+            request_type=Empty,
+            reply_type=Image,
+            function=self.grab_frame,
+        )
+        server.delegate(
+            topic="{}.{}.SetSnapshotMode".format(service_name, self.camera.id),
+            request_type=BoolValue,
+            reply_type=Empty,
+            function=self.set_snapshot_mode,
+        )
+        server.delegate(
+            topic="{}.{}.StartProfile".format(service_name, self.camera.id),
+            request_type=FloatValue,
+            reply_type=Empty,
+            function=self.start_profile,
+        )
+        return publish_channel, rpc_channel, server
+
+    def run(self) -> None:
+        from opencensus.ext.zipkin.trace_exporter import ZipkinExporter
+
+        service_name = "CameraGateway"
+        maybe_ok = self.apply_config(self.config)
+        if isinstance(maybe_ok, Status):
+            self.logger.critical("Failed to set initial configuration.\n \
+                                  Code={}, why={}".format(maybe_ok.code, maybe_ok.why))
+        self.profile.mark("initial config")
+        if self.camera.packet_auto_tune and not self.camera.replay_path:
+            self.tune_stream()
+            self.profile.mark("packet auto tune")
+        if self.user_set_store is not None and not self.warm and not isinstance(maybe_ok, Status):
+            self.save_user_set()
+        self.grab_timeout = self.frame_timeout()
+        if self.camera.video.enabled:
+            self.start_video()
+        # start streaming while the broker connections are set up
         self.driver.start_capture()
 
+        zipkin_uri, zipkin_port = self.get_zipkin(uri=self.zipkin_uri)
+        self.exporter = ZipkinExporter(
+            service_name=service_name,
+            host_name=zipkin_uri,
+            port=zipkin_port,
+            transport=AsyncTransport,
+        )
+        publish_channel, rpc_channel, server = self.connect_broker(service_name)
+        self.profile.mark("broker")
+        self.logger.info("RPC listening for requests")
+        if self.camera.metrics_port > 0:
+            self.metrics.start_server(port=self.camera.metrics_port)
+            self.logger.info("Metrics available on port {}".format(self.camera.metrics_port))
+        self.profile.mark("rpc")
+        if self.camera.record_path:
+            from is_spinnaker_gateway.driver.recording import RecordingWriter
+            self.recorder = RecordingWriter(path=self.camera.record_path)
+            self.logger.info("Recording raw frames to '{}'".format(self.camera.record_path))
+        image = None if self.triggered else self.wait_ready()
+        self.profile.mark("first frame")
+        statistics = self.driver.get_stream_statistics()
+        if "StreamBufferBytes" in statistics:
+            self.logger.info("Stream buffers, count={}, memory_mb={}".format(
+                statistics["StreamBufferCount"],
+                round(statistics["StreamBufferBytes"] / 2**20, 1)))
+        prefix = "{}.{}".format(service_name, self.camera.id)
+        self.loop_thread = threading.get_ident()
+        placement.place_thread(
+            name="acquisition",
+            cpus=self.camera.acquisition_cpus,
+            realtime_priority=self.camera.acquisition_realtime_priority,
+            nice=self.camera.acquisition_nice,
+        )
+        self.profile_from_environment()
+
         timeout = time.perf_counter() + self.camera.restart_period
-        while True:
-            now = time.perf_counter()
-            if now >= timeout:
-                self.restart()
-                timeout = time.perf_counter() + self.camera.restart_period
-            image = self.driver.grab_image()
-            if image is not None:
-                tracer = Tracer(exporter=exporter)
-                span = None
-                with tracer.span(name="frame") as _span:
-                    message = Message()
-                    message.topic = "{}.{}.Frame".format(service_name, self.camera.id)
-                    message.pack(self.driver.to_image(image))
-                    message.inject_tracing(_span)
-                    span = _span
-                    publish_channel.publish(message=message)
-                took_ms = round(self.span_duration_ms(span), 2)
-                self.logger.info("Publish image, took_ms={}".format(took_ms))
-                try:
-                    message = rpc_channel.consume(timeout=0)
-                    if server.should_serve(message):
-                        server.serve(message)
-                except socket.timeout:
-                    pass
+        statistics_timeout = time.perf_counter() + STATISTICS_PERIOD
+        grabbed_at = time.perf_counter()
+        try:
+            while True:
+                now = time.perf_counter()
+                if self.camera.restart_period > 0 and now >= timeout:
+                    try:
+                        self.restart()
+                    except Exception as ex:
+                        self.logger.warn("Failed to restart camera, why={}".format(ex))
+                        self.recover()
+                    timeout = time.perf_counter() + self.camera.restart_period
+                if now >= statistics_timeout:
+                    self.metrics.update(self.driver.get_stream_statistics())
+                    self.metrics.update_threads(placement.cpu_times())
+                    statistics_timeout = now + STATISTICS_PERIOD
+                if self.broker_down and self.broker_thread is None:
+                    self.broker_thread = threading.Thread(target=self.reconnect_broker,
+                                                          args=(service_name, ),
+                                                          name="BrokerReconnect", daemon=True)
+                    self.broker_thread.start()
+                elif self.broker_down and not self.broker_thread.is_alive():
+                    publish_channel, rpc_channel, server = self.broker_restored(
+                        channels=[publish_channel, rpc_channel])
+                if not self.broker_down and self.spool is not None and len(self.spool) > 0:
+                    self.flush_spool(publish_channel)
+                if self.sampler is not None and self.sampler.done():
+                    self.finish_profile(channel=publish_channel, prefix=prefix)
+                self.timers.mark("housekeeping")
+                if self.triggered:
+                    # only RPCs are served, frames are grabbed on GrabFrame requests
+                    self.serve_rpc(server, rpc_channel, timeout=RPC_POLL_TIMEOUT)
+                    continue
+                if image is None:
+                    grab_timeout = self.grab_timeout
+                    if self.idle and grab_timeout is not None:
+                        # consumers subscribing are not kept waiting for a frame at the idle rate
+                        grab_timeout = min(grab_timeout, int(RPC_POLL_TIMEOUT * 1000))
+                    image = self.driver.grab_image(timeout=grab_timeout)
+                self.timers.mark("grab")
+                if image is not None:
+                    grabbed_at = time.perf_counter()
+                elif self.idle and now - grabbed_at < (self.grab_timeout or 0) / 1000.0:
+                    # no frame is due yet at the idle rate
+                    self.serve_rpc(server, rpc_channel, timeout=0)
+                    continue
+                recovery = self.watchdog.feed(image is not None)
+                if recovery is not None:
+                    self.logger.info("Stream recovered, took_s={}".format(round(recovery, 2)))
+                    self.metrics.observe_recovery(recovery)
+                if self.watchdog.is_degraded():
+                    self.recover()
+                    continue
+                if image is not None:
+                    if self.recorder is not None:
+                        self.recorder.write(self.driver.to_frame(image))
+                        self.timers.mark("record")
+                    if self.demand is not None and not self.demand.active():
+                        if not self.idle:
+                            self.set_idle(True)
+                        self.driver.release_image(image)
+                        image = None
+                change_score = None
+                if image is not None and self.change is not None:
+                    # scored on the raw frame, so static frames are not even converted
+                    changed, change_score = self.change.feed(self.driver.to_frame(image).data)
+                    if not changed:
+                        self.metrics.observe_suppressed()
+                        self.driver.release_image(image)
+                        image = None
+                    self.timers.mark("change")
+                if image is not None:
+                    tracer = Tracer(exporter=self.exporter)
+                    span = None
+                    with tracer.span(name="frame") as _span:
+                        metadata = self.driver.get_metadata(image)
+                        if change_score is not None:
+                            metadata["change_score"] = round(change_score, 4)
+                        images = self.encode_images(prefix=prefix, image=image,
+                                                    timestamp=metadata.get("timestamp"))
+                        for topic, content, image_metadata in images:
+                            message = Message(content=content)
+                            message.topic = topic
+                            message.metadata = dict(metadata, **image_metadata)
+                            message.inject_tracing(_span)
+                            self.publish(publish_channel, message)
+                        self.timers.mark("publish")
+                        span = _span
+                    took_ms = round(self.span_duration_ms(span), 2)
+                    self.logger.info("Publish image, took_ms={}".format(took_ms))
+                    if self.profile.mark("first publish"):
+                        self.logger.info("Startup profile:\n{}".format(self.profile.report()))
+                    image = None
+                self.serve_rpc(server, rpc_channel, timeout=0)
+                self.timers.mark("rpc")
+        finally:
+            if self.recorder is not None:
+                self.recorder.close()
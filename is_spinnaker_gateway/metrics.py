@@ -0,0 +1,182 @@
+from typing import Dict, Tuple
+
+from prometheus_client import Counter, Gauge, Summary, start_http_server
+
+STREAM_COUNTERS = {
+    "StreamReceivedFrameCount": (
+        "spinnaker_stream_received_frames_total",
+        "Frames received by the host on the stream channel.",
+    ),
+    "StreamIncompleteFrameCount": (
+        "spinnaker_stream_incomplete_frames_total",
+        "Frames received with missing packets after resends.",
+    ),
+    "StreamLostFrameCount": (
+        "spinnaker_stream_lost_frames_total",
+        "Frames lost on the stream channel.",
+    ),
+    "StreamDroppedFrameCount": (
+        "spinnaker_stream_dropped_frames_total",
+        "Frames dropped by the host because no buffer was available (buffer overruns).",
+    ),
+    "StreamReceivedPacketCount": (
+        "spinnaker_stream_received_packets_total",
+        "Packets received on the stream channel.",
+    ),
+    "StreamPacketResendRequestedPacketCount": (
+        "spinnaker_stream_resend_requested_packets_total",
+        "Packets requested to be resent by the host.",
+    ),
+    "StreamPacketResendReceivedPacketCount": (
+        "spinnaker_stream_resend_received_packets_total",
+        "Resent packets received by the host.",
+    ),
+    "StreamBufferUnderrunCount": (
+        "spinnaker_stream_buffer_underruns_total",
+        "Frames that arrived while no buffer was queued.",
+    ),
+    "IncompleteImageCount": (
+        "spinnaker_incomplete_images_total",
+        "Incomplete images discarded by the driver.",
+    ),
+    "FrameIdGapCount": (
+        "spinnaker_frame_id_gaps_total",
+        "Gaps in the frame id sequence of delivered images.",
+    ),
+    "FrameIdSkippedCount": (
+        "spinnaker_frame_id_skipped_total",
+        "Frame ids missing between delivered images.",
+    ),
+}
+
+STREAM_GAUGES = {
+    "StreamBufferCount": (
+        "spinnaker_stream_buffers",
+        "Host buffers allocated for the stream.",
+    ),
+    "StreamBufferBytes": (
+        "spinnaker_stream_buffer_bytes",
+        "Host memory used by the stream buffers.",
+    ),
+    "StreamOutputBufferCount": (
+        "spinnaker_stream_output_buffers",
+        "Buffers holding frames not grabbed by the gateway yet.",
+    ),
+}
+
+
+# Metrics are registered once per process and labeled by camera, so gateways and drivers can be
+# created again (e.g. on restarts) without registering them twice.
+COUNTERS = {
+    name: Counter(metric, description, ["camera"])
+    for name, (metric, description) in STREAM_COUNTERS.items()
+}
+GAUGES = {
+    name: Gauge(metric, description, ["camera"])
+    for name, (metric, description) in STREAM_GAUGES.items()
+}
+RECONNECTIONS = Counter(
+    "spinnaker_reconnections_total",
+    "Camera reconnections triggered by the stream watchdog.",
+    ["camera"],
+)
+SUPPRESSED = Counter(
+    "spinnaker_suppressed_frames_total",
+    "Frames not published because the scene did not change.",
+    ["camera"],
+)
+VIDEO_ENCODE = Summary(
+    "spinnaker_video_encode_seconds",
+    "Time to encode a frame into a video packet.",
+    ["camera"],
+)
+GRAB_FRAME = Summary(
+    "spinnaker_grab_frame_seconds",
+    "Time to trigger, grab and encode a frame requested with GrabFrame.",
+    ["camera"],
+)
+THREAD_CPU = Counter(
+    "spinnaker_thread_cpu_seconds_total",
+    "CPU time used by the gateway threads (acquisition loop and encoder workers), by name.",
+    ["camera", "thread"],
+)
+SPOOLED = Counter(
+    "spinnaker_spooled_frames_total",
+    "Frames spooled while the broker was unreachable.",
+    ["camera"],
+)
+OUTAGE_DROPPED = Counter(
+    "spinnaker_outage_dropped_frames_total",
+    "Frames dropped while the broker was unreachable, not spooled or the spool was full.",
+    ["camera"],
+)
+BROKER_OUTAGE = Summary(
+    "spinnaker_broker_outage_seconds",
+    "Time from the loss of the broker connection until it was connected again.",
+    ["camera"],
+)
+RECOVERY = Summary(
+    "spinnaker_recovery_seconds",
+    "Time from the first failed grab until the stream delivers frames again.",
+    ["camera"],
+)
+
+
+class StreamMetrics:
+
+    def __init__(self, camera_id: int):
+        self._camera = str(camera_id)
+        self._last = {}
+        self._thread_cpu = {}
+
+    def start_server(self, port: int = 8000):
+        start_http_server(port)
+
+    def update(self, statistics: Dict[str, int]):
+        for name, value in statistics.items():
+            if name in GAUGES:
+                GAUGES[name].labels(self._camera).set(value)
+            if name not in COUNTERS:
+                continue
+            last = self._last.get(name, 0)
+            # driver and stream counters start from zero again on every restart
+            delta = value - last if value >= last else value
+            if delta > 0:
+                COUNTERS[name].labels(self._camera).inc(delta)
+            self._last[name] = value
+
+    def update_threads(self, cpu_times: Dict[int, Tuple[str, float]]):
+        # tracked by thread id, threads of the same name add up
+        last, self._thread_cpu = self._thread_cpu, {}
+        for native_id, (thread, seconds) in cpu_times.items():
+            used = seconds - last.get(native_id, 0.0)
+            THREAD_CPU.labels(self._camera, thread).inc(max(0.0, used))
+            self._thread_cpu[native_id] = seconds
+
+    def reset(self):
+        self._last = {}
+
+    def observe_reconnection(self):
+        RECONNECTIONS.labels(self._camera).inc()
+
+    def observe_suppressed(self):
+        SUPPRESSED.labels(self._camera).inc()
+
+    def observe_video_encode(self, seconds: float):
+        VIDEO_ENCODE.labels(self._camera).observe(seconds)
+
+    def observe_grab_frame(self, seconds: float):
+        GRAB_FRAME.labels(self._camera).observe(seconds)
+
+    def observe_spooled(self):
+        SPOOLED.labels(self._camera).inc()
+
+    def observe_outage_dropped(self, frames: int):
+        if frames > 0:
+            OUTAGE_DROPPED.labels(self._camera).inc(frames)
+
+    def observe_broker_outage(self, seconds: float):
+        BROKER_OUTAGE.labels(self._camera).observe(seconds)
+
+    def observe_recovery(self, seconds: float):
+        RECOVERY.labels(self._camera).observe(seconds)
@@ -0,0 +1,102 @@
+import os
+import threading
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from is_spinnaker_gateway.logger import Logger
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+class ThreadPlacement(NamedTuple):
+    name: str
+    native_id: int
+    cpus: List[int]
+    policy: str
+
+
+# Threads placed in this process, by native id, to report their CPU time.
+PLACED: Dict[int, ThreadPlacement] = {}
+_lock = threading.Lock()
+
+
+def place_thread(name: str,
+                 cpus: Sequence[int] = (),
+                 realtime_priority: int = 0,
+                 nice: int = 0) -> ThreadPlacement:
+    # Applies to the calling thread (on Linux, affinity and scheduling are per thread). Settings
+    # that are not permitted, e.g. real time scheduling without CAP_SYS_NICE, are logged and
+    # skipped, and the thread keeps running with the defaults.
+    logger = Logger("ThreadPlacement")
+    native_id = threading.get_native_id()
+    if len(cpus) > 0:
+        try:
+            os.sched_setaffinity(native_id, cpus)
+        except OSError as ex:
+            logger.warn("Failed to pin '{}' to cpus {}, why={}".format(name, list(cpus), ex))
+    policy = "SCHED_OTHER"
+    if realtime_priority > 0:
+        try:
+            os.sched_setscheduler(native_id, os.SCHED_FIFO, os.sched_param(realtime_priority))
+            policy = "SCHED_FIFO:{}".format(realtime_priority)
+        except OSError as ex:
+            logger.warn("Failed to set real time priority of '{}', why={}".format(name, ex))
+    elif nice != 0:
+        try:
+            os.setpriority(os.PRIO_PROCESS, native_id, nice)
+            policy = "SCHED_OTHER nice:{}".format(nice)
+        except OSError as ex:
+            logger.warn("Failed to set nice value of '{}', why={}".format(name, ex))
+    placement = ThreadPlacement(
+        name=name,
+        native_id=native_id,
+        cpus=sorted(os.sched_getaffinity(native_id)),
+        policy=policy,
+    )
+    with _lock:
+        PLACED[native_id] = placement
+    logger.info("Thread '{}' placed, tid={}, cpus={}, policy={}".format(
+        name, native_id, ",".join(str(cpu) for cpu in placement.cpus), policy))
+    return placement
+
+
+def thread_cpu_seconds(native_id: int) -> Optional[float]:
+    # user plus system time, None once the thread is gone
+    try:
+        with open("/proc/self/task/{}/stat".format(native_id)) as stat_file:
+            stat = stat_file.read()
+    except OSError:
+        return None
+    # fields after the command name, which is in parentheses and may have spaces
+    fields = stat[stat.rindex(")") + 2:].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def cpu_times() -> Dict[int, Tuple[str, float]]:
+    # name and CPU time by native id, for the placed threads still alive. Threads replaced on a
+    # reconnection (e.g. encoder workers) may reuse a name.
+    with _lock:
+        placements = list(PLACED.values())
+    times = {}
+    for placement in placements:
+        seconds = thread_cpu_seconds(placement.native_id)
+        if seconds is None:
+            with _lock:
+                PLACED.pop(placement.native_id, None)
+            continue
+        times[placement.native_id] = (placement.name, seconds)
+    return times
+
+
+def report() -> str:
+    with _lock:
+        placements = list(PLACED.values())
+    width = max([len(placement.name) for placement in placements] + [len("thread")])
+    lines = ["  {}  {:>8}  {:<16}  {:<24}  {:>10}".format(
+        "thread".ljust(width), "tid", "cpus", "policy", "cpu s")]
+    for placement in placements:
+        seconds = thread_cpu_seconds(placement.native_id)
+        lines.append("  {}  {:>8}  {:<16}  {:<24}  {:>10}".format(
+            placement.name.ljust(width), placement.native_id,
+            ",".join(str(cpu) for cpu in placement.cpus), placement.policy,
+            "-" if seconds is None else "{:.2f}".format(seconds)))
+    return "\n".join(lines)
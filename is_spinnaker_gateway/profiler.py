@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+import threading
+
+
+class StartupProfile:
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._started = time.perf_counter()
+        self._last = self._started
+        self._stages = []
+
+    def mark(self, stage: str) -> bool:
+        # Records the time spent since the previous mark. Returns False once the profile was
+        # reported or when it is disabled, so marks can be left on hot paths.
+        if not self.enabled:
+            return False
+        now = time.perf_counter()
+        self._stages.append((stage, (now - self._last) * 1000.0))
+        self._last = now
+        return True
+
+    def report(self) -> str:
+        self.enabled = False
+        total = (self._last - self._started) * 1000.0
+        width = max([len(stage) for stage, _ in self._stages] + [len("total")])
+        lines = []
+        for stage, took_ms in self._stages:
+            share = 100.0 * took_ms / total if total > 0 else 0.0
+            lines.append("  {}  {:>10.2f} ms  {:>5.1f}%".format(
+                stage.ljust(width), took_ms, share))
+        lines.append("  {}  {:>10.2f} ms".format("total".ljust(width), total))
+        return "\n".join(lines)
+
+
+class StageTimers:
+
+    def __init__(self):
+        self.enabled = False
+        self._last = 0.0
+        self._totals = {}
+        self._counts = {}
+
+    def start(self):
+        self._totals, self._counts = {}, {}
+        self._last = time.perf_counter()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def mark(self, stage: str):
+        # Attributes the time spent since the previous mark to `stage`. Only a flag check when
+        # disabled, so marks are left on the acquisition loop.
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._totals[stage] = self._totals.get(stage, 0.0) + (now - self._last)
+        self._counts[stage] = self._counts.get(stage, 0) + 1
+        self._last = now
+
+    def report(self) -> str:
+        total = sum(self._totals.values())
+        width = max([len(stage) for stage in self._totals] + [len("total")])
+        lines = []
+        for stage, took in sorted(self._totals.items(), key=lambda item: -item[1]):
+            share = 100.0 * took / total if total > 0 else 0.0
+            lines.append("  {}  {:>10.2f} ms  {:>8.3f} ms/call  {:>5.1f}%".format(
+                stage.ljust(width), took * 1000.0, took * 1000.0 / self._counts[stage], share))
+        lines.append("  {}  {:>10.2f} ms".format("total".ljust(width), total * 1000.0))
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+
+    def __init__(self, thread_id: int, duration: float, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.duration = duration
+        self.interval = interval
+        self.samples = 0
+        self._stacks = {}
+        self._deadline = time.perf_counter() + duration
+        self._thread = threading.Thread(target=self.sample, name="SamplingProfiler", daemon=True)
+        self._thread.start()
+
+    def sample(self):
+        while time.perf_counter() < self._deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append("{} ({}:{})".format(
+                        code.co_name, os.path.basename(code.co_filename), frame.f_lineno))
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                self._stacks[key] = self._stacks.get(key, 0) + 1
+                self.samples += 1
+            del frame
+            time.sleep(self.interval)
+
+    def done(self) -> bool:
+        return not self._thread.is_alive()
+
+    def collapsed(self) -> str:
+        # one line per distinct stack, root first, as expected by flamegraph tools
+        lines = ["{} {}".format(stack, count) for stack, count in self._stacks.items()]
+        return "\n".join(sorted(lines)) + "\n"
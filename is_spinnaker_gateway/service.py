@@ -1,9 +1,10 @@
-import sys
+import argparse
 
 from google.protobuf.json_format import Parse
 
 from is_spinnaker_gateway.logger import Logger
 from is_spinnaker_gateway.gateway import CameraGateway
+from is_spinnaker_gateway.profiler import StartupProfile
 from is_spinnaker_gateway.conf.options_pb2 import CameraGatewayOptions
 
 
@@ -22,20 +23,32 @@ def load_json(logger: Logger,
 
 
 def main():
-    if len(sys.argv) > 1:
-        options_filename = sys.argv[1]
-    else:
-        options_filename = '/etc/is-spinnaker-gateway/options.json'
+    parser = argparse.ArgumentParser(description="Gateway for BlackFly GigE cameras.")
+    parser.add_argument(
+        "options",
+        nargs="?",
+        default="/etc/is-spinnaker-gateway/options.json",
+        help="path to the JSON options file",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="log a breakdown of the time to the first published frame",
+    )
+    args = parser.parse_args()
+    profile = StartupProfile(enabled=args.profile_startup)
     logger = Logger(name="CameraGateway")
     options = load_json(
         logger=logger,
-        path=options_filename,
+        path=args.options,
     )
+    profile.mark("load options")
     gateway = CameraGateway(
         logger=logger,
         broker_uri=options.rabbitmq_uri,
         zipkin_uri=options.zipkin_uri,
         camera=options.camera,
+        profile=profile,
     )
     gateway.run()
 
@@ -0,0 +1,148 @@
+import os
+import json
+import queue
+import struct
+import threading
+from collections import deque
+from typing import Deque, Optional, Tuple, Union
+
+import amqp
+from is_wire.core import Message
+from is_wire.core.wire.conversion import WireV1
+
+from is_spinnaker_gateway.logger import Logger
+
+SUFFIX = ".spool"
+# header of frames spooled to disk: topic and AMQP properties sizes, followed by both and the body
+RECORD = struct.Struct("<II")
+
+
+class FrameSpool:
+
+    def __init__(self, max_frames: int, max_bytes: int, path: str = "", max_queued: int = 64):
+        self.max_frames = max_frames
+        self.max_bytes = max_bytes
+        self.path = path
+        # frames discarded because the spool was full, or the disk too slow
+        self.dropped = 0
+        self._logger = Logger("FrameSpool")
+        # sequence, size and the message or its file, oldest first
+        self._entries: Deque[Tuple[int, int, Union[Message, str]]] = deque()
+        self._bytes = 0
+        self._sequence = 0
+        # files written, named after it
+        self._written = 0
+        self._lock = threading.Lock()
+        self._queue = None
+        if path:
+            # frames left by a previous run are too old to be published
+            os.makedirs(path, exist_ok=True)
+            stale = [name for name in os.listdir(path) if name.endswith(SUFFIX)]
+            for name in stale:
+                os.remove(os.path.join(path, name))
+            if len(stale) > 0:
+                self._logger.warn("Removed {} frames spooled by a previous run from '{}'".format(
+                    len(stale), path))
+            self._queue = queue.Queue(maxsize=max_queued)
+            self._thread = threading.Thread(target=self._run, name="FrameSpool", daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        # also counts the frames still being written
+        queued = 0 if self._queue is None else self._queue.unfinished_tasks
+        return len(self._entries) + queued
+
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def put(self, message: Message):
+        # Never blocks the caller: frames are written to disk apart from it, and dropped when the
+        # disk falls behind.
+        if self._queue is None:
+            self.append(message, message)
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def append(self, message: Message, entry: Union[Message, str]):
+        # keeps the most recent frames, the oldest are dropped first
+        with self._lock:
+            self._entries.append((self._sequence, len(message.body), entry))
+            self._sequence += 1
+            self._bytes += len(message.body)
+            while len(self._entries) > self.max_frames or self._bytes > self.max_bytes:
+                self.remove_oldest()
+                self.dropped += 1
+
+    def oldest(self) -> Optional[Tuple[int, Message]]:
+        # the sequence of the frame, to pop it once published, None if no frame is ready
+        with self._lock:
+            if len(self._entries) == 0:
+                return None
+            sequence, _, entry = self._entries[0]
+            return sequence, self.read(entry) if self.path else entry
+
+    def pop(self, sequence: int):
+        # unless it was dropped meanwhile
+        with self._lock:
+            if len(self._entries) > 0 and self._entries[0][0] == sequence:
+                self.remove_oldest()
+
+    def remove_oldest(self):
+        _, size, entry = self._entries.popleft()
+        self._bytes -= size
+        if self.path:
+            os.remove(entry)
+
+    def clear(self) -> int:
+        self.sync()
+        with self._lock:
+            cleared = len(self._entries)
+            while len(self._entries) > 0:
+                self.remove_oldest()
+        return cleared
+
+    def sync(self):
+        # waits for the frames being written
+        if self._queue is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            try:
+                self.append(message, self.write(message))
+            except OSError as ex:
+                self._logger.warn("Failed to spool frame to '{}', why={}".format(self.path, ex))
+                with self._lock:
+                    self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+    def write(self, message: Message) -> str:
+        # as published, so the frame keeps its creation time and metadata
+        topic = message.topic.encode()
+        properties = json.dumps(WireV1.to_amqp_properties(message)).encode()
+        file_name = os.path.join(self.path, "{:012d}{}".format(self._written, SUFFIX))
+        self._written += 1
+        with open(file_name, "wb") as spool_file:
+            spool_file.write(RECORD.pack(len(topic), len(properties)))
+            spool_file.write(topic)
+            spool_file.write(properties)
+            spool_file.write(message.body)
+        return file_name
+
+    def read(self, file_name: str) -> Message:
+        with open(file_name, "rb") as spool_file:
+            data = spool_file.read()
+        topic_size, properties_size = RECORD.unpack_from(data)
+        start = RECORD.size
+        topic = data[start:start + topic_size].decode()
+        start += topic_size
+        properties = json.loads(data[start:start + properties_size].decode())
+        amqp_message = amqp.Message(body=data[start + properties_size:], **properties)
+        amqp_message.delivery_info = {"routing_key": topic, "consumer_tag": ""}
+        return WireV1.from_amqp_message(amqp_message)
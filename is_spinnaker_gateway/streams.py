@@ -0,0 +1,45 @@
+import time
+
+from is_msgs.image_pb2 import ImageFormats
+
+from is_spinnaker_gateway.driver import lossless
+from is_spinnaker_gateway.conf.options_pb2 import Stream
+
+# Frames are let through a bit early, so jitter on frames arriving at exactly the max rate does not
+# halve the published rate.
+RATE_SLACK = 0.1
+# formats the drivers can encode, see `ImageEncoder.encode`
+FORMATS = (
+    ImageFormats.Value("JPEG"),
+    ImageFormats.Value("PNG"),
+    ImageFormats.Value("WebP"),
+    lossless.RAW_ZSTD,
+)
+
+
+class OutputStream:
+
+    def __init__(self, options: Stream):
+        self.name = options.name
+        self.format = options.format if options.HasField("format") else None
+        self.decimation = max(1, options.decimation)
+        self._period = 1.0 / options.max_rate if options.max_rate > 0 else None
+        self._frames = 0
+        self._next = 0.0
+
+    def wants(self) -> bool:
+        # Called once per frame, before it is encoded.
+        self._frames += 1
+        if (self._frames - 1) % self.decimation != 0:
+            return False
+        if self._period is None:
+            return True
+        now = time.perf_counter()
+        if now < self._next - RATE_SLACK * self._period:
+            return False
+        # keeps the cadence, unless the stream fell behind by a whole period
+        if now - self._next < self._period:
+            self._next += self._period
+        else:
+            self._next = now + self._period
+        return True
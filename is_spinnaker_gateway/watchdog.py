@@ -0,0 +1,51 @@
+import time
+from collections import deque
+from typing import Optional
+
+
+class Watchdog:
+
+    def __init__(self, max_failures: int = 10, max_failure_ratio: float = 0.5, window: int = 100):
+        self.max_failures = max_failures
+        self.max_failure_ratio = max_failure_ratio
+        self._outcomes = deque(maxlen=window)
+        self._failures = 0
+        self._failing_since = None
+        self._recovering = False
+
+    def feed(self, ok: bool) -> Optional[float]:
+        # Returns the time to recovery, in seconds, on the first good frame after a recovery.
+        now = time.perf_counter()
+        self._outcomes.append(ok)
+        if not ok:
+            self._failures += 1
+            if self._failing_since is None:
+                self._failing_since = now
+            return None
+        self._failures = 0
+        if self._recovering:
+            took = now - (self._failing_since or now)
+            self._failing_since = None
+            self._recovering = False
+            return took
+        if self.failure_ratio() == 0.0:
+            self._failing_since = None
+        return None
+
+    def failure_ratio(self) -> float:
+        if len(self._outcomes) == 0:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def is_degraded(self) -> bool:
+        if self._failures >= self.max_failures:
+            return True
+        return (len(self._outcomes) == self._outcomes.maxlen
+                and self.failure_ratio() >= self.max_failure_ratio)
+
+    def recovering(self):
+        # Starts a new observation window, but keeps the failure start time until the stream
+        # delivers a good frame again.
+        self._outcomes.clear()
+        self._failures = 0
+        self._recovering = True
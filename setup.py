@@ -36,6 +36,9 @@ setup(
         'opencv-contrib-python==4.7.0.68',
         'opencensus-ext-zipkin==0.2.1',
         'python-dateutil==2.8.0',
+        'prometheus-client==0.3.1',
+        'av==18.1.0',
+        'zstandard==0.25.0',
         'pyturbojpeg @ git+https://github.com/lilohuang/PyTurboJPEG.git',
         'spinnaker-python @ file://localhost/{}/{}'.format(os.getcwd(),
                                                            glob.glob('etc/spinnaker/*.whl')[0]),
@@ -58,6 +61,12 @@ setup(
     entry_points={
         'console_scripts': [
             'is-spinnaker-gateway=is_spinnaker_gateway.service:main',
+            'is-spinnaker-gateway-bench-rpc=is_spinnaker_gateway.bench.rpc:main',
+            ('is-spinnaker-gateway-bench-serialization='
+             'is_spinnaker_gateway.bench.serialization:main'),
+            'is-spinnaker-gateway-bench-jpeg=is_spinnaker_gateway.bench.jpeg:main',
+            ('is-spinnaker-gateway-bench-lossless='
+             'is_spinnaker_gateway.bench.lossless:main'),
         ],
     },
 )
\ No newline at end of file
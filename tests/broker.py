@@ -0,0 +1,52 @@
+from is_spinnaker_gateway.gateway import CameraGateway
+from is_spinnaker_gateway.bench.broker import LocalBroker, LocalChannel
+
+
+class FlakyBroker(LocalBroker):
+
+    def __init__(self):
+        super().__init__()
+        self.down = False
+
+
+class FlakyChannel(LocalChannel):
+
+    def __init__(self, broker: FlakyBroker):
+        super().__init__(broker)
+        self.broker = broker
+
+    def publish(self, message, topic=None):
+        if self.broker.down:
+            raise ConnectionResetError("broker is down")
+        super().publish(message, topic)
+
+    def consume(self, timeout=None):
+        if self.broker.down:
+            raise ConnectionResetError("broker is down")
+        return super().consume(timeout)
+
+
+class Stopped(Exception):
+    pass
+
+
+class FlakyGateway(CameraGateway):
+    broker = None
+    stopped = False
+
+    def make_channel(self):
+        if self.broker.down:
+            raise ConnectionRefusedError("broker is down")
+        return FlakyChannel(self.broker)
+
+    def serve_rpc(self, server, channel, timeout):
+        # ends the acquisition loop, once per iteration
+        if self.stopped:
+            raise Stopped()
+        super().serve_rpc(server, channel, timeout)
+
+    def run_until_stopped(self):
+        try:
+            self.run()
+        except Stopped:
+            pass
@@ -0,0 +1,128 @@
+import sys
+import types
+
+import pytest
+from is_wire.core import StatusCode
+from opencensus.trace.base_exporter import Exporter
+
+from is_spinnaker_gateway.logger import Logger
+from is_spinnaker_gateway.gateway import CameraGateway
+from is_spinnaker_gateway.exceptions import StatusException
+from is_spinnaker_gateway.driver.replay.replay import ReplayDriver
+from is_spinnaker_gateway.conf.options_pb2 import Camera
+
+from tests.test_replay import record
+
+
+class NullExporter(Exporter):
+
+    def __init__(self, **kwargs):
+        pass
+
+    def emit(self, span_datas):
+        pass
+
+    def export(self, span_datas):
+        pass
+
+
+@pytest.fixture
+def replay_gateway(tmp_path, monkeypatch):
+    # Builds gateways replaying a short recording, spans are not sent to Zipkin.
+    monkeypatch.setattr("opencensus.ext.zipkin.trace_exporter.ZipkinExporter", NullExporter)
+    record(tmp_path)
+
+    def make(gateway_class=CameraGateway, **options):
+        camera = Camera(id=0, replay_path=str(tmp_path), **options)
+        return gateway_class(logger=Logger("Test"), broker_uri="amqp://localhost",
+                             zipkin_uri="http://localhost:9411", camera=camera)
+
+    return make
+
+
+class FakeSpinnakerDriver(ReplayDriver):
+    # Stands for a GigE camera behind the Spinnaker driver, replaying frames from `path` and
+    # keeping the writes only done on real cameras.
+    path = ""
+    serial_number = "19250000"
+    chunk_data_fails = False
+    connect_fails = False
+    instances = []
+
+    def __init__(self, compression_level, use_turbojpeg, color_algorithm,
+                 onboard_color_processing, jpeg_threads, encoder_cpus):
+        super().__init__(path=self.path, use_turbojpeg=use_turbojpeg,
+                         compression_level=compression_level)
+        self.calls = []
+        self.chunk_data = False
+        self.closed = False
+        self.instances.append(self)
+
+    def connect(self, ip: str, user_set: str = "Default"):
+        if self.connect_fails:
+            raise StatusException(code=StatusCode.NOT_FOUND,
+                                  message=f"Camera with IP='{ip}' not found")
+        super().connect()
+        self.load_user_set(user_set)
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+    def get_serial_number(self) -> str:
+        return self.serial_number
+
+    def load_user_set(self, user_set: str):
+        self.calls.append(("load_user_set", user_set))
+
+    def save_user_set(self, user_set: str):
+        self.calls.append(("save_user_set", user_set))
+
+    def set_reverse_x(self, reverse_x: bool):
+        self.calls.append(("set_reverse_x", reverse_x))
+
+    def set_packet_size(self, packet_size: int):
+        self.calls.append(("set_packet_size", packet_size))
+
+    def set_packet_delay(self, packet_delay: int):
+        self.calls.append(("set_packet_delay", packet_delay))
+
+    def set_packet_resend(self, packet_resend: bool):
+        pass
+
+    def set_packet_resend_timeout(self, timeout: int):
+        pass
+
+    def set_packet_resend_max_requests(self, max_requests: int):
+        pass
+
+    def set_buffer_handling(self, buffer_handling: int):
+        pass
+
+    def set_buffer_count(self, buffer_count: int):
+        pass
+
+    def set_chunk_data(self, chunk_data: bool):
+        if self.chunk_data_fails:
+            raise StatusException(code=StatusCode.FAILED_PRECONDITION,
+                                  message="'ChunkEnable' node is not writable.")
+        self.chunk_data = chunk_data
+
+
+@pytest.fixture
+def spinnaker_gateway(tmp_path, monkeypatch):
+    # Builds gateways connecting to a FakeSpinnakerDriver.
+    record(tmp_path)
+    monkeypatch.setattr(FakeSpinnakerDriver, "path", str(tmp_path))
+    monkeypatch.setattr(FakeSpinnakerDriver, "instances", [])
+    module = types.ModuleType("is_spinnaker_gateway.driver.spinnaker.spinnaker")
+    module.SpinnakerDriver = FakeSpinnakerDriver
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+
+    def make(**options):
+        camera = Camera(id=0, ip="10.20.6.0", user_set_path=str(tmp_path / "user_set.json"),
+                        **options)
+        return CameraGateway(logger=Logger("Test"), broker_uri="amqp://localhost",
+                             zipkin_uri="http://localhost:9411", camera=camera)
+
+    return make
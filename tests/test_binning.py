@@ -0,0 +1,10 @@
+from is_spinnaker_gateway.driver.spinnaker.binning import choose_factors
+
+
+def test_choose_factors_keeps_at_least_the_requested_size():
+    assert choose_factors(1440, 720, [1, 2, 4], [1, 2, 4]) == (2, 1)
+    assert choose_factors(1440, 360, [1, 2], [1, 2, 4]) == (2, 2)
+    assert choose_factors(1440, 700, [1, 2, 4], [1, 2, 4]) == (2, 1)
+    assert choose_factors(1440, 1440, [1, 2, 4], [1, 2, 4]) == (1, 1)
+    # not available, e.g. binning on a color sensor
+    assert choose_factors(1440, 360, [1], [1, 2, 4]) == (1, 4)
@@ -0,0 +1,30 @@
+import socket
+
+import pytest
+from is_wire.core import Message, Subscription
+from is_wire.rpc import ServiceProvider
+from google.protobuf.wrappers_pb2 import FloatValue
+
+from is_spinnaker_gateway.bench.broker import LocalBroker, LocalChannel
+
+
+def test_local_broker_serves_rpcs():
+    broker = LocalBroker()
+    server_channel, client_channel = LocalChannel(broker), LocalChannel(broker)
+    server = ServiceProvider(channel=server_channel)
+    server.delegate(
+        topic="Service.Double",
+        request_type=FloatValue,
+        reply_type=FloatValue,
+        function=lambda request, ctx: FloatValue(value=2 * request.value),
+    )
+    subscription = Subscription(client_channel)
+    request = Message(content=FloatValue(value=1.5), reply_to=subscription)
+    client_channel.publish(request, topic="Service.Double")
+    server.serve(server_channel.consume(timeout=1.0))
+    reply = client_channel.consume(timeout=1.0)
+    assert reply.status.ok()
+    assert reply.correlation_id == request.correlation_id
+    assert reply.unpack(FloatValue).value == 3.0
+    with pytest.raises(socket.timeout):
+        client_channel.consume(timeout=0)
@@ -0,0 +1,31 @@
+from is_wire.core import Status, StatusCode
+from google.protobuf.empty_pb2 import Empty
+
+from is_msgs.common_pb2 import FieldSelector
+from is_msgs.camera_pb2 import CameraConfig, CameraConfigFields
+
+
+def test_get_config_reads_supported_settings_only(replay_gateway):
+    config = replay_gateway().get_config(
+        field_selector=FieldSelector(fields=[CameraConfigFields.Value("ALL")]), ctx=None)
+    assert config.image.HasField("format")
+    assert config.image.HasField("region")
+    assert not config.image.HasField("resolution")
+    assert round(config.sampling.frequency.value) == 100
+    assert not config.camera.HasField("gain")
+
+
+def test_set_config_rejects_unsupported_settings(replay_gateway):
+    service = replay_gateway()
+    config = CameraConfig()
+    config.camera.gain.ratio = 0.5
+    config.camera.zoom.ratio = 0.5
+    maybe_ok = service.set_config(config=config, ctx=None)
+    assert isinstance(maybe_ok, Status)
+    assert maybe_ok.code == StatusCode.UNIMPLEMENTED
+    # nothing from the rejected group was applied
+    assert not service.get_capabilities(Empty(), ctx=None).settings["gain"].readable
+
+    config.camera.ClearField("zoom")
+    assert isinstance(service.set_config(config=config, ctx=None), Empty)
+    assert service.get_capabilities(Empty(), ctx=None).settings["gain"].readable
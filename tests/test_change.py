@@ -0,0 +1,22 @@
+import numpy as np
+
+from is_spinnaker_gateway.change import ChangeGate
+
+
+def test_static_frames_are_suppressed_until_keep_alive():
+    gate = ChangeGate(threshold=0.05, keep_alive_rate=0.001)
+    frame = np.full((480, 640), 100, dtype=np.uint8)
+    assert gate.feed(frame) == (True, 1.0)
+    published, score = gate.feed(frame.copy())
+    assert not published and score == 0.0
+    changed = frame.copy()
+    changed[:240] = 200
+    published, score = gate.feed(changed)
+    assert published and abs(score - 50.0 / 255.0) < 1e-6
+
+
+def test_keep_alive_publishes_static_frames():
+    gate = ChangeGate(threshold=0.05, keep_alive_rate=1e9)
+    frame = np.zeros((480, 640), dtype=np.uint8)
+    gate.feed(frame)
+    assert gate.feed(frame)[0]
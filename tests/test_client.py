@@ -0,0 +1,54 @@
+import time
+
+import cv2
+import numpy as np
+from is_wire.core import Message
+from is_msgs.image_pb2 import Image
+
+from is_spinnaker_gateway.client import FrameClient
+from is_spinnaker_gateway.bench.broker import LocalBroker, LocalChannel
+
+
+class LocalClient(FrameClient):
+
+    def __init__(self, broker: LocalBroker, **kwargs):
+        super().__init__(**kwargs)
+        self.broker = broker
+
+    def make_channel(self):
+        return LocalChannel(self.broker)
+
+
+def publish(channel, array, frame_id):
+    data = cv2.imencode(".jpeg", array)[1].tobytes()
+    message = Message(content=Image(data=data))
+    message.metadata.update({"frame_id": frame_id})
+    channel.publish(message, topic="CameraGateway.0.Frame")
+
+
+def test_client_decodes_at_reduced_scale():
+    broker = LocalBroker()
+    array = np.full((64, 96, 3), 128, dtype=np.uint8)
+    with LocalClient(broker, use_turbojpeg=False, scale=2) as client:
+        publish(LocalChannel(broker), array, frame_id=1)
+        frame = client.get(timeout=2.0)
+    assert frame.array.shape == (32, 48, 3)
+    assert frame.metadata["frame_id"] == 1
+    assert frame.lag_ms >= 0.0
+
+
+def test_client_keeps_only_the_latest_frame():
+    broker = LocalBroker()
+    channel = LocalChannel(broker)
+    with LocalClient(broker, use_turbojpeg=False, decode_threads=1) as client:
+        for frame_id in range(5):
+            publish(channel, np.zeros((16, 16, 3), dtype=np.uint8), frame_id=frame_id)
+            time.sleep(0.05)
+        time.sleep(0.2)
+        frame = client.get(timeout=1.0)
+        assert frame.metadata["frame_id"] == 4
+        assert client.get(timeout=0.1) is None
+        statistics = client.statistics()
+    assert statistics.received == 5
+    assert statistics.delivered == 1
+    assert statistics.dropped_busy + statistics.dropped_stale == 4
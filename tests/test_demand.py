@@ -0,0 +1,78 @@
+import time
+import threading
+
+from google.protobuf.empty_pb2 import Empty
+from google.protobuf.wrappers_pb2 import FloatValue
+from is_msgs.camera_pb2 import CameraConfig, CameraConfigFields
+from is_msgs.common_pb2 import FieldSelector
+
+from is_spinnaker_gateway.demand import Demand
+from is_spinnaker_gateway.driver.replay.replay import ReplayDriver
+
+from tests.broker import FlakyBroker, FlakyGateway
+
+
+class RateDriver(ReplayDriver):
+    # the recorded timing is kept, but the sampling rate set is read back
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.timeouts = []
+
+    def set_sampling_rate(self, sampling_rate: FloatValue):
+        self._sampling_rate = sampling_rate.value
+
+    def grab_image(self, timeout=None):
+        self.timeouts.append(timeout)
+        return super().grab_image(timeout=timeout)
+
+
+def test_demand_lasts_for_the_lease():
+    demand = Demand(lease=0.05)
+    assert not demand.active()
+    demand.renew()
+    assert demand.active()
+    time.sleep(0.1)
+    assert not demand.active()
+
+
+def test_idle_rate_is_never_remembered(replay_gateway, monkeypatch):
+    monkeypatch.setattr("is_spinnaker_gateway.driver.replay.replay.ReplayDriver", RateDriver)
+    gateway = replay_gateway(on_demand=True, on_demand_idle_rate=5.0)
+    gateway.set_idle(True)
+    assert gateway.driver.get_sampling_rate().value == 5.0
+
+    # a new rate requested while idle is applied once consumers return
+    config = CameraConfig()
+    config.sampling.frequency.value = 50.0
+    gateway.set_config(config=config, ctx=None)
+    assert gateway.driver.get_sampling_rate().value == 5.0
+    selector = FieldSelector(fields=[CameraConfigFields.Value("SAMPLING_SETTINGS")])
+    assert gateway.get_config(field_selector=selector, ctx=None).sampling.frequency.value == 50.0
+
+    gateway.restart()
+    assert gateway.idle
+    assert gateway.driver.get_sampling_rate().value == 5.0
+    assert gateway.config.sampling.frequency.value == 50.0
+
+    gateway.subscribe(Empty(), ctx=None)
+    assert not gateway.idle
+    assert gateway.driver.get_sampling_rate().value == 50.0
+    assert gateway.config.sampling.frequency.value == 50.0
+
+
+def test_idle_grabs_are_bounded_by_the_rpc_poll(replay_gateway, monkeypatch):
+    monkeypatch.setattr("is_spinnaker_gateway.driver.replay.replay.ReplayDriver", RateDriver)
+    gateway = replay_gateway(FlakyGateway, on_demand=True, on_demand_idle_rate=1.0)
+    gateway.broker = FlakyBroker()
+    thread = threading.Thread(target=gateway.run_until_stopped, daemon=True)
+    thread.start()
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline and not gateway.idle:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    gateway.stopped = True
+    thread.join(timeout=5.0)
+    # at 1 Hz the grab timeout is over 3 s, Subscribe is served within 100 ms instead
+    assert gateway.grab_timeout > 3000
+    assert gateway.driver.timeouts[-1] == 100
@@ -0,0 +1,23 @@
+import numpy as np
+from is_msgs.image_pb2 import ColorSpaces
+
+from is_spinnaker_gateway.client import FrameClient
+from is_spinnaker_gateway.driver import lossless
+from is_spinnaker_gateway.driver.encoder import ImageEncoder
+
+
+def test_raw_zstd_round_trip():
+    encoder = ImageEncoder(use_turbojpeg=False)
+    for shape in [(48, 64, 3), (31, 17), (1, 1, 3)]:
+        array = np.random.randint(0, 255, shape, dtype=np.uint8)
+        data = encoder.encode(array=array, encode_format=lossless.RAW_ZSTD,
+                              compression_level=0.1, color_space=ColorSpaces.Value("RGB"))
+        assert data[:4] == lossless.MAGIC
+        assert np.array_equal(lossless.decode(data), array)
+
+
+def test_client_decodes_raw_zstd():
+    array = np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8)
+    data = lossless.encode(array, level=1)
+    assert np.array_equal(FrameClient(use_turbojpeg=False).decode(data), array)
+    assert FrameClient(use_turbojpeg=False, scale=4, gray=True).decode(data).shape == (12, 16)
@@ -0,0 +1,139 @@
+import sys
+import types
+import importlib
+import threading
+
+import pytest
+from is_wire.core import Subscription, StatusCode
+
+from is_spinnaker_gateway.exceptions import StatusException
+from is_spinnaker_gateway.bench.broker import LocalChannel
+
+from tests.broker import FlakyBroker, FlakyGateway
+
+
+class SpinnakerException(Exception):
+    pass
+
+
+class ChunkData:
+
+    def GetFrameID(self):
+        return 7
+
+    def GetTimestamp(self):
+        return 7000
+
+    def GetExposureTime(self):
+        return 5000.0
+
+    def GetGain(self):
+        return 1.5
+
+
+class SpinnakerImage:
+
+    def GetFrameID(self):
+        return 7
+
+    def GetTimeStamp(self):
+        return 7000
+
+    def GetChunkData(self):
+        return ChunkData()
+
+
+class NodeMap(dict):
+    # 'ChunkEnable' is not writable for the chunks in `unsupported`
+
+    def __init__(self, unsupported=()):
+        super().__init__()
+        self.unsupported = unsupported
+
+
+class Camera:
+
+    def __init__(self, node_map: NodeMap):
+        self.node_map = node_map
+
+    def GetNodeMap(self):
+        return self.node_map
+
+
+def set_op_bool(node_map, name, value):
+    if name == "ChunkEnable" and node_map.get("ChunkSelector") in node_map.unsupported:
+        raise StatusException(code=StatusCode.FAILED_PRECONDITION,
+                              message="'ChunkEnable' node is not writable.")
+    node_map[name] = value
+
+
+def set_op_enum(node_map, name, value):
+    node_map[name] = value
+
+
+@pytest.fixture
+def spinnaker_driver(monkeypatch):
+    # Builds SpinnakerDriver instances on a stubbed node map, PySpin is stubbed when missing.
+    try:
+        importlib.import_module("PySpin")
+    except ImportError:
+        stub = types.ModuleType("PySpin")
+        stub.SpinnakerException = SpinnakerException
+        stub.__getattr__ = lambda name: type(name, (), {})
+        monkeypatch.setitem(sys.modules, "PySpin", stub)
+    module = importlib.import_module("is_spinnaker_gateway.driver.spinnaker.spinnaker")
+    monkeypatch.setattr(module, "set_op_bool", set_op_bool)
+    monkeypatch.setattr(module, "set_op_enum", set_op_enum)
+
+    def make(node_map: NodeMap):
+        driver = module.SpinnakerDriver.__new__(module.SpinnakerDriver)
+        driver._camera = Camera(node_map)
+        driver._chunk_data = False
+        return driver
+
+    return make
+
+
+def test_frames_are_published_with_their_metadata(replay_gateway):
+    gateway = replay_gateway(FlakyGateway)
+    gateway.broker = FlakyBroker()
+    channel = LocalChannel(gateway.broker)
+    Subscription(channel).subscribe(topic="CameraGateway.0.Frame")
+    thread = threading.Thread(target=gateway.run_until_stopped, daemon=True)
+    thread.start()
+    message = channel.consume(timeout=10.0)
+    gateway.stopped = True
+    thread.join(timeout=5.0)
+    assert {"frame_id", "timestamp"} <= set(message.metadata)
+    assert message.metadata["timestamp"] == message.metadata["frame_id"] * 1000
+
+
+def test_chunk_data_adds_exposure_and_gain(spinnaker_driver):
+    node_map = NodeMap()
+    driver = spinnaker_driver(node_map)
+    assert driver.get_metadata(SpinnakerImage()) == {"frame_id": 7, "timestamp": 7000}
+    driver.set_chunk_data(True)
+    assert node_map["ChunkModeActive"] is True
+    assert driver.get_metadata(SpinnakerImage()) == {
+        "frame_id": 7,
+        "timestamp": 7000,
+        "exposure_time": 5000.0,
+        "gain": 1.5,
+    }
+
+
+def test_chunk_data_is_rolled_back_on_failure(spinnaker_driver):
+    node_map = NodeMap(unsupported=("Gain", ))
+    driver = spinnaker_driver(node_map)
+    with pytest.raises(StatusException):
+        driver.set_chunk_data(True)
+    assert node_map["ChunkModeActive"] is False
+    assert driver.get_metadata(SpinnakerImage()) == {"frame_id": 7, "timestamp": 7000}
+
+
+def test_camera_without_chunk_data_still_streams(spinnaker_gateway, monkeypatch):
+    monkeypatch.setattr("tests.conftest.FakeSpinnakerDriver.chunk_data_fails", True)
+    gateway = spinnaker_gateway(chunk_data=True)
+    gateway.driver.start_capture()
+    metadata = gateway.driver.get_metadata(gateway.driver.grab_image())
+    assert set(metadata) == {"frame_id", "timestamp"}
@@ -0,0 +1,35 @@
+from prometheus_client import REGISTRY
+
+from is_spinnaker_gateway.metrics import StreamMetrics
+
+
+def sample(name: str) -> float:
+    return REGISTRY.get_sample_value(name, {"camera": "7"}) or 0.0
+
+
+def test_stream_metrics_accumulate_across_restarts():
+    metrics = StreamMetrics(camera_id=7)
+    metrics.update({"StreamLostFrameCount": 3, "FrameIdSkippedCount": 2, "Unknown": 1})
+    metrics.update({"StreamLostFrameCount": 5, "FrameIdSkippedCount": 2})
+    metrics.reset()
+    metrics.update({"StreamLostFrameCount": 1, "FrameIdSkippedCount": 0})
+    assert sample("spinnaker_stream_lost_frames_total") == 6.0
+    assert sample("spinnaker_frame_id_skipped_total") == 2.0
+
+
+def test_buffer_gauges_follow_the_last_value():
+    metrics = StreamMetrics(camera_id=7)
+    metrics.update({"StreamBufferBytes": 4096, "StreamOutputBufferCount": 3})
+    metrics.update({"StreamBufferBytes": 2048, "StreamOutputBufferCount": 0})
+    assert sample("spinnaker_stream_buffer_bytes") == 2048.0
+    assert sample("spinnaker_stream_output_buffers") == 0.0
+
+
+def test_thread_cpu_adds_up_threads_of_the_same_name():
+    metrics = StreamMetrics(camera_id=7)
+    metrics.update_threads({100: ("JpegBand_0", 1.0)})
+    metrics.update_threads({100: ("JpegBand_0", 1.5)})
+    # the encoder pool of a new driver starts from zero
+    metrics.update_threads({200: ("JpegBand_0", 0.25)})
+    assert REGISTRY.get_sample_value("spinnaker_thread_cpu_seconds_total",
+                                     {"camera": "7", "thread": "JpegBand_0"}) == 1.75
@@ -0,0 +1,27 @@
+import numpy as np
+
+from is_spinnaker_gateway.conf.options_pb2 import ExtraOutput
+from is_spinnaker_gateway.driver.outputs import ExtraOutputs
+
+
+def test_extra_outputs_are_derived_from_bgr():
+    outputs = ExtraOutputs(outputs=[
+        ExtraOutput.Value("GRAY"),
+        ExtraOutput.Value("HALF_GRAY"),
+        ExtraOutput.Value("RED"),
+    ])
+    array = np.zeros((48, 64, 3), dtype=np.uint8)
+    array[:, :, 2] = 200
+    derived = dict(outputs.derive(array))
+    assert derived["Gray"].shape == (48, 64)
+    assert derived["HalfGray"].shape == (24, 32)
+    assert np.all(derived["Red"] == 200)
+    assert derived["Red"].flags["C_CONTIGUOUS"]
+
+
+def test_channel_outputs_need_color():
+    outputs = ExtraOutputs(outputs=[ExtraOutput.Value("GRAY"), ExtraOutput.Value("BLUE")])
+    array = np.full((48, 64), 7, dtype=np.uint8)
+    derived = outputs.derive(array)
+    assert [suffix for suffix, _ in derived] == ["Gray"]
+    assert derived[0][1] is array
@@ -0,0 +1,23 @@
+import os
+import threading
+
+from is_spinnaker_gateway import placement
+
+
+def test_place_thread_pins_and_reports_cpu_time():
+    cpus = sorted(os.sched_getaffinity(0))[:1]
+    result = {}
+
+    def worker():
+        result["placement"] = placement.place_thread(name="worker", cpus=cpus)
+        sum(range(10**6))
+        result["times"] = placement.cpu_times()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert result["placement"].cpus == cpus
+    assert result["placement"].policy == "SCHED_OTHER"
+    name, seconds = result["times"][result["placement"].native_id]
+    assert name == "worker" and seconds >= 0.0
+    assert "worker" in placement.report()
@@ -0,0 +1,55 @@
+import time
+import threading
+
+from is_spinnaker_gateway.profiler import StageTimers, SamplingProfiler
+from is_spinnaker_gateway.gateway import PROFILE_ENV
+
+
+def busy_wait(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_stage_timers_only_record_while_enabled():
+    timers = StageTimers()
+    timers.mark("grab")
+    timers.start()
+    busy_wait(0.01)
+    timers.mark("grab")
+    timers.mark("encode")
+    timers.stop()
+    timers.mark("grab")
+    report = timers.report()
+    assert report.splitlines()[0].strip().startswith("grab")
+    assert "encode" in report
+
+
+def test_sampling_profiler_collapses_stacks():
+    sampler = SamplingProfiler(thread_id=threading.get_ident(), duration=0.1, interval=0.001)
+    while not sampler.done():
+        busy_wait(0.01)
+    assert sampler.samples > 0
+    lines = sampler.collapsed().splitlines()
+    assert any("busy_wait (test_profiler.py:" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+def test_invalid_profile_settings_are_skipped(replay_gateway, monkeypatch, tmp_path):
+    not_a_directory = tmp_path / "profile"
+    not_a_directory.write_text("")
+    gateway = replay_gateway(profile_path=str(not_a_directory))
+    gateway.loop_thread = threading.get_ident()
+    for value in ("ten", "-1", "nan"):
+        monkeypatch.setenv(PROFILE_ENV, value)
+        gateway.profile_from_environment()
+        assert gateway.sampler is None
+
+    monkeypatch.setenv(PROFILE_ENV, "0.05")
+    gateway.profile_from_environment()
+    while not gateway.sampler.done():
+        busy_wait(0.01)
+    # the stacks can not be written, the loop goes on
+    gateway.finish_profile(channel=None, prefix="CameraGateway.0")
+    assert gateway.sampler is None
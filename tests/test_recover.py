@@ -0,0 +1,46 @@
+import pytest
+from is_wire.core import StatusCode
+from is_msgs.camera_pb2 import CameraConfig
+
+from is_spinnaker_gateway.gateway import CameraGateway
+from is_spinnaker_gateway.exceptions import StatusException
+
+
+class FlakyCameraGateway(CameraGateway):
+    failures = 0
+
+    def connect_driver(self):
+        if self.failures > 0:
+            self.failures -= 1
+            raise StatusException(StatusCode.UNAVAILABLE, "camera not found")
+        return super().connect_driver()
+
+
+def test_recover_retries_a_failed_reconnection(replay_gateway, monkeypatch):
+    monkeypatch.setattr("is_spinnaker_gateway.gateway.RECONNECT_DELAY", 0.01)
+    gateway = replay_gateway(FlakyCameraGateway)
+    gateway.driver.start_capture()
+    gateway.failures = 1
+    gateway.recover()
+    assert gateway.failures == 0
+    assert gateway.driver.is_streaming()
+    assert gateway.driver.grab_image(timeout=100) is not None
+
+
+def test_restart_raises_when_the_configuration_fails(replay_gateway):
+    gateway = replay_gateway()
+    config = CameraConfig()
+    config.camera.zoom.ratio = 0.5
+    with pytest.raises(StatusException) as ex:
+        gateway.restart(config=config)
+    assert ex.value.status.code == StatusCode.UNIMPLEMENTED
+
+
+def test_driver_is_closed_when_connecting_fails(spinnaker_gateway, monkeypatch):
+    gateway = spinnaker_gateway()
+    monkeypatch.setattr("tests.conftest.FakeSpinnakerDriver.connect_fails", True)
+    with pytest.raises(StatusException):
+        gateway.restart()
+    failed = gateway.driver.instances[-1]
+    assert failed is not gateway.driver
+    assert failed.closed
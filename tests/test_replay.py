@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+
+from is_msgs.image_pb2 import ColorSpace, ColorSpaces, ImageFormat, ImageFormats
+
+from is_spinnaker_gateway.driver.replay.replay import ReplayDriver
+from is_spinnaker_gateway.driver.recording import Frame, RecordingWriter, RecordingReader
+
+
+def record(path, n_frames=5):
+    writer = RecordingWriter(path=str(path))
+    for i in range(n_frames):
+        data = np.full((48, 64), i, dtype=np.uint8)
+        writer.write(Frame(data=data, pixel_format="BayerRG8", frame_id=i, timestamp=i * 1000,
+                           host_timestamp=(i + 1) * 10000000))
+    writer.close()
+
+
+def test_recording_round_trip(tmp_path):
+    record(tmp_path)
+    reader = RecordingReader(str(tmp_path))
+    assert len(reader) == 5
+    frame = reader[3]
+    assert frame.data.shape == (48, 64)
+    assert np.all(frame.data == 3)
+    assert frame.pixel_format == "BayerRG8"
+    assert frame.frame_id == 3
+    assert round(reader.sampling_rate()) == 100
+    reader.close()
+
+
+def test_recording_is_append_only(tmp_path):
+    record(tmp_path, n_frames=2)
+    record(tmp_path, n_frames=3)
+    reader = RecordingReader(str(tmp_path))
+    assert [reader[i].frame_id for i in range(len(reader))] == [0, 1, 0, 1, 2]
+    reader.close()
+
+
+def test_replay_driver_encodes_recorded_frames(tmp_path):
+    record(tmp_path)
+    driver = ReplayDriver(path=str(tmp_path), use_turbojpeg=False, compression_level=0.5,
+                          max_speed=True, loop=False)
+    driver.set_format(ImageFormat(format=ImageFormats.Value("PNG"), compression={"value": 0.1}))
+    driver.set_color_space(ColorSpace(value=ColorSpaces.Value("GRAY")))
+    driver.start_capture()
+    frames = []
+    while True:
+        frame = driver.grab_image(wait=False)
+        if frame is None:
+            break
+        frames.append(driver.to_image(frame))
+    driver.close()
+    assert len(frames) == 5
+    array = cv2.imdecode(np.frombuffer(frames[2].data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    assert array.shape == (48, 64)
+    assert np.all(array == 2)
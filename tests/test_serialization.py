@@ -0,0 +1,17 @@
+import numpy as np
+from is_wire.core import Message
+
+from is_msgs.image_pb2 import Image
+
+from is_spinnaker_gateway.driver.serialization import EncodedImage
+
+
+def test_encoded_image_serializes_as_image():
+    for size in (0, 1, 127, 128, 300, 16384, 2**21 + 5):
+        data = np.random.randint(0, 255, (size, 1), dtype=np.uint8)
+        expected = Image(data=data.tobytes()).SerializeToString()
+        assert EncodedImage(data).SerializeToString() == expected
+        assert EncodedImage(data.tobytes()).ByteSize() == len(expected)
+        assert Message(content=EncodedImage(data)).body == expected
+    assert EncodedImage().SerializeToString() == Image().SerializeToString()
+    assert Message(content=EncodedImage(b"\xff\xd8")).unpack(Image).data == b"\xff\xd8"
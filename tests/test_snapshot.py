@@ -0,0 +1,46 @@
+from is_wire.core import Message, Status, StatusCode, Subscription
+from google.protobuf.empty_pb2 import Empty
+from google.protobuf.wrappers_pb2 import BoolValue
+from is_msgs.image_pb2 import Image
+
+from is_spinnaker_gateway.gateway import CameraGateway
+from is_spinnaker_gateway.bench.broker import LocalBroker, LocalChannel
+
+
+class LocalGateway(CameraGateway):
+    broker = LocalBroker()
+
+    def make_channel(self):
+        return LocalChannel(self.broker)
+
+
+def test_grab_frame_in_snapshot_mode(replay_gateway):
+    gateway = replay_gateway(snapshot_mode=True)
+    gateway.grab_timeout = 10
+    maybe_image = gateway.grab_frame(Empty(), ctx=None)
+    assert isinstance(maybe_image, Status)
+    assert maybe_image.code == StatusCode.DEADLINE_EXCEEDED
+
+    gateway.driver.start_capture()
+    assert gateway.driver.grab_image(timeout=10) is None
+    image = gateway.grab_frame(Empty(), ctx=None)
+    assert isinstance(image, Image)
+    assert image.data.startswith(b"\xff\xd8")
+
+    # back to streaming without reconnecting
+    assert isinstance(gateway.set_snapshot_mode(BoolValue(value=False), ctx=None), Empty)
+    assert gateway.driver.is_streaming()
+    assert gateway.driver.grab_image(timeout=100) is not None
+
+
+def test_grab_frame_rpc_replies_with_an_image(replay_gateway):
+    gateway = replay_gateway(LocalGateway)
+    gateway.driver.start_capture()
+    _, rpc_channel, server = gateway.connect_broker("CameraGateway")
+    channel = LocalChannel(gateway.broker)
+    request = Message(content=Empty(), reply_to=Subscription(channel))
+    channel.publish(request, topic="CameraGateway.0.GrabFrame")
+    server.serve(rpc_channel.consume(timeout=1.0))
+    reply = channel.consume(timeout=1.0)
+    assert reply.status.ok()
+    assert reply.unpack(Image).data.startswith(b"\xff\xd8")
@@ -0,0 +1,96 @@
+import time
+import socket
+import threading
+
+import pytest
+from is_wire.core import Message, Subscription
+from is_msgs.image_pb2 import Image
+
+from is_spinnaker_gateway.spool import FrameSpool
+from is_spinnaker_gateway.bench.broker import LocalChannel
+from is_spinnaker_gateway.conf.options_pb2 import Spool
+
+from tests.broker import FlakyBroker, FlakyGateway
+
+
+def test_spool_keeps_the_most_recent_frames(tmp_path):
+    for path in ("", str(tmp_path)):
+        spool = FrameSpool(max_frames=3, max_bytes=2**20, path=path)
+        for frame_id in range(5):
+            message = Message(content=Image(data=bytes([frame_id]) * 10))
+            message.topic = "CameraGateway.0.Frame"
+            message.metadata = {"frame_id": frame_id}
+            spool.put(message)
+        spool.sync()
+        assert (len(spool), spool.dropped) == (3, 2)
+        sequence, oldest = spool.oldest()
+        assert oldest.topic == "CameraGateway.0.Frame"
+        assert oldest.metadata["frame_id"] == 2
+        assert oldest.unpack(Image).data == bytes([2]) * 10
+        spool.pop(sequence)
+        assert spool.oldest()[1].metadata["frame_id"] == 3
+        assert spool.clear() == 2
+        assert len(spool) == 0 and spool.size_bytes() == 0
+
+
+class SlowSpool(FrameSpool):
+
+    def __init__(self, **kwargs):
+        self.writing = threading.Event()
+        self.written = threading.Event()
+        super().__init__(**kwargs)
+
+    def write(self, message):
+        self.writing.set()
+        self.written.wait()
+        return super().write(message)
+
+
+def test_spool_drops_frames_when_the_disk_falls_behind(tmp_path):
+    spool = SlowSpool(max_frames=10, max_bytes=2**20, path=str(tmp_path), max_queued=1)
+    message = Message(content=Image(data=b"frame"))
+    message.topic = "CameraGateway.0.Frame"
+    spool.put(message)
+    spool.writing.wait()
+    # one frame being written, one queued, the next one does not wait for the disk
+    spool.put(message)
+    spool.put(message)
+    assert spool.dropped == 1
+    spool.written.set()
+    spool.sync()
+    assert len(spool) == 2
+
+
+@pytest.mark.parametrize("on_disk", [False, True])
+def test_gateway_flushes_spool_after_broker_outage(replay_gateway, tmp_path, on_disk):
+    broker = FlakyBroker()
+    path = str(tmp_path / "spool") if on_disk else ""
+    gateway = replay_gateway(FlakyGateway, spool=Spool(max_frames=1000, path=path))
+    gateway.broker = broker
+    channel = LocalChannel(broker)
+    Subscription(channel).subscribe(topic="CameraGateway.0.Frame")
+    thread = threading.Thread(target=gateway.run_until_stopped, daemon=True)
+    thread.start()
+    channel.consume(timeout=10.0)
+
+    started = time.time()
+    broker.down = True
+    time.sleep(0.3)
+    broker.down = False
+    ended = time.time()
+    deadline = time.perf_counter() + 5.0
+    while time.perf_counter() < deadline and (gateway.broker_down or len(gateway.spool) > 0):
+        time.sleep(0.1)
+    gateway.stopped = True
+    thread.join(timeout=5.0)
+    created = []
+    while True:
+        try:
+            created.append(channel.consume(timeout=0).created_at)
+        except socket.timeout:
+            break
+    assert gateway.broker_lost_at > 0
+    # frames captured during the outage were published after it, in order
+    assert any(started <= created_at <= ended for created_at in created)
+    assert created == sorted(created)
+    assert len(gateway.spool) == 0
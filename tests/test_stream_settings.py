@@ -0,0 +1,63 @@
+from is_wire.core import Message, Status, StatusCode
+from is_wire.rpc.context import Context
+from is_msgs.image_pb2 import ColorSpaces
+from is_msgs.camera_pb2 import CameraConfig
+
+from is_spinnaker_gateway.driver.replay.replay import ReplayDriver
+
+
+class BufferedDriver(ReplayDriver):
+    # keeps the order of the calls and counts a frame still buffered and one lost on each pause
+    calls = []
+    lost = 0
+
+    def stop_capture(self):
+        self.calls.append("stop_capture")
+        super().stop_capture()
+
+    def start_capture(self):
+        self.calls.append("start_capture")
+        super().start_capture()
+
+    def flush_buffers(self) -> int:
+        self.calls.append("flush_buffers")
+        return 1
+
+    def set_color_space(self, color_space):
+        self.calls.append("set_color_space")
+        self.lost += 1
+        super().set_color_space(color_space)
+
+    def get_stream_statistics(self):
+        return {"StreamLostFrameCount": self.lost}
+
+
+def test_settings_are_applied_with_the_stream_stopped(replay_gateway, monkeypatch):
+    monkeypatch.setattr("is_spinnaker_gateway.driver.replay.replay.ReplayDriver", BufferedDriver)
+    gateway = replay_gateway()
+    gateway.driver.start_capture()
+    gateway.driver.calls = []
+    config = CameraConfig()
+    config.image.color_space.value = ColorSpaces.Value("GRAY")
+    ctx = Context(request=Message(), reply=Message())
+    gateway.set_config(config=config, ctx=ctx)
+    assert gateway.driver.calls == [
+        "stop_capture", "flush_buffers", "set_color_space", "start_capture"
+    ]
+    assert gateway.driver.get_color_space().value == ColorSpaces.Value("GRAY")
+    assert ctx.reply.metadata["frames_lost"] == 2
+    assert gateway.driver.is_streaming()
+
+
+def test_previous_settings_are_restored_on_failure(replay_gateway):
+    gateway = replay_gateway()
+    gateway.driver.start_capture()
+    config = CameraConfig()
+    config.image.color_space.value = ColorSpaces.Value("GRAY")
+    config.image.region.vertices.add(x=0, y=0)
+    maybe_ok = gateway.set_config(config=config, ctx=None)
+    assert isinstance(maybe_ok, Status)
+    assert maybe_ok.code == StatusCode.INVALID_ARGUMENT
+    assert gateway.driver.get_color_space().value == ColorSpaces.Value("RGB")
+    assert gateway.driver.is_streaming()
+    assert gateway.driver.grab_image(timeout=100) is not None
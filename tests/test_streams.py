@@ -0,0 +1,40 @@
+from is_msgs.image_pb2 import ImageFormat, ImageFormats
+
+from is_spinnaker_gateway.streams import OutputStream
+from is_spinnaker_gateway.conf.options_pb2 import Stream
+
+
+def test_decimation_and_max_rate():
+    decimated = OutputStream(Stream(name="Frame.Half", decimation=2))
+    assert [decimated.wants() for _ in range(5)] == [True, False, True, False, True]
+    limited = OutputStream(Stream(name="Frame.Slow", max_rate=0.001))
+    assert [limited.wants() for _ in range(3)] == [True, False, False]
+
+
+def test_streams_share_identical_encodings(replay_gateway):
+    gateway = replay_gateway(streams=[
+        Stream(name="Frame.Copy"),
+        Stream(name="Frame.Png", format=ImageFormat(format=ImageFormats.Value("PNG"))),
+        Stream(name="Frame.Half", decimation=2),
+    ])
+    gateway.driver.start_capture()
+    first = gateway.encode_images(prefix="CameraGateway.0", image=gateway.driver.grab_image())
+    images = {topic: content for topic, content, _ in first}
+    assert list(images) == [
+        "CameraGateway.0.Frame",
+        "CameraGateway.0.Frame.Copy",
+        "CameraGateway.0.Frame.Png",
+        "CameraGateway.0.Frame.Half",
+    ]
+    assert images["CameraGateway.0.Frame.Copy"] is images["CameraGateway.0.Frame"]
+    assert images["CameraGateway.0.Frame.Png"].data.startswith(b"\x89PNG")
+    second = gateway.encode_images(prefix="CameraGateway.0", image=gateway.driver.grab_image())
+    assert "CameraGateway.0.Frame.Half" not in [topic for topic, _, _ in second]
+
+
+def test_streams_with_unsupported_formats_are_skipped(replay_gateway):
+    gateway = replay_gateway(streams=[
+        Stream(name="Frame.Unknown", format=ImageFormat(format=42)),
+        Stream(name="Frame.WebP", format=ImageFormat(format=ImageFormats.Value("WebP"))),
+    ])
+    assert [stream.name for stream in gateway.streams] == ["Frame.WebP"]
@@ -0,0 +1,39 @@
+import cv2
+import numpy as np
+
+from is_msgs.image_pb2 import ColorSpaces, ImageFormats
+
+from is_spinnaker_gateway.driver.encoder import ImageEncoder
+
+
+def decode(data, flags):
+    return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+
+
+def encode(encoder, array, color_space):
+    return encoder.encode(array=array, encode_format=ImageFormats.Value("JPEG"),
+                          compression_level=0.8, color_space=color_space)
+
+
+def test_tiled_jpeg_decodes_as_single_encode():
+    noise = np.random.RandomState(0).randint(0, 255, (250, 333, 3), dtype=np.uint8)
+    array = cv2.GaussianBlur(noise, (5, 5), 2)
+    single = ImageEncoder(use_turbojpeg=False)
+    tiled = ImageEncoder(use_turbojpeg=False, jpeg_threads=4)
+    rgb, gray = ColorSpaces.Value("RGB"), ColorSpaces.Value("GRAY")
+    data = encode(tiled, array, rgb)
+    # four bands joined by restart markers
+    assert data.count(b"\xff\xdd") == 1
+    assert all(data.count(bytes([0xFF, 0xD0 + n])) == 1 for n in range(3))
+    assert np.array_equal(decode(data, cv2.IMREAD_COLOR),
+                          decode(encode(single, array, rgb), cv2.IMREAD_COLOR))
+    array = array[..., 0].copy()
+    assert np.array_equal(decode(encode(tiled, array, gray), cv2.IMREAD_GRAYSCALE),
+                          decode(encode(single, array, gray), cv2.IMREAD_GRAYSCALE))
+
+
+def test_small_frame_is_not_split():
+    array = np.zeros((16, 64, 3), dtype=np.uint8)
+    data = encode(ImageEncoder(use_turbojpeg=False, jpeg_threads=4), array,
+                  ColorSpaces.Value("RGB"))
+    assert bytes(data).count(b"\xff\xdd") == 0
@@ -0,0 +1,116 @@
+import os
+
+from google.protobuf.wrappers_pb2 import FloatValue
+from is_wire.core import StatusCode
+
+from is_spinnaker_gateway.exceptions import StatusException
+from is_spinnaker_gateway.driver.spinnaker.tuner import StreamTuner
+
+
+class Image:
+
+    def Release(self):
+        pass
+
+
+class LinkDriver:
+    # A GigE link dropping every frame below a packet delay, or every frame when stalled.
+
+    def __init__(self, min_stable_delay: int, stalled: bool = False, payload_size: bool = True):
+        self.min_stable_delay = min_stable_delay
+        self.stalled = stalled
+        self.payload_size = payload_size
+        self.packet_delay = 0
+        self.incomplete = 0
+        self.timeouts = []
+
+    def stop_capture(self):
+        pass
+
+    def start_capture(self):
+        pass
+
+    def flush_buffers(self) -> int:
+        return 0
+
+    def discover_max_packet_size(self) -> int:
+        return 9000
+
+    def set_packet_size(self, packet_size: int):
+        pass
+
+    def set_packet_delay(self, packet_delay: int):
+        self.packet_delay = packet_delay
+
+    def minmax_packet_delay(self):
+        return 0, 100000
+
+    def get_sampling_rate(self) -> FloatValue:
+        return FloatValue(value=10.0)
+
+    def get_payload_size(self) -> int:
+        if not self.payload_size:
+            raise StatusException(code=StatusCode.INTERNAL_ERROR,
+                                  message="Property 'PayloadSize' not available.")
+        return 1000000
+
+    def get_timestamp_frequency(self) -> int:
+        return 1000000000
+
+    def grab_image(self, wait: bool = True, timeout=None):
+        self.timeouts.append(timeout)
+        if self.stalled:
+            return None
+        if self.packet_delay < self.min_stable_delay:
+            self.incomplete += 1
+        return Image()
+
+    def get_stream_statistics(self):
+        return {
+            "StreamIncompleteFrameCount": self.incomplete,
+            "StreamLostFrameCount": 0,
+            "StreamPacketResendRequestedPacketCount": 0,
+            "StreamReceivedPacketCount": 1000,
+        }
+
+
+def test_tune_finds_the_smallest_stable_delay():
+    driver = LinkDriver(min_stable_delay=5000)
+    tuner = StreamTuner(driver=driver, frames=5, bisect_steps=20)
+    assert tuner.tune() == (9000, 5000)
+    assert driver.packet_delay == 5000
+
+
+def test_tune_does_not_hang_on_a_stalled_stream():
+    driver = LinkDriver(min_stable_delay=0, stalled=True)
+    tuner = StreamTuner(driver=driver, grab_timeout=50, frames=5)
+    # every frame timed out, no delay is stable
+    assert tuner.tune() == (9000, 100000)
+    assert set(driver.timeouts) == {50}
+
+
+def test_settings_are_not_stored_without_a_fingerprint(tmp_path):
+    path = str(tmp_path / "stream.json")
+    StreamTuner(driver=LinkDriver(min_stable_delay=0), path=path).save("10.20.6.0", 9000, 5000)
+    tuner = StreamTuner(driver=LinkDriver(min_stable_delay=0, payload_size=False), path=path)
+    assert tuner.load("10.20.6.0") is None
+    os.remove(path)
+    tuner.save("10.20.6.0", 9000, 5000)
+    assert not os.path.exists(path)
+
+
+def test_tuning_failures_keep_static_packet_settings(spinnaker_gateway, tmp_path, monkeypatch):
+
+    def discover_max_packet_size(self):
+        raise StatusException(code=StatusCode.INTERNAL_ERROR,
+                              message="Property 'GevSCPSPacketSize' not available.")
+
+    monkeypatch.setattr("tests.conftest.FakeSpinnakerDriver.discover_max_packet_size",
+                        discover_max_packet_size, raising=False)
+    gateway = spinnaker_gateway(packet_auto_tune=True,
+                                packet_auto_tune_path=str(tmp_path / "stream.json"),
+                                packet_size=1400,
+                                packet_delay=6000)
+    gateway.tune_stream()
+    assert gateway.driver.calls[-2:] == [("set_packet_size", 1400), ("set_packet_delay", 6000)]
+    assert (gateway.camera.packet_size, gateway.camera.packet_delay) == (1400, 6000)
@@ -0,0 +1,14 @@
+from is_spinnaker_gateway.conf.options_pb2 import Camera
+from is_spinnaker_gateway.driver.spinnaker.user_set import UserSetStore, options_hash
+
+
+def test_user_set_is_only_loaded_for_the_same_options(tmp_path):
+    camera = Camera(ip="10.20.6.0", packet_size=9000)
+    camera.initial_config.sampling.frequency.value = 10.0
+    store = UserSetStore(path=str(tmp_path / "user_set.json"))
+    assert store.load("10.20.6.0", options_hash(camera)) is None
+    store.save("10.20.6.0", options_hash(camera), serial_number="19250000")
+    assert store.load("10.20.6.0", options_hash(camera))["serial_number"] == "19250000"
+
+    camera.initial_config.sampling.frequency.value = 20.0
+    assert store.load("10.20.6.0", options_hash(camera)) is None
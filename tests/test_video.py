@@ -0,0 +1,31 @@
+import numpy as np
+
+from is_spinnaker_gateway.driver.video import VideoEncoder, VideoDecoder
+
+
+def test_video_round_trip_with_requested_keyframe():
+    encoder = VideoEncoder(codec="libx264", gop=100, bitrate=500000, frame_rate=10.0)
+    array = np.zeros((49, 64, 3), dtype=np.uint8)
+    array[:, :, 2] = 200
+    packets = []
+    for i in range(4):
+        if i == 2:
+            encoder.request_keyframe()
+        packets.extend(encoder.encode(array))
+    assert [packet.keyframe for packet in packets] == [True, False, True, False]
+
+    # a consumer joining the stream starts decoding from the requested keyframe
+    decoder = VideoDecoder(codec=encoder.decoder)
+    decoded = [array for packet in packets[2:] for array in decoder.decode(packet.data)]
+    assert len(decoded) == 2
+    assert decoded[0].shape == (48, 64, 3)
+    assert abs(int(decoded[0][:, :, 2].mean()) - 200) < 5
+
+
+def test_video_timestamps_follow_the_capture_clock():
+    encoder = VideoEncoder(codec="libx264", gop=100, bitrate=500000, frame_rate=30.0)
+    array = np.zeros((48, 64, 3), dtype=np.uint8)
+    # a frame skipped after 33 ms, two in the same millisecond and a clock reset
+    timestamps = [0, 33333333, 100000000, 100500000, 5000000]
+    pts = [packet.pts for ts in timestamps for packet in encoder.encode(array, timestamp=ts)]
+    assert pts == [0, 33, 100, 101, 102]
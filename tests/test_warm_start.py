@@ -0,0 +1,54 @@
+from is_wire.core import Message
+from is_wire.rpc.context import Context
+from is_msgs.camera_pb2 import CameraConfig
+
+
+def cold_start(spinnaker_gateway, **options):
+    # the first start configures the camera and saves it into the user set
+    gateway = spinnaker_gateway(user_set_warm_start=True, **options)
+    assert not gateway.warm
+    assert gateway.driver.calls[0] == ("load_user_set", "Default")
+    gateway.save_user_set()
+    return gateway
+
+
+def test_warm_start_skips_settings_kept_in_the_user_set(spinnaker_gateway):
+    cold_start(spinnaker_gateway)
+    gateway = spinnaker_gateway(user_set_warm_start=True)
+    assert gateway.warm
+    assert gateway.driver.calls == [("load_user_set", "UserSet1")]
+
+
+def test_user_set_of_another_camera_is_not_used(spinnaker_gateway, monkeypatch):
+    cold_start(spinnaker_gateway)
+    monkeypatch.setattr("tests.conftest.FakeSpinnakerDriver.serial_number", "19250001")
+    gateway = spinnaker_gateway(user_set_warm_start=True)
+    assert not gateway.warm
+    assert gateway.driver.calls[:2] == [("load_user_set", "UserSet1"),
+                                        ("load_user_set", "Default")]
+    assert ("set_packet_size", 0) in gateway.driver.calls
+
+
+def test_restart_is_cold_after_set_config(spinnaker_gateway):
+    gateway = cold_start(spinnaker_gateway)
+    gateway.restart()
+    assert gateway.warm
+
+    # a configuration applied by the gateway itself keeps the user set valid
+    config = CameraConfig()
+    config.sampling.frequency.value = 50.0
+    gateway.set_config(config=config, ctx=None)
+    gateway.restart()
+    assert gateway.warm
+
+    gateway.set_config(config=config, ctx=Context(request=Message(), reply=Message()))
+    gateway.restart()
+    assert not gateway.warm
+
+
+def test_restart_is_cold_after_idling(spinnaker_gateway):
+    gateway = cold_start(spinnaker_gateway, on_demand=True, on_demand_idle_rate=5.0)
+    gateway.set_idle(True)
+    gateway.restart()
+    assert not gateway.warm
+    assert gateway.idle
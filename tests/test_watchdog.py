@@ -0,0 +1,31 @@
+from is_spinnaker_gateway.watchdog import Watchdog
+
+
+def test_watchdog_degrades_on_consecutive_failures():
+    watchdog = Watchdog(max_failures=3, max_failure_ratio=1.0, window=10)
+    for ok in [True, False, False]:
+        watchdog.feed(ok)
+    assert not watchdog.is_degraded()
+    watchdog.feed(False)
+    assert watchdog.is_degraded()
+
+
+def test_watchdog_degrades_on_failure_ratio():
+    watchdog = Watchdog(max_failures=100, max_failure_ratio=0.5, window=4)
+    for ok in [True, False, True]:
+        watchdog.feed(ok)
+    assert not watchdog.is_degraded()
+    watchdog.feed(False)
+    assert watchdog.is_degraded()
+
+
+def test_watchdog_reports_time_to_recovery():
+    watchdog = Watchdog(max_failures=2)
+    watchdog.feed(False)
+    watchdog.feed(False)
+    assert watchdog.is_degraded()
+    watchdog.recovering()
+    assert not watchdog.is_degraded()
+    took = watchdog.feed(True)
+    assert took is not None and took >= 0.0
+    assert watchdog.feed(True) is None